@@ -1,34 +1,165 @@
 # AiChatbot/app.py
 import os
 import json
-import math
-from flask import Flask, request, Response, render_template
-from recommender.recommend_service import recommend_places, health_status
-from recommender.reask import suggest_alternatives, parse_user_text
+import gzip
+import time
+import hashlib
+from flask import Flask, request, Response, render_template, g
+from recommender.cache import TTLCache
+from recommender.data_loader import get_snapshot, get_snapshot_manager
+from recommender.map_layers import get_map_layers, viewport, MAX_FEATURES
+from recommender.scoring import TAG_NAMES
+from recommender.metrics import (
+    METRICS, SamplingProfiler, PROFILE_HEADER, timed, set_route, current_route,
+)
+from recommender.opening_hours import parse_open_at, now_minute_of_week
+from recommender.payload import encode_json, parse_fields
+from recommender.singleflight import SingleFlight, AdmissionGate, Overloaded
+from recommender.recommend_service import (
+    recommend_places, recommend_batch, health_status, start_ranking, page_ranking, locate_band,
+)
+from recommender.reask import suggest_alternatives, parse_user_text, default_category
+from recommender.intent import intent_status
 
 app = Flask(__name__)
 
-# ───────────────────────── JSON NaN/Infinity 정규화 ─────────────────────────
-def _sanitize_json(obj):
-    """dict/list 깊은 곳까지 NaN/Infinity를 None으로 치환"""
-    if isinstance(obj, dict):
-        return {k: _sanitize_json(v) for k, v in obj.items()}
-    if isinstance(obj, list):
-        return [_sanitize_json(x) for x in obj]
-    if isinstance(obj, float):
-        if math.isnan(obj) or math.isinf(obj):
-            return None
-    return obj
+# ───────────────────────── 요청 계측 ─────────────────────────
+# 라우트별 전체 시간/상태 코드/캐시 결과를 기록하고, X-Profile 헤더가 붙은 요청 일부는 cProfile로 떠 둔다
+_PROFILER = SamplingProfiler()
+
+@app.before_request
+def _start_request():
+    g.started = time.perf_counter()
+    set_route(request.url_rule.rule if request.url_rule else "unmatched")
+    g.profile = _PROFILER.start(request.headers.get(PROFILE_HEADER))
+
+@app.after_request
+def _finish_request(resp):
+    route = current_route()
+    prof = g.pop("profile", None)
+    if prof is not None:
+        resp.headers["X-Profile-Dump"] = os.path.basename(_PROFILER.finish(prof, route))
+    METRICS.record_request(route, resp.status_code, time.perf_counter() - g.started, resp.headers.get("X-Cache"))
+    return resp
+
+# ───────────────────────── JSON 인코딩 ─────────────────────────
+# 장소 레코드는 로드 시 정제/인코딩해 둔 조각을 이어 붙이고, 나머지 작은 필드만 그때 정제한다
+def _encode_json(data):
+    return encode_json(data)
 
 def json_response(data, status=200, mimetype="application/json"):
-    """Flask jsonify 대체: NaN/Infinity 제거 + UTF-8"""
-    safe = _sanitize_json(data)
+    """Flask jsonify 대체: NaN/Infinity 제거 + UTF-8 (장소는 캐시된 조각 사용)"""
     return Response(
-        json.dumps(safe, ensure_ascii=False, allow_nan=False),
+        _encode_json(data),
         status=status,
         mimetype=mimetype,
     )
 
+# ───────────────────────── 응답 캐시 (ETag / 304) ─────────────────────────
+# 같은 정규화 요청 + 같은 데이터 스냅샷이면 순위가 같으므로 인코딩된 바이트를 그대로 재사용
+_RESPONSE_CACHE = TTLCache(
+    maxsize=int(os.getenv("RESPONSE_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("RESPONSE_CACHE_TTL", "300")),
+)
+
+# 위치는 소수 3자리(약 100m) 칸으로 맞춰 계산 → 근처 요청끼리 캐시를 공유
+LOC_BUCKET_DECIMALS = 3
+
+def _parse_user_loc(user):
+    """{"lat":..,"lon":..} → (lat, lon) 또는 None"""
+    if isinstance(user, dict) and "lat" in user and "lon" in user:
+        try:
+            return (float(user["lat"]), float(user["lon"]))
+        except Exception:
+            return None
+    return None
+
+def _bucket_loc(user_loc):
+    if user_loc is None:
+        return None
+    return (round(user_loc[0], LOC_BUCKET_DECIMALS), round(user_loc[1], LOC_BUCKET_DECIMALS))
+
+# 캐시에 없는 같은 요청이 동시에 오면 한 번만 계산 + 실제 계산은 입장 제어
+_FLIGHTS = SingleFlight()
+_ADMISSION = AdmissionGate(
+    max_inflight=int(os.getenv("MAX_INFLIGHT_COMPUTE", str(2 * (os.cpu_count() or 1)))),
+    max_queue=int(os.getenv("MAX_QUEUED_COMPUTE", "64")),
+    queue_timeout=float(os.getenv("COMPUTE_QUEUE_TIMEOUT", "0.5")),
+    per_client=int(os.getenv("CLIENT_MAX_INFLIGHT", "0")),
+)
+# 클라이언트 구분 헤더 (CLIENT_MAX_INFLIGHT용). 리버스 프록시 뒤에서는 remote_addr가 모두 프록시 주소이므로
+# 프록시가 채우는 헤더(예: X-Real-IP)를 지정한다. 목록 헤더(X-Forwarded-For)면 마지막 값(프록시가 붙인 것)
+CLIENT_ID_HEADER = os.getenv("CLIENT_ID_HEADER", "")
+
+def _client_key():
+    if CLIENT_ID_HEADER:
+        value = request.headers.get(CLIENT_ID_HEADER, "").rsplit(",", 1)[-1].strip()
+        if value:
+            return value
+    return request.remote_addr
+
+def _cache_key(route, snapshot, params):
+    return (route, snapshot.version, json.dumps(params, sort_keys=True, ensure_ascii=False, default=str))
+
+# 미리 압축: compress 응답 중 이 크기 이상만 gzip 본문을 같이 만들어 캐시 (작은 응답은 헤더 비용이 더 큼)
+GZIP_MIN_BYTES = int(os.getenv("GZIP_MIN_BYTES", "1024"))
+GZIP_LEVEL = 6
+
+def cached_json_response(key, build, encode=_encode_json, mimetype="application/json", compress=False):
+    """key로 캐시된 응답 바이트를 돌려주고, 없으면 build() → (payload, status)를 인코딩해 저장.
+
+    build가 (payload, status, ttl)을 돌려주면 그 응답만 ttl초 캐시 (0이면 캐시하지 않음).
+
+    같은 key의 동시 요청은 한 번만 계산해 나눠 받는다. 계산하던 요청이 입장 거절(429/503)되면 그 요청만 거절하고,
+    기다리던 요청은 자기 클라이언트로 다시 입장을 시도한다.
+
+    강한 ETag를 붙이고 If-None-Match가 맞으면 본문 없이 304.
+    compress면 gzip 본문도 한 번 만들어 두고 Accept-Encoding에 gzip이 있으면 그것을 보낸다 (ETag 따로).
+    """
+    entry = _RESPONSE_CACHE.get(key)
+    state = "HIT"
+    if entry is None:
+        client = _client_key()
+
+        def compute():
+            with _ADMISSION.admit(client), timed("build"):
+                payload, status, *ttl = build()
+            with timed("encode"):
+                body = encode(payload)
+                gz = None
+                if compress and status == 200 and len(body) >= GZIP_MIN_BYTES:
+                    gz = gzip.compress(body, GZIP_LEVEL, mtime=0)
+            computed = (body, status, '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"', gz)
+            ttl = ttl[0] if ttl else None
+            if status == 200 and ttl != 0:
+                _RESPONSE_CACHE.put(key, computed, ttl)
+            return computed
+
+        try:
+            entry, shared = _FLIGHTS.do(key, compute, retry=Overloaded)
+        except Overloaded as e:
+            resp = json_response({"status":"error","message":str(e)}, status=e.status)
+            resp.headers["Retry-After"] = str(e.retry_after)
+            return resp
+        state = "COALESCED" if shared else "MISS"
+
+    body, status, etag, gz = entry
+    use_gzip = gz is not None and request.accept_encodings["gzip"] > 0
+    if use_gzip:
+        body, etag = gz, etag[:-1] + '-gzip"'
+    if status == 200 and request.if_none_match.contains_weak(etag.strip('"')):
+        resp = Response(status=304)
+    else:
+        resp = Response(body, status=status, mimetype=mimetype)
+    if gz is not None:
+        resp.headers["Vary"] = "Accept-Encoding"
+        if use_gzip:
+            resp.headers["Content-Encoding"] = "gzip"
+    resp.headers["ETag"] = etag
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Cache"] = state
+    return resp
+
 # ───────────────────────── Minimal UI (HTML은 script 바깥, JS는 script 안) ─────────────────────────
 CLEAN_HTML_UI = """
 <!doctype html>
@@ -332,88 +463,360 @@ def favicon():
 
 @app.get("/api/health")
 def api_health():
-    return json_response({"ok": True, "data": health_status()})
+    data = health_status()
+    data["response_cache"] = _RESPONSE_CACHE.stats()
+    data["singleflight"] = _FLIGHTS.stats()
+    data["admission"] = _ADMISSION.stats()
+    data["intent"] = intent_status()
+    data["latency"] = METRICS.summary()
+    data["profiler"] = {"enabled": _PROFILER.enabled, "sample_rate": _PROFILER.rate, "dumps": _PROFILER.dumps}
+    return json_response({"ok": True, "data": data})
+
+@app.get("/api/metrics")
+def api_metrics():
+    """Prometheus 텍스트 포맷 (워커 프로세스별 값)"""
+    snap = get_snapshot()
+    cache = _RESPONSE_CACHE.stats()
+    admission = _ADMISSION.stats()
+    extra = [
+        ("dobong_snapshot_version", "gauge", "Loaded data snapshot version.", snap.version),
+        ("dobong_response_cache_size", "gauge", "Entries in the response cache.", cache["size"]),
+        ("dobong_response_cache_hit_ratio", "gauge", "Response cache hit ratio.", cache["hit_rate"]),
+        ("dobong_singleflight_coalesced_total", "counter", "Requests that waited on an identical in-flight computation.", _FLIGHTS.stats()["coalesced"]),
+        ("dobong_admission_running", "gauge", "Computations currently running.", admission["running"]),
+        ("dobong_admission_waiting", "gauge", "Computations waiting for a slot.", admission["waiting"]),
+        ("dobong_admission_shed_429_total", "counter", "Requests rejected with 429.", admission["shed_429"]),
+        ("dobong_admission_shed_503_total", "counter", "Requests rejected with 503.", admission["shed_503"]),
+    ]
+    return Response(METRICS.render_prometheus(extra), mimetype="text/plain; version=0.0.4")
+
+def _fields_param(body):
+    """응답 장소 필드 선택: body의 fields 또는 ?fields=name,placeId,latitude,longitude"""
+    return parse_fields(body.get("fields") or request.args.get("fields"))
+
+def _open_at_param(body):
+    """open_now=true → 지금(KST), 아니면 open_at(ISO 날짜시각) → 주간 분. 둘 다 없으면 None"""
+    if body.get("open_now") in (True, "true", "1", 1):
+        return now_minute_of_week()
+    return parse_open_at(body.get("open_at"))
+
+def _recommend_params(body):
+    radius_m = body.get("radius_m")
+    return {
+        "category": body.get("category"),           # '느좋' | '숨은핫플' (있으면 사용, 없어도 됨)
+        "keyword":  body.get("keyword"),
+        "k":        int(body.get("k", 5)),
+        "seed":     body.get("seed"),
+        "offset":   int(body.get("offset", 0)),
+        "user_loc": _bucket_loc(_parse_user_loc(body.get("user_location"))),
+        "radius_m": float(radius_m) if radius_m is not None else None,
+        "cursor":   body.get("cursor"),
+        "fields":   _fields_param(body),
+        "open_at":  _open_at_param(body),
+        "open_mode": "penalize" if body.get("closed") == "penalize" else "exclude",  # 닫힌 곳: 제외 | 감점
+        "diversity": body.get("diversity"),        # 0~1 (0 = 점수순 그대로), 검증은 서비스에서
+    }
+
+def _recommend_payload(params, snapshot=None):
+    category, keyword = params["category"], params["keyword"]
+    k, offset = params["k"], params["offset"]
+    user_loc, radius_m = params["user_loc"], params["radius_m"]
+    fields = params["fields"]
+
+    # 커서가 살아 있으면 캐시된 순위에서 O(k)로 자르고, 없거나 만료면 offset으로 새로 순위를 매긴다
+    page = page_ranking(params["cursor"], k, fields)
+    if page is None:
+        cursor = start_ranking(
+            category, keyword, user_loc, params["seed"], offset, k,
+            radius_m=radius_m, snapshot=snapshot,
+            open_at=params["open_at"], open_mode=params["open_mode"], diversity=params["diversity"],
+        )
+        page = page_ranking(cursor, k, fields)
+    if page is not None:
+        results, next_cursor, offset, _ = page
+    else:
+        results, next_cursor = recommend_places(
+            category, keyword, user_loc, k, params["seed"], offset,
+            radius_m=radius_m, snapshot=snapshot, fields=fields,
+            open_at=params["open_at"], open_mode=params["open_mode"], diversity=params["diversity"],
+        ), None
+
+    payload = _recommend_result(params, results, offset)
+    payload["cursor"] = next_cursor
+    return payload
+
+def _recommend_result(params, results, offset):
+    category, keyword, k = params["category"], params["keyword"], params["k"]
+    user_loc, radius_m = params["user_loc"], params["radius_m"]
+
+    explain = f"k={k}, offset={offset} 적용. 20% 우선 → 50% → 전체 순으로 추천."
+    if user_loc is not None:
+        explain += " 현재 위치와 가까울수록 가산."
+    if user_loc is not None and radius_m is not None:
+        explain += f" 반경 {radius_m:g}m 이내만."
+    if params["open_at"] is not None:
+        explain += " 영업 중이 아닌 곳은 감점." if params["open_mode"] == "penalize" else " 영업 중인 곳만."
+
+    payload = {"status":"success","count":len(results),"results":results,"explain":explain}
+    if len(results) < max(1, k // 2) and offset == 0:
+        payload["reask"] = suggest_alternatives(category, keyword)
+    return payload
 
 @app.post("/api/dobong/recommend")
 def api_recommend():
     try:
         body = request.get_json(force=True, silent=True) or {}
-        category = body.get("category")            # '느좋' | '숨은핫플' (있으면 사용, 없어도 됨)
-        keyword  = body.get("keyword")
-        k        = int(body.get("k", 5))
-        seed     = body.get("seed")
-        offset   = int(body.get("offset", 0))
-        user     = body.get("user_location")
-
-        user_loc = None
-        if isinstance(user, dict) and "lat" in user and "lon" in user:
-            try:
-                user_loc = (float(user["lat"]), float(user["lon"]))
-            except Exception:
-                user_loc = None
+        params = _recommend_params(body)
+        snap = get_snapshot()
+        return cached_json_response(
+            _cache_key("recommend", snap, params),
+            lambda: (_recommend_payload(params, snap), 200),
+        )
+    except Exception as e:
+        return json_response({"status":"error","message":"서버 내부 오류","detail":str(e)}, status=500)
 
-        results = recommend_places(category, keyword, user_loc, k, seed, offset)
-        explain = f"k={k}, offset={offset} 적용. 20% 우선 → 50% → 전체 순으로 추천."
+# 배치 한 번에 받을 최대 질의 수
+MAX_BATCH_QUERIES = int(os.getenv("MAX_BATCH_QUERIES", "64"))
+
+def _item_error(e):
+    return {"status":"error","message":"잘못된 질의","detail":str(e)}
+
+def _recommend_batch_payload(items, snapshot=None):
+    """items: _recommend_params 결과 또는 파싱 실패 예외. 결과는 입력 순서 그대로."""
+    valid = [p for p in items if isinstance(p, dict)]
+    outcomes = iter(recommend_batch(valid, snapshot=snapshot))
+
+    out = []
+    for p in items:
+        if not isinstance(p, dict):
+            out.append(_item_error(p))
+            continue
+        results = next(outcomes)
+        if isinstance(results, Exception):
+            out.append({"status":"error","message":"서버 내부 오류","detail":str(results)})
+        else:
+            out.append(_recommend_result(p, results, p["offset"]))
+    return {"status":"success","count":len(out),"items":out}
 
-        payload = {"status":"success","count":len(results),"results":results,"explain":explain}
-        if len(results) < max(1, k // 2) and offset == 0:
-            payload["reask"] = suggest_alternatives(category, keyword)
+@app.post("/api/dobong/recommend/batch")
+def api_recommend_batch():
+    try:
+        body = request.get_json(force=True, silent=True) or {}
+        queries = body.get("queries") if isinstance(body, dict) else body
+        if not isinstance(queries, list):
+            return json_response({"status":"error","message":"queries 목록이 필요합니다"}, status=400)
+        if len(queries) > MAX_BATCH_QUERIES:
+            return json_response({
+                "status":"error",
+                "message":f"한 번에 최대 {MAX_BATCH_QUERIES}개까지 요청할 수 있습니다",
+            }, status=400)
+
+        items = []
+        for q in queries:
+            try:
+                if not isinstance(q, dict):
+                    raise ValueError("질의는 JSON 객체여야 합니다")
+                items.append(_recommend_params(q))
+            except Exception as e:
+                items.append(e)
+
+        snap = get_snapshot()
+        key_params = [p if isinstance(p, dict) else repr(p) for p in items]
+        return cached_json_response(
+            _cache_key("recommend_batch", snap, key_params),
+            lambda: (_recommend_batch_payload(items, snap), 200),
+        )
+    except Exception as e:
+        return json_response({"status":"error","message":"서버 내부 오류","detail":str(e)}, status=500)
 
-        return json_response(payload, status=200)
+# ───────────────────────── 지도 레이어 (bbox + 줌) ─────────────────────────
+# 스냅샷마다 줌 단계별로 단순화/인코딩해 둔 피처 조각을 bbox 인덱스로 골라 이어 붙인다 (map_layers).
+# bbox는 그 줌의 타일 경계로 넓혀 캐시 키로 쓰므로 조금씩 움직인 뷰포트끼리 응답(+ gzip 본문)을 공유한다.
+DEFAULT_MAP_ZOOM = 15
+
+def _map_params(args, with_places=False):
+    """?bbox=minLon,minLat,maxLon,maxLat&zoom=15&band=20|50 → dict (잘못된 값은 ValueError).
+
+    bbox가 없으면 전체. with_places면 category(느좋/핫플, '숨은핫플'도 핫플)와 limit도 읽는다.
+    """
+    bbox = args.get("bbox")
+    if bbox:
+        try:
+            w, s, e, n = (float(v) for v in bbox.split(","))
+        except ValueError:
+            raise ValueError("bbox는 minLon,minLat,maxLon,maxLat 형식이어야 합니다")
+        if not (-180 <= w <= e <= 180 and -90 <= s <= n <= 90):
+            raise ValueError("bbox 범위가 올바르지 않습니다")
+    else:
+        w, s, e, n = -180.0, -90.0, 180.0, 90.0
+    try:
+        zoom = float(args.get("zoom", DEFAULT_MAP_ZOOM))
+    except ValueError:
+        raise ValueError("zoom은 숫자여야 합니다")
+    band = args.get("band")
+    if band not in (None, "", "20", "50"):
+        raise ValueError("band는 20 또는 50이어야 합니다")
+    level, bbox = viewport((w, s, e, n), min(max(zoom, 0.0), 24.0))
+    params = {"level": level, "bbox": bbox, "band": int(band) if band else None}
+    if with_places:
+        category = args.get("category")
+        tag = next((t for t in TAG_NAMES if t in category), None) if category else None
+        if category and tag is None:
+            raise ValueError(f"category는 {', '.join(TAG_NAMES)} 중 하나여야 합니다")
+        try:
+            limit = int(args.get("limit", MAX_FEATURES))
+        except ValueError:
+            raise ValueError("limit은 정수여야 합니다")
+        params["category"] = tag
+        params["limit"] = min(max(limit, 1), MAX_FEATURES)
+    return params
+
+def _map_response(route, build, with_places=False):
+    """build(layers, params) → GeoJSON 바이트를 ETag/gzip 캐시로 응답"""
+    try:
+        params = _map_params(request.args, with_places)
+    except ValueError as e:
+        return json_response({"status":"error","message":str(e)}, status=400)
+    try:
+        snap = get_snapshot()
+        layers = get_map_layers(snap)
+        return cached_json_response(
+            _cache_key(route, snap, params),
+            lambda: (build(layers, params), 200),
+            encode=bytes, mimetype="application/geo+json", compress=True,
+        )
     except Exception as e:
         return json_response({"status":"error","message":"서버 내부 오류","detail":str(e)}, status=500)
 
-@app.post("/api/chatbot")
-def api_chatbot():
+@app.get("/api/dobong/grids")
+def api_grids():
+    """저득점(숨은) 격자 GeoJSON: ?bbox=&zoom=&band=20|50"""
+    return _map_response("grids", lambda layers, p: layers.grids_body(p["level"], p["bbox"], p["band"]))
+
+@app.get("/api/dobong/places")
+def api_places():
+    """장소 GeoJSON (낮은 줌은 묶음): ?bbox=&zoom=&band=20|50&category=느좋|핫플&limit="""
+    return _map_response(
+        "places",
+        lambda layers, p: layers.places_body(p["level"], p["bbox"], p["category"], p["band"], p["limit"]),
+        with_places=True,
+    )
+
+@app.get("/api/dobong/band")
+def api_band():
+    """임의 좌표의 격자 밴드 (신규/사용자 제보 장소): ?lat=&lon="""
     try:
-        body = request.get_json(force=True, silent=True) or {}
-        user_text = body.get("text", "")
-        k         = int(body.get("k", 5))
-        seed      = body.get("seed")
-        offset    = int(body.get("offset", 0))
+        lat, lon = float(request.args["lat"]), float(request.args["lon"])
+    except (KeyError, ValueError):
+        return json_response({"status":"error","message":"lat, lon은 숫자여야 합니다"}, status=400)
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return json_response({"status":"error","message":"lat/lon 범위가 올바르지 않습니다"}, status=400)
+    try:
+        return json_response({"status":"success", **locate_band(lat, lon)})
+    except Exception as e:
+        return json_response({"status":"error","message":"서버 내부 오류","detail":str(e)}, status=500)
 
-        parsed = parse_user_text(user_text)
-        category = parsed.get("category") or body.get("category")
-        keyword  = parsed.get("keyword")  or body.get("keyword")
-        user_loc = parsed.get("user_location")
+def _chatbot_params(body):
+    return {
+        "text":     " ".join(str(body.get("text", "") or "").split()),
+        "k":        int(body.get("k", 5)),
+        "seed":     body.get("seed"),
+        "offset":   int(body.get("offset", 0)),
+        "category": body.get("category"),
+        "keyword":  body.get("keyword"),
+        "user_loc": _bucket_loc(_parse_user_loc(body.get("user_location"))),
+        "cursor":   body.get("cursor"),
+        "fields":   _fields_param(body),
+        "diversity": body.get("diversity"),
+    }
+
+def _chatbot_payload(params, snapshot=None):
+    k, seed, offset = params["k"], params["seed"], params["offset"]
+    fields = params["fields"]
+
+    # "다시 추천": 커서가 살아 있으면 첫 요청의 순위/해석을 그대로 이어서 자른다
+    page = page_ranking(params["cursor"], k, fields)
+    if page is not None:
+        results, next_cursor, offset, meta = page
+        parsed, category, keyword = meta["parsed"], meta["category"], meta["keyword"]
+    else:
+        with timed("parse"):
+            parsed = parse_user_text(params["text"], snapshot)
+        category = parsed.get("category") or params["category"]
+        keyword  = parsed.get("keyword")  or params["keyword"]
+        # 키워드를 못 찾은 문장("분위기 좋은 곳")은 본문/의미 검색에만 그대로 넘긴다 (키워드로 쓰지 않음)
+        query    = None if keyword else (params["text"] or None)
+        user_loc = parsed.get("user_location") or params["user_loc"]
 
         # 기본 카테고리 추론
         if category not in ("느좋","숨은핫플"):
-            if keyword and any(kw in (keyword or "") for kw in ["친구","연인","핫플","카페","맛집"]):
-                category = "숨은핫플"
-            else:
-                category = "느좋"
-
-        results = recommend_places(category, keyword, user_loc, k, seed, offset)
-
-        if results:
-            lines = []
-            final_category_text = "숨은핫플" if category == "숨은핫플" else "느좋"
-            if offset == 0:
-                lines.append(f"요청: {final_category_text} / 키워드: {keyword or '없음'} (Top 1-5)")
-            else:
-                lines.append(f"요청: {final_category_text} / 키워드: {keyword or '없음'} (Top {offset+1}-{offset+k})")
-
-            for i, r in enumerate(results, 1):
-                name = r.get("name") or r.get("id") or "이름없음"
-                lines.append(f"{i}. {name}")
-
-            summary = "\n".join(lines)
+            category = default_category(keyword)
+
+        cursor = start_ranking(
+            category, keyword, user_loc, seed, offset, k, snapshot=snapshot,
+            meta={"parsed": parsed, "category": category, "keyword": keyword},
+            diversity=params["diversity"], query=query,
+        )
+        page = page_ranking(cursor, k, fields)
+        if page is not None:
+            results, next_cursor, offset, _ = page
+        else:
+            results = recommend_places(
+                category, keyword, user_loc, k, seed, offset, snapshot=snapshot, fields=fields,
+                diversity=params["diversity"], query=query,
+            )
+            next_cursor = None
+
+    if results:
+        lines = []
+        final_category_text = "숨은핫플" if category == "숨은핫플" else "느좋"
+        if offset == 0:
+            lines.append(f"요청: {final_category_text} / 키워드: {keyword or '없음'} (Top 1-5)")
         else:
-            if offset > 0:
-                summary = "더 이상 추천할 장소가 없습니다. 다른 키워드를 입력해보세요."
-            else:
-                alt = suggest_alternatives(category, keyword)
-                summary = f"해당 조건에서는 추천이 적습니다. 대신 이런 키워드는 어때요? {', '.join(alt.get('alt_keywords', []))}"
+            lines.append(f"요청: {final_category_text} / 키워드: {keyword or '없음'} (Top {offset+1}-{offset+k})")
 
-        return json_response({
-            "status":"success",
-            "parsed": parsed,
-            "k": k,
-            "offset": offset,
-            "results": results,
-            "message": summary
-        }, status=200)
+        for i, r in enumerate(results, 1):
+            name = r.get("name") or r.get("id") or "이름없음"
+            lines.append(f"{i}. {name}")
+
+        summary = "\n".join(lines)
+    else:
+        if offset > 0:
+            summary = "더 이상 추천할 장소가 없습니다. 다른 키워드를 입력해보세요."
+        else:
+            alt = suggest_alternatives(category, keyword)
+            summary = f"해당 조건에서는 추천이 적습니다. 대신 이런 키워드는 어때요? {', '.join(alt.get('alt_keywords', []))}"
+
+    return {
+        "status":"success",
+        "parsed": parsed,
+        "k": k,
+        "offset": offset,
+        "cursor": next_cursor,
+        "results": results,
+        "message": summary
+    }
+
+# 원격 의도 해석이 시간 초과/오류로 로컬 결과만 쓴 응답의 캐시 시간(초). 늦은 원격 답은 의도 캐시에 들어가므로
+# 짧게 (기본 0 = 캐시하지 않음) 두어야 같은 문장의 다음 요청이 그 답을 쓴다
+DEGRADED_CACHE_TTL = float(os.getenv("DEGRADED_CACHE_TTL", "0"))
+
+def _chatbot_result(params, snapshot):
+    payload = _chatbot_payload(params, snapshot)
+    if (payload.get("parsed") or {}).get("source") in ("timeout", "error"):
+        return payload, 200, DEGRADED_CACHE_TTL
+    return payload, 200
+
+@app.post("/api/chatbot")
+def api_chatbot():
+    try:
+        body = request.get_json(force=True, silent=True) or {}
+        params = _chatbot_params(body)
+        snap = get_snapshot()
+        return cached_json_response(
+            _cache_key("chatbot", snap, params),
+            lambda: _chatbot_result(params, snap),
+        )
     except Exception as e:
         # 항상 JSON으로 에러 반환
         return json_response({
@@ -424,4 +827,8 @@ def api_chatbot():
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", "5000"))
+    # 원본 JSON/GeoJSON이 바뀌면 재시작 없이 새 스냅샷으로 교체 (0이면 끔)
+    watch_sec = float(os.getenv("DATA_WATCH_INTERVAL", "2"))
+    if watch_sec > 0:
+        get_snapshot_manager().start_watching(watch_sec)
     app.run(debug=True, port=port, threaded=True)
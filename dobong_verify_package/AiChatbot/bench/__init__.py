@@ -0,0 +1,2 @@
+# AiChatbot/bench/__init__.py
+"""합성 데이터 기반 벤치마크/부하 측정 (python -m bench --help)"""
@@ -0,0 +1,66 @@
+# AiChatbot/bench/__main__.py
+"""python -m bench run | compare | synth
+
+    python -m bench run --sizes 10000,100000                 # → bench/results/<시각>.json
+    python -m bench run --sizes 1000000 --prebuild           # 바이너리 스냅샷/임베딩을 미리 만들고 측정
+    python -m bench compare bench/results/old.json bench/results/new.json --tolerance 0.2
+"""
+import sys, argparse
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m bench", description="합성 데이터 벤치마크 / 부하 측정")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    def add_measure_args(p):
+        p.add_argument("--seed", type=int, default=0)
+        p.add_argument("--seconds", type=float, default=1.0, help="마이크로 벤치마크 항목당 시간(초)")
+        p.add_argument("--duration", type=float, default=5.0, help="부하 측정 시간(초)")
+        p.add_argument("--concurrency", type=int, default=8, help="부하 측정 동시 스레드 수")
+        p.add_argument("--hot-share", type=float, default=0.5, help="인기 질의(캐시 적중) 비율")
+
+    run = sub.add_parser("run", help="크기별 측정 후 결과 JSON 저장")
+    run.add_argument("--sizes", default="10000,100000", help="장소 수 목록 (쉼표)")
+    run.add_argument("--prebuild", action="store_true", help="places.snapshot/임베딩을 미리 빌드")
+    run.add_argument("--corpus-dir", default=None, help="합성 데이터 폴더 (기본: 임시 폴더/dobong-bench)")
+    run.add_argument("--out", default=None, help="결과 파일 (기본: bench/results/<시각>.json)")
+    add_measure_args(run)
+
+    cmp_ = sub.add_parser("compare", help="두 결과 비교 (회귀가 있으면 종료 코드 1)")
+    cmp_.add_argument("base")
+    cmp_.add_argument("new")
+    cmp_.add_argument("--tolerance", type=float, default=0.2)
+
+    synth = sub.add_parser("synth", help="합성 데이터만 생성")
+    synth.add_argument("--places", type=int, default=10000)
+    synth.add_argument("--seed", type=int, default=0)
+    synth.add_argument("--out", required=True)
+
+    child = sub.add_parser("_child")  # run이 크기마다 띄우는 측정 프로세스
+    child.add_argument("--result-file", required=True)
+    add_measure_args(child)
+
+    args = ap.parse_args(argv)
+    if args.cmd == "run":
+        from bench.run import run_suite, CORPUS_DIR
+        sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+        out = run_suite(
+            sizes, seed=args.seed, seconds=args.seconds, duration=args.duration,
+            concurrency=args.concurrency, hot_share=args.hot_share,
+            prebuild=args.prebuild, corpus_dir=args.corpus_dir or CORPUS_DIR, out=args.out,
+        )
+        print(f"[✔] 결과 → {out}")
+    elif args.cmd == "compare":
+        from bench.compare import compare_files
+        return 1 if compare_files(args.base, args.new, args.tolerance) else 0
+    elif args.cmd == "synth":
+        from bench.synth import main as synth_main
+        synth_main(["--places", str(args.places), "--seed", str(args.seed), "--out", args.out])
+    else:
+        from bench.run import run_child
+        run_child(args.result_file, args.seconds, args.duration, args.concurrency, args.hot_share, args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+# AiChatbot/bench/compare.py
+"""두 결과 JSON 비교: 같은 장소 수끼리 p95 지연/처리량이 tolerance 넘게 나빠졌으면 회귀로 표시"""
+import json
+
+
+def _metrics(run):
+    """(이름, 값, 클수록 좋은지) 목록"""
+    out = [("startup_s", run.get("startup_s"), False)]
+    for name, m in sorted(run.get("micro", {}).items()):
+        out.append((f"micro.{name}.p95_us", m.get("p95_us"), False))
+    load = run.get("load", {})
+    for scope, m in [("overall", load.get("overall", {}))] + sorted(load.get("routes", {}).items()):
+        out.append((f"load.{scope}.p95_ms", m.get("p95_ms"), False))
+        out.append((f"load.{scope}.throughput_rps", m.get("throughput_rps"), True))
+    return out
+
+
+def compare(base, new, tolerance=0.2):
+    """→ (행 목록, 회귀 수). 행: (장소 수, 지표, 기준값, 새 값, 변화율, 회귀 여부)"""
+    base_runs = {r["places"]: r for r in base.get("runs", [])}
+    rows, regressions = [], 0
+    for run in new.get("runs", []):
+        ref = base_runs.get(run["places"])
+        if ref is None:
+            continue
+        ref_metrics = {name: v for name, v, _ in _metrics(ref)}
+        for name, value, higher_better in _metrics(run):
+            old = ref_metrics.get(name)
+            if not old or value is None:
+                continue
+            change = (value - old) / old
+            worse = -change if higher_better else change
+            regressed = worse > tolerance
+            regressions += regressed
+            rows.append((run["places"], name, old, value, change, regressed))
+    return rows, regressions
+
+
+def compare_files(base_path, new_path, tolerance=0.2):
+    with open(base_path, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    with open(new_path, "r", encoding="utf-8") as f:
+        new = json.load(f)
+    rows, regressions = compare(base, new, tolerance)
+    for places, name, old, value, change, regressed in rows:
+        flag = "  ← 회귀" if regressed else ""
+        print(f"[{places:>8}] {name:<44} {old:>12.3f} → {value:>12.3f} ({change:+.1%}){flag}")
+    print(f"회귀 {regressions}건 (허용 {tolerance:.0%})")
+    return regressions
@@ -0,0 +1,81 @@
+# AiChatbot/bench/load.py
+"""프로세스 안 부하 드라이버: Flask 테스트 클라이언트로 /api/chatbot, /api/dobong/recommend를 동시에 호출.
+
+네트워크/WSGI 서버 없이 앱 처리 시간만 본다 (GIL 안에서 도는 스레드라 처리량은 단일 프로세스 기준).
+hot_share 비율만큼은 작은 인기 질의 집합에서 뽑아 응답 캐시 적중을 흉내 낸다.
+"""
+import time
+import threading
+from collections import Counter
+
+import numpy as np
+
+from bench.micro import KEYWORDS, SENTENCES, _user_locs
+from bench.timing import summarize
+
+ROUTES = ("/api/chatbot", "/api/dobong/recommend")
+HOT_QUERIES = 32
+
+
+def _request(locs, i):
+    """(경로, JSON 본문) 하나. i가 같으면 같은 질의"""
+    loc = locs[i % len(locs)]
+    user_location = {"lat": loc[0], "lon": loc[1]} if i % 3 else None
+    if i % 2:
+        return ROUTES[0], {"text": SENTENCES[i % len(SENTENCES)], "k": 5, "seed": i, "user_location": user_location}
+    return ROUTES[1], {
+        "keyword": KEYWORDS[i % len(KEYWORDS)], "k": 5, "seed": i,
+        "user_location": user_location, "radius_m": 2000 if i % 5 == 0 else None,
+    }
+
+
+def run_load(app, duration=5.0, concurrency=8, hot_share=0.5, seed=0):
+    """duration초 동안 concurrency개 스레드로 요청 → 전체/라우트별 처리량과 지연 분위수(ms)"""
+    rng = np.random.default_rng(seed)
+    locs = _user_locs(rng, 256)
+    samples = []
+    lock = threading.Lock()
+    start = threading.Barrier(concurrency + 1)
+    stop_at = [0.0]
+
+    def worker(wid):
+        client = app.test_client()
+        wrng = np.random.default_rng([seed, wid])
+        local = []
+        start.wait()
+        while time.perf_counter() < stop_at[0]:
+            if wrng.random() < hot_share:
+                i = int(wrng.integers(HOT_QUERIES))
+            else:
+                i = HOT_QUERIES + int(wrng.integers(1 << 30))
+            path, body = _request(locs, i)
+            t0 = time.perf_counter()
+            resp = client.post(path, json=body)
+            local.append((path, time.perf_counter() - t0, resp.status_code, resp.headers.get("X-Cache")))
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(w,), daemon=True) for w in range(concurrency)]
+    for t in threads:
+        t.start()
+    stop_at[0] = time.perf_counter() + duration
+    t_start = time.perf_counter()
+    start.wait()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t_start
+
+    def report(rows):
+        out = summarize([r[1] for r in rows], unit="ms")
+        out["throughput_rps"] = round(len(rows) / elapsed, 1) if elapsed > 0 else None
+        out["status"] = {str(k): v for k, v in sorted(Counter(r[2] for r in rows).items())}
+        out["cache"] = dict(sorted(Counter(r[3] or "-" for r in rows).items()))
+        return out
+
+    return {
+        "duration_s": round(elapsed, 3),
+        "concurrency": concurrency,
+        "hot_share": hot_share,
+        "overall": report(samples),
+        "routes": {route: report([r for r in samples if r[0] == route]) for route in ROUTES},
+    }
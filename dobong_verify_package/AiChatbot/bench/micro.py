@@ -0,0 +1,82 @@
+# AiChatbot/bench/micro.py
+"""핫패스 함수 단위 벤치마크 (지금 떠 있는 스냅샷 기준)"""
+import numpy as np
+
+from bench.timing import measure
+
+KEYWORDS = (None, "카페", "친구", "연인", "가족", "조용한 공원", "야경", "브런치 디저트", "둘레길 산책")
+SENTENCES = (
+    "친구랑 갈 만한 카페 추천해줘",
+    "연인이랑 조용한 곳 가고 싶어",
+    "아이랑 가족끼리 공원 산책",
+    "야경 좋은 데이트 코스 알려줘",
+    "조용하게 산책할 곳 추천해줘. 전망도 좋으면 좋겠어.",
+    "분위기 좋은 곳",
+)
+
+
+def _user_locs(rng, n):
+    from bench.synth import LAT_RANGE, LON_RANGE
+    return [
+        (float(rng.uniform(*LAT_RANGE)), float(rng.uniform(*LON_RANGE)))
+        for _ in range(n)
+    ]
+
+
+def run_micro(seconds=1.0, seed=0):
+    """score_places / recommend_places / parse_user_text / sanitize / 조각 생성 / json_response 측정"""
+    from app import json_response, _recommend_result
+    from recommender.data_loader import get_snapshot
+    from recommender.index import get_index
+    from recommender.payload import sanitize, PlaceFragments
+    from recommender.reask import parse_user_text
+    from recommender.recommend_service import recommend_places
+    from recommender.scoring import score_places
+
+    rng = np.random.default_rng(seed)
+    snap = get_snapshot()
+    index = get_index(snap)
+    locs = _user_locs(rng, 64)
+
+    n = len(index)
+    sample = [int(i) for i in rng.integers(0, n, size=min(n, 256))] if n else []
+    records = [dict(index.places[i]) for i in sample]
+
+    results = {}
+    results["score_places"] = measure(
+        lambda kw, s: score_places(index, kw, None, s),
+        [(KEYWORDS[i % len(KEYWORDS)], i) for i in range(64)],
+        seconds,
+    )
+    results["score_places_radius"] = measure(
+        lambda kw, loc, s: score_places(index, kw, loc, s, radius_m=1500),
+        [(KEYWORDS[i % len(KEYWORDS)], locs[i], i) for i in range(64)],
+        seconds,
+    )
+    results["recommend_places"] = measure(
+        lambda kw, loc, s: recommend_places(None, kw, loc, 5, s, snapshot=snap),
+        [(KEYWORDS[i % len(KEYWORDS)], locs[i] if i % 2 else None, i) for i in range(64)],
+        seconds,
+    )
+    # 같은 문장은 매칭 캐시에 걸리므로 번호를 붙여 매번 새 문장으로
+    results["parse_user_text"] = measure(
+        parse_user_text,
+        [(f"{SENTENCES[i % len(SENTENCES)]} {i}",) for i in range(4096)],
+        seconds,
+    )
+    if records:
+        results["sanitize_place"] = measure(sanitize, [(r,) for r in records], seconds)
+        results["place_fragment"] = measure(
+            lambda r: PlaceFragments((r,)).get(0), [(r,) for r in records], seconds,
+        )
+
+    params = {
+        "category": None, "keyword": "카페", "k": 5, "user_loc": None, "radius_m": None,
+        "open_at": None, "open_mode": "exclude",
+    }
+    payloads = [
+        _recommend_result(params, recommend_places(None, "카페", None, 5, i, snapshot=snap), 0)
+        for i in range(16)
+    ]
+    results["json_response"] = measure(json_response, [(p,) for p in payloads], seconds)
+    return results
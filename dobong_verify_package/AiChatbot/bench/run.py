@@ -0,0 +1,128 @@
+# AiChatbot/bench/run.py
+"""크기별 합성 데이터로 마이크로 벤치마크 + 부하 측정을 돌려 결과를 JSON으로 저장.
+
+크기마다 별도 프로세스(DOBONG_DATA_DIR=합성 데이터)로 띄워 import 시점 로드/인덱스 빌드 시간과
+메모리까지 따로 잰다.
+"""
+import os, sys, json, time, platform, subprocess, tempfile
+
+import numpy as np
+
+from bench.synth import write_corpus
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(HERE)
+RESULTS_DIR = os.path.join(HERE, "results")
+CORPUS_DIR = os.path.join(tempfile.gettempdir(), "dobong-bench")
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_child(result_file, seconds, duration, concurrency, hot_share, seed):
+    """(자식 프로세스) 앱을 import해 데이터를 올리고 측정 → result_file"""
+    from bench.micro import run_micro
+    from bench.load import run_load
+
+    t0 = time.perf_counter()
+    import app
+    startup = time.perf_counter() - t0
+
+    from recommender.data_loader import get_snapshot_manager
+    from recommender.index import get_index
+    status = get_snapshot_manager().status()
+    out = {
+        "indexed_places": len(get_index()),
+        "startup_s": round(startup, 3),
+        "snapshot_build_ms": status["snapshot_build_ms"],
+        "snapshot_index_ms": status["snapshot_index_ms"],
+        "snapshot_source": status["snapshot_source"],
+        "micro": run_micro(seconds, seed),
+        "load": run_load(app.app, duration, concurrency, hot_share, seed),
+    }
+    out["peak_rss_mb"] = _peak_rss_mb()
+    with open(result_file, "w", encoding="utf-8") as f:
+        json.dump(out, f, ensure_ascii=False)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR,
+            capture_output=True, text=True, timeout=10,
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _prebuild(data_dir, env):
+    """바이너리 스냅샷/임베딩 파일을 미리 만들어 운영과 같은 mmap 경로로 로드하게"""
+    for module in ("recommender.place_store", "recommender.embeddings"):
+        subprocess.run([sys.executable, "-m", module, "--base", data_dir], cwd=APP_DIR, env=env, check=True)
+
+
+def run_suite(sizes, seed=0, seconds=1.0, duration=5.0, concurrency=8, hot_share=0.5,
+              prebuild=False, corpus_dir=CORPUS_DIR, out=None):
+    """sizes(장소 수 목록)마다 합성 데이터 생성 → 자식 프로세스 측정 → 결과 JSON 경로"""
+    runs = []
+    for n in sizes:
+        data_dir = write_corpus(os.path.join(corpus_dir, f"{n}-{seed}"), n, seed)
+        env = dict(os.environ, DOBONG_DATA_DIR=data_dir, CLIENT_MAX_INFLIGHT="0")
+        env.pop("PROFILE_DIR", None)
+        if prebuild:
+            _prebuild(data_dir, env)
+
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as tmp:
+            result_file = tmp.name
+        try:
+            subprocess.run([
+                sys.executable, "-m", "bench", "_child", "--result-file", result_file,
+                "--seconds", str(seconds), "--duration", str(duration),
+                "--concurrency", str(concurrency), "--hot-share", str(hot_share), "--seed", str(seed),
+            ], cwd=APP_DIR, env=env, check=True)
+            with open(result_file, "r", encoding="utf-8") as f:
+                run = json.load(f)
+        finally:
+            os.unlink(result_file)
+        run = dict({"places": n, "prebuilt": prebuild}, **run)
+        runs.append(run)
+        print(_one_line(run), flush=True)
+
+    result = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "params": {
+                "seed": seed, "seconds": seconds, "duration": duration,
+                "concurrency": concurrency, "hot_share": hot_share,
+            },
+        },
+        "runs": runs,
+    }
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        out = os.path.join(RESULTS_DIR, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    return out
+
+
+def _one_line(run):
+    micro = run["micro"]
+    load = run["load"]["overall"]
+    return (
+        f"[{run['places']:>8}] startup {run['startup_s']:.2f}s, rss {run['peak_rss_mb']}MB | "
+        f"score_places p95 {micro['score_places']['p95_us']:.0f}us, "
+        f"recommend_places p95 {micro['recommend_places']['p95_us']:.0f}us | "
+        f"load {load.get('throughput_rps')} rps, p95 {load.get('p95_ms')}ms, p99 {load.get('p99_ms')}ms"
+    )
@@ -0,0 +1,228 @@
+# AiChatbot/bench/synth.py
+"""합성 장소 데이터 생성기.
+
+tests/의 원본과 같은 파일 구성/스키마(API 응답 봉투 + 장소 레코드, low20/low50 격자 GeoJSON)로
+원하는 개수만큼 만든다. 같은 (개수, seed)면 항상 같은 파일이 나온다.
+
+    python -m bench.synth --places 100000 --out /tmp/dobong-100k
+"""
+import os, json, argparse
+
+import numpy as np
+
+from recommender.scoring import KEYWORD_TO_TAG_MAP, KEYWORD_SYNONYMS
+
+# 도봉구를 덮는 영역과 격자 칸 크기 (원본 격자와 비슷한 약 200m)
+LAT_RANGE = (37.630, 37.700)
+LON_RANGE = (127.005, 127.060)
+CELL_LAT = 0.0018
+CELL_LON = 0.00227
+
+# 장소가 몰리는 지점 (역 주변 등). 나머지는 영역 전체에 고르게
+HOTSPOTS = (
+    (37.6533, 127.0473),  # 창동
+    (37.6688, 127.0443),  # 쌍문
+    (37.6486, 127.0345),  # 방학
+    (37.6896, 127.0447),  # 도봉산
+    (37.6560, 127.0135),  # 도봉둘레길
+)
+HOTSPOT_SHARE = 0.6
+HOTSPOT_SIGMA = 0.004
+
+DONGS = ("창동", "쌍문동", "방학동", "도봉동")
+NAME_HEADS = ("도봉", "창동", "쌍문", "방학", "초안산", "우이천", "북한산", "둘리", "누리", "햇살", "모랫", "숲속")
+NAME_TAILS = (
+    "카페", "디저트", "베이커리", "식당", "맛집", "국수", "정원", "공원", "어린이공원", "둘레길",
+    "전망대", "도서관", "갤러리", "서점", "쉼터", "계곡", "광장",
+)
+HOURS_TEMPLATES = (
+    ["Monday: 11:00 AM – 9:30 PM", "Tuesday: 11:00 AM – 9:30 PM", "Wednesday: 11:00 AM – 9:30 PM",
+     "Thursday: 11:00 AM – 9:30 PM", "Friday: 11:00 AM – 9:30 PM", "Saturday: 11:00 AM – 9:30 PM",
+     "Sunday: 11:00 AM – 9:30 PM"],
+    ["Monday: Closed", "Tuesday: 10:00 AM – 10:00 PM", "Wednesday: 10:00 AM – 10:00 PM",
+     "Thursday: 10:00 AM – 10:00 PM", "Friday: 10:00 AM – 11:00 PM", "Saturday: 10:00 AM – 11:00 PM",
+     "Sunday: 10:00 AM – 9:00 PM"],
+    ["Monday: 5:00 PM – 2:00 AM", "Tuesday: 5:00 PM – 2:00 AM", "Wednesday: 5:00 PM – 2:00 AM",
+     "Thursday: 5:00 PM – 2:00 AM", "Friday: 5:00 PM – 3:00 AM", "Saturday: 5:00 PM – 3:00 AM",
+     "Sunday: Closed"],
+    ["Monday: Open 24 hours", "Tuesday: Open 24 hours", "Wednesday: Open 24 hours",
+     "Thursday: Open 24 hours", "Friday: Open 24 hours", "Saturday: Open 24 hours",
+     "Sunday: Open 24 hours"],
+    ["Monday: 11:30 AM – 3:00 PM, 5:00 – 9:00 PM", "Tuesday: 11:30 AM – 3:00 PM, 5:00 – 9:00 PM",
+     "Wednesday: 11:30 AM – 3:00 PM, 5:00 – 9:00 PM", "Thursday: 11:30 AM – 3:00 PM, 5:00 – 9:00 PM",
+     "Friday: 11:30 AM – 3:00 PM, 5:00 – 9:00 PM", "Saturday: 11:30 AM – 9:00 PM", "Sunday: Closed"],
+    None,
+)
+PRICE_LEVELS = (None, "PRICE_LEVEL_INEXPENSIVE", "PRICE_LEVEL_MODERATE")
+
+# 느좋(조용/자연) 쪽 장소 비율, 두 출처에 다 들어가는 장소 비율
+NEUJOH_SHARE = 0.55
+OVERLAP_SHARE = 0.05
+
+_ENVELOPE = {"success": True, "httpStatus": 200, "message": "요청이 성공적으로 처리되었습니다."}
+
+
+def _envelope(items):
+    return dict(_ENVELOPE, data=items)
+
+
+def _grid_cells(rng):
+    """영역을 칸으로 나누고 점수 내림차순 rank_pct를 매긴 (행, 열, 점수, rank_pct) 목록"""
+    rows = int(np.ceil((LAT_RANGE[1] - LAT_RANGE[0]) / CELL_LAT))
+    cols = int(np.ceil((LON_RANGE[1] - LON_RANGE[0]) / CELL_LON))
+    scores = rng.gamma(2.0, 15000.0, size=rows * cols)
+    order = np.argsort(-scores)
+    rank_pct = np.empty(len(scores))
+    rank_pct[order] = (np.arange(len(scores)) + 1) / len(scores)
+    return [
+        (i // cols, i % cols, float(scores[i]), float(rank_pct[i]))
+        for i in range(rows * cols)
+    ]
+
+
+def _grid_feature(grid_id, row, col, score, rank_pct):
+    min_lat = LAT_RANGE[0] + row * CELL_LAT
+    min_lon = LON_RANGE[0] + col * CELL_LON
+    max_lat, max_lon = min_lat + CELL_LAT, min_lon + CELL_LON
+    return {
+        "type": "Feature",
+        "properties": {
+            "grid_id": grid_id,
+            "final_score": score,
+            "rank_pct": rank_pct,
+            "centroid_lat": (min_lat + max_lat) / 2,
+            "centroid_lon": (min_lon + max_lon) / 2,
+            "min_lat": min_lat,
+            "min_lon": min_lon,
+            "max_lat": max_lat,
+            "max_lon": max_lon,
+        },
+        "geometry": {
+            "type": "Polygon",
+            "coordinates": [[
+                [max_lon, min_lat], [max_lon, max_lat], [min_lon, max_lat], [min_lon, min_lat], [max_lon, min_lat],
+            ]],
+        },
+    }
+
+
+def _feature_collection(name, features):
+    return {
+        "type": "FeatureCollection",
+        "name": name,
+        "crs": {"type": "name", "properties": {"name": "urn:ogc:def:crs:OGC:1.3:CRS84"}},
+        "features": features,
+    }
+
+
+def _coordinates(rng, n):
+    lat = rng.uniform(*LAT_RANGE, size=n)
+    lon = rng.uniform(*LON_RANGE, size=n)
+    near = rng.random(n) < HOTSPOT_SHARE
+    spot = np.asarray(HOTSPOTS)[rng.integers(len(HOTSPOTS), size=n)]
+    lat[near] = spot[near, 0] + rng.normal(0, HOTSPOT_SIGMA, size=near.sum())
+    lon[near] = spot[near, 1] + rng.normal(0, HOTSPOT_SIGMA, size=near.sum())
+    return np.clip(lat, *LAT_RANGE), np.clip(lon, *LON_RANGE)
+
+
+def _description(rng, words):
+    if rng.random() < 0.4:
+        return None
+    picked = rng.choice(words, size=int(rng.integers(1, 4)), replace=False)
+    return f"{' '.join(picked)} 하기 좋은 곳입니다."
+
+
+def _place(rng, i, lat, lon, words):
+    pid = f"SYN{i:08d}"
+    dong = DONGS[int(rng.integers(len(DONGS)))]
+    name = f"{NAME_HEADS[int(rng.integers(len(NAME_HEADS)))]}{NAME_TAILS[int(rng.integers(len(NAME_TAILS)))]} {i}"
+    has_image = rng.random() < 0.5
+    return {
+        "placeId": pid,
+        "name": name,
+        "address": f"South Korea, Seoul, {dong} {int(rng.integers(1, 999))}-{int(rng.integers(1, 40))}번지 도봉구 서울특별시 KR",
+        "latitude": float(lat),
+        "longitude": float(lon),
+        "distanceMeters": None,
+        "distanceText": None,
+        "imageUrl": f"https://places.googleapis.com/v1/places/{pid}/photos/synthetic" if has_image else None,
+        "description": _description(rng, words),
+        "openingHours": HOURS_TEMPLATES[int(rng.integers(len(HOURS_TEMPLATES)))],
+        "priceLevel": PRICE_LEVELS[int(rng.integers(len(PRICE_LEVELS)))],
+        "mapsUrl": f"https://maps.google.com/?cid={int(rng.integers(1, 2**62))}",
+        "phone": f"+82 2-{int(rng.integers(900, 999))}-{int(rng.integers(1000, 9999))}" if rng.random() < 0.8 else None,
+        "rating": round(float(rng.uniform(3.0, 5.0)), 1) if rng.random() < 0.9 else None,
+        "reviewCount": float(rng.integers(0, 2000)),
+    }
+
+
+def generate(n_places, seed=0):
+    """→ {파일 이름: JSON 객체}. 파일 이름은 data_loader.DATA_FILES와 같다."""
+    rng = np.random.default_rng(seed)
+
+    cells = _grid_cells(rng)
+    low20 = [_grid_feature(g, *c) for g, c in enumerate(cells) if c[3] <= 0.2]
+    low50 = [_grid_feature(g, *c) for g, c in enumerate(cells) if c[3] <= 0.5]
+    low20_cells = {(c[0], c[1]) for c in cells if c[3] <= 0.2}
+
+    words = sorted(set(KEYWORD_TO_TAG_MAP) | {s for syn in KEYWORD_SYNONYMS.values() for s in syn})
+    lat, lon = _coordinates(rng, n_places)
+    neujoh_side = rng.random(n_places) < NEUJOH_SHARE
+    both = rng.random(n_places) < OVERLAP_SHARE
+
+    hotple, neujoh, hotple_low, neujoh_low = [], [], [], []
+    for i in range(n_places):
+        p = _place(rng, i, lat[i], lon[i], words)
+        cell = (int((lat[i] - LAT_RANGE[0]) // CELL_LAT), int((lon[i] - LON_RANGE[0]) // CELL_LON))
+        in_low = cell in low20_cells
+        if neujoh_side[i] or both[i]:
+            neujoh.append(p)
+            if in_low:
+                neujoh_low.append(p)
+        if not neujoh_side[i] or both[i]:
+            hotple.append(p)
+            if in_low:
+                hotple_low.append(p)
+
+    return {
+        "dobong_neujoh.json": _envelope(neujoh),
+        "dobong_hotple.json": _envelope(hotple),
+        "dobong_neujoh_in_low.json": _envelope(neujoh_low),
+        "dobong_hotple_in_low.json": _envelope(hotple_low),
+        "low20_grids.geojson": _feature_collection("low20_grids", low20),
+        "low50_grids.geojson": _feature_collection("low50_grids", low50),
+    }
+
+
+def write_corpus(out_dir, n_places, seed=0):
+    """합성 데이터를 out_dir에 기록 (이미 같은 설정으로 만들어 둔 폴더면 그대로 재사용) → out_dir"""
+    marker = os.path.join(out_dir, "synth.json")
+    spec = {"places": int(n_places), "seed": int(seed)}
+    try:
+        with open(marker, "r", encoding="utf-8") as f:
+            if json.load(f) == spec:
+                return out_dir
+    except (OSError, ValueError):
+        pass
+
+    os.makedirs(out_dir, exist_ok=True)
+    for name, obj in generate(n_places, seed).items():
+        with open(os.path.join(out_dir, name), "w", encoding="utf-8") as f:
+            json.dump(obj, f, ensure_ascii=False)
+    with open(marker, "w", encoding="utf-8") as f:
+        json.dump(spec, f)
+    return out_dir
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="합성 장소 데이터 생성 (tests/ 원본과 같은 스키마)")
+    ap.add_argument("--places", type=int, default=10000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", required=True, help="출력 폴더 (DOBONG_DATA_DIR로 지정해 서버를 띄울 수 있음)")
+    args = ap.parse_args(argv)
+    write_corpus(args.out, args.places, args.seed)
+    print(f"[✔] {args.places}개 장소 → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
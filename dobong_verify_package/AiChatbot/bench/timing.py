@@ -0,0 +1,42 @@
+# AiChatbot/bench/timing.py
+import time
+
+import numpy as np
+
+
+def summarize(durations, unit="us"):
+    """호출별 소요 시간(초) 목록 → 횟수/평균/분위수 (unit: us | ms)"""
+    scale = 1e6 if unit == "us" else 1e3
+    d = np.asarray(durations, dtype=np.float64) * scale
+    if not len(d):
+        return {"calls": 0}
+    p50, p95, p99 = np.percentile(d, (50, 95, 99))
+    return {
+        "calls": int(len(d)),
+        f"mean_{unit}": round(float(d.mean()), 3),
+        f"p50_{unit}": round(float(p50), 3),
+        f"p95_{unit}": round(float(p95), 3),
+        f"p99_{unit}": round(float(p99), 3),
+        f"max_{unit}": round(float(d.max()), 3),
+    }
+
+
+def measure(fn, inputs, seconds=1.0, min_calls=20, warmup=5):
+    """inputs(인자 튜플 목록)를 돌려 가며 fn(*args)을 seconds 동안 호출해 호출별 시간을 잰다"""
+    inputs = list(inputs)
+    for i in range(min(warmup, len(inputs))):
+        fn(*inputs[i])
+
+    durations = []
+    deadline = time.perf_counter() + seconds
+    i = 0
+    while len(durations) < min_calls or time.perf_counter() < deadline:
+        args = inputs[i % len(inputs)]
+        t0 = time.perf_counter()
+        fn(*args)
+        durations.append(time.perf_counter() - t0)
+        i += 1
+
+    out = summarize(durations)
+    out["ops_per_s"] = round(len(durations) / sum(durations), 1) if sum(durations) > 0 else None
+    return out
@@ -0,0 +1,2 @@
+# AiChatbot/collector/__init__.py
+"""리뷰 수집기 (hotplace 노트북의 Selenium 크롤링 대체): asyncio 크롤 엔진 + 네이버 블로그 수집"""
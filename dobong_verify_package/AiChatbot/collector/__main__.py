@@ -0,0 +1,96 @@
+# AiChatbot/collector/__main__.py
+"""python -m collector naver ...
+
+    # 도봉구 장소 전체 → selectplace/dobong_texts.csv (끊기면 같은 명령으로 이어서)
+    python -m collector naver
+    # 칭찬 DNA용 대표 장소
+    python -m collector naver --seed ../selectplace/reference_places.csv \
+        --out ../selectplace/reference_texts.csv --query "{name} 후기 분위기 뷰 추천"
+    # 로컬 대역 서버로 돌려 보기
+    python -m collector naver --rewrite https://search.naver.com=http://127.0.0.1:8000 \
+        --rewrite https://blog.naver.com=http://127.0.0.1:8000/blog
+"""
+import os, sys, asyncio, argparse
+
+from collector.engine import CrawlEngine, Checkpoint, PageCache, RewriteFetcher, UrllibFetcher
+from collector.naver import QUERY_TEMPLATE, LINKS_PER_PLACE, collect, read_seed_names, write_texts
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SELECTPLACE_DIR = os.path.join(os.path.dirname(os.path.dirname(HERE)), "selectplace")
+CACHE_DIR = os.path.join(HERE, "cache")
+
+
+def _rewrites(items):
+    out = {}
+    for item in items or []:
+        src, sep, dst = item.partition("=")
+        if not sep:
+            raise SystemExit(f"--rewrite는 SRC=DST 형식이어야 합니다: {item}")
+        out[src] = dst.rstrip("/")
+    return out
+
+
+def _naver(args):
+    fetcher = UrllibFetcher(timeout=args.timeout)
+    rewrites = _rewrites(args.rewrite)
+    if rewrites:
+        fetcher = RewriteFetcher(fetcher, rewrites)
+    checkpoint = Checkpoint(args.checkpoint or os.path.splitext(args.out)[0] + ".ckpt.jsonl")
+    engine = CrawlEngine(
+        fetcher=fetcher,
+        cache=None if args.no_cache else PageCache(args.cache_dir, args.cache_max_age),
+        checkpoint=checkpoint,
+        concurrency=args.concurrency, per_host=args.per_host,
+        rate=args.rate, burst=args.burst, retries=args.retries,
+    )
+
+    names = read_seed_names(args.seed, args.max_places)
+    resumed = sum(1 for n in names if n in checkpoint)
+    print(f"총 {len(names)}개 장소 (체크포인트에서 이어받음 {resumed}개)")
+
+    def on_done(name, rows, error):
+        if error is not None:
+            print(f"   [!] {name}: {error}")
+        else:
+            print(f"   [ok] {name} ← 글 {len(rows)}개")
+
+    rows, failed = asyncio.run(collect(engine, names, args.query, args.links, on_done))
+    write_texts(args.out, rows)
+    s = engine.stats
+    print(
+        f"[✔] 텍스트 {len(rows)}개 → {args.out} | 요청 {s['fetched']}, 캐시 {s['cache_hits']}, "
+        f"재시도 {s['retries']}, 실패 장소 {len(failed)}"
+    )
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m collector", description="리뷰 수집기")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("naver", help="네이버 VIEW 검색 → 블로그 본문 CSV (place,url,text)")
+    p.add_argument("--seed", default=os.path.join(SELECTPLACE_DIR, "dobong_seed.csv"))
+    p.add_argument("--out", default=os.path.join(SELECTPLACE_DIR, "dobong_texts.csv"))
+    p.add_argument("--query", default=QUERY_TEMPLATE, help="검색어 템플릿 ({name} 자리에 장소 이름)")
+    p.add_argument("--links", type=int, default=LINKS_PER_PLACE, help="장소당 최대 블로그 글 수")
+    p.add_argument("--max-places", type=int, default=0, help="앞에서 몇 곳만 (0이면 전부)")
+    p.add_argument("--concurrency", type=int, default=8, help="전체 동시 요청 수")
+    p.add_argument("--per-host", type=int, default=2, help="호스트별 동시 요청 수")
+    p.add_argument("--rate", type=float, default=0.5, help="호스트별 초당 요청 수 (토큰 버킷)")
+    p.add_argument("--burst", type=float, default=2.0, help="토큰 버킷 최대 토큰")
+    p.add_argument("--retries", type=int, default=3)
+    p.add_argument("--timeout", type=float, default=15.0)
+    p.add_argument("--cache-dir", default=CACHE_DIR)
+    p.add_argument("--cache-max-age", type=float, default=None, help="캐시 유효 시간(초, 기본: 영구)")
+    p.add_argument("--no-cache", action="store_true")
+    p.add_argument("--checkpoint", default=None, help="체크포인트 파일 (기본: <out>.ckpt.jsonl)")
+    p.add_argument("--rewrite", action="append", help="URL 앞부분 치환 SRC=DST (로컬 대역 서버 테스트용)")
+
+    args = ap.parse_args(argv)
+    if args.cmd == "naver":
+        return _naver(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
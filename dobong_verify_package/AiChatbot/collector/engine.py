@@ -0,0 +1,363 @@
+# AiChatbot/collector/engine.py
+"""asyncio 크롤 엔진.
+
+- 호스트별 동시 요청 상한 + 토큰 버킷(초당 요청 수) 예의 제한
+- 내용 주소 디스크 캐시 (본문은 sha256으로 한 번만 저장, URL은 본문 해시를 가리킴)
+- 작업 단위 체크포인트(JSONL 추가 기록) → 중단 후 다시 돌리면 끝난 작업은 건너뜀
+- 가져오기(fetcher)는 교체 가능: 기본은 표준 라이브러리 urllib(스레드), 로컬 대역 서버로 주소를 바꾸는 RewriteFetcher
+"""
+import os, json, time, random, asyncio, hashlib, urllib.error, urllib.request
+from urllib.parse import urlsplit
+
+USER_AGENT = os.getenv(
+    "CRAWL_USER_AGENT",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class FetchError(Exception):
+    """네트워크 오류 또는 재시도 후에도 받지 못한 페이지"""
+
+    def __init__(self, url, message, status=None):
+        super().__init__(f"{url}: {message}")
+        self.url = url
+        self.status = status
+
+
+class Page:
+    """가져온 페이지 (캐시에서 왔으면 cached=True)"""
+
+    __slots__ = ("url", "status", "body", "final_url", "content_type", "cached", "retry_after")
+
+    def __init__(self, url, status, body, final_url=None, content_type="", cached=False, retry_after=None):
+        self.url = url
+        self.status = status
+        self.body = body
+        self.final_url = final_url or url
+        self.content_type = content_type or ""
+        self.cached = cached
+        self.retry_after = retry_after
+
+    def text(self):
+        charset = "utf-8"
+        for part in self.content_type.split(";"):
+            k, _, v = part.strip().partition("=")
+            if k.lower() == "charset" and v:
+                charset = v.strip("\"'")
+        try:
+            return self.body.decode(charset, errors="replace")
+        except LookupError:
+            return self.body.decode("utf-8", errors="replace")
+
+
+# ───────────────────────── 가져오기 (교체 가능) ─────────────────────────
+class UrllibFetcher:
+    """표준 라이브러리 urllib로 가져오기 (블로킹 호출은 스레드로) → Page"""
+
+    def __init__(self, timeout=15.0, headers=None):
+        self.timeout = timeout
+        self.headers = dict({"User-Agent": USER_AGENT, "Accept-Language": "ko-KR,ko;q=0.9"}, **(headers or {}))
+
+    def _get(self, url):
+        req = urllib.request.Request(url, headers=self.headers)
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return Page(url, resp.status, resp.read(), resp.geturl(), resp.headers.get("Content-Type", ""))
+        except urllib.error.HTTPError as e:
+            headers = e.headers or {}
+            return Page(url, e.code, e.read() or b"", url, headers.get("Content-Type", ""),
+                        retry_after=headers.get("Retry-After"))
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            raise FetchError(url, str(getattr(e, "reason", e))) from e
+
+    async def __call__(self, url):
+        return await asyncio.to_thread(self._get, url)
+
+
+class RewriteFetcher:
+    """URL 앞부분을 바꿔 다른 fetcher로 넘긴다 (예: https://search.naver.com → 로컬 대역 서버)"""
+
+    def __init__(self, inner, rewrites):
+        self.inner = inner
+        self.rewrites = sorted(rewrites.items(), key=lambda kv: -len(kv[0]))
+
+    async def __call__(self, url):
+        for src, dst in self.rewrites:
+            if url.startswith(src):
+                page = await self.inner(dst + url[len(src):])
+                page.url = url
+                if page.final_url.startswith(dst):  # 상대 링크가 원래 주소 기준으로 풀리게
+                    page.final_url = src + page.final_url[len(dst):]
+                return page
+        return await self.inner(url)
+
+
+# ───────────────────────── 예의 제한 ─────────────────────────
+class TokenBucket:
+    """초당 rate개씩 차고 최대 burst개까지 쌓이는 토큰 버킷 (acquire는 토큰 하나를 기다려 가져감)"""
+
+    def __init__(self, rate, burst=1.0):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
+
+class _Host:
+    __slots__ = ("slots", "bucket")
+
+    def __init__(self, per_host, rate, burst):
+        self.slots = asyncio.Semaphore(per_host)
+        self.bucket = TokenBucket(rate, burst)
+
+
+# ───────────────────────── 디스크 캐시 ─────────────────────────
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class PageCache:
+    """내용 주소 페이지 캐시.
+
+    objects/ab/<본문 sha256>   : 본문 (같은 본문은 한 번만)
+    urls/ab/<URL sha256>.json  : {url, status, final_url, content_type, body, fetched_at}
+    max_age(초)가 지나면 없는 것으로 본다 (None이면 영구).
+    """
+
+    def __init__(self, root, max_age=None):
+        self.root = root
+        self.max_age = max_age
+
+    def _path(self, kind, digest, suffix=""):
+        return os.path.join(self.root, kind, digest[:2], digest + suffix)
+
+    @staticmethod
+    def _write(path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def get(self, url):
+        try:
+            with open(self._path("urls", _sha256(url.encode("utf-8")), ".json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if self.max_age is not None and time.time() - meta["fetched_at"] > self.max_age:
+                return None
+            with open(self._path("objects", meta["body"]), "rb") as f:
+                body = f.read()
+        except (OSError, ValueError, KeyError):
+            return None
+        return Page(url, meta["status"], body, meta.get("final_url"), meta.get("content_type"), cached=True)
+
+    def put(self, page):
+        digest = _sha256(page.body)
+        obj = self._path("objects", digest)
+        if not os.path.exists(obj):
+            self._write(obj, page.body)
+        meta = {
+            "url": page.url,
+            "status": page.status,
+            "final_url": page.final_url,
+            "content_type": page.content_type,
+            "body": digest,
+            "fetched_at": time.time(),
+        }
+        self._write(self._path("urls", _sha256(page.url.encode("utf-8")), ".json"),
+                    json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+
+
+# ───────────────────────── 체크포인트 ─────────────────────────
+class Checkpoint:
+    """끝난 작업 결과를 한 줄씩 추가 기록하는 JSONL 파일 ({"key", "result"}).
+
+    중간에 끊겨 마지막 줄이 잘려 있으면 그 줄만 버린다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.done = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.done[rec["key"]] = rec.get("result")
+        except OSError:
+            pass
+        self._file = None
+
+    def __contains__(self, key):
+        return key in self.done
+
+    def record(self, key, result):
+        if self._file is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            # 잘린 마지막 줄 뒤에 이어 쓰지 않게 줄바꿈부터
+            try:
+                with open(self.path, "rb") as f:
+                    f.seek(-1, os.SEEK_END)
+                    torn = f.read(1) != b"\n"
+            except OSError:
+                torn = False
+            self._file = open(self.path, "a", encoding="utf-8")
+            if torn:
+                self._file.write("\n")
+        self._file.write(json.dumps({"key": key, "result": result}, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.done[key] = result
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+# ───────────────────────── 엔진 ─────────────────────────
+class CrawlEngine:
+    """작업(key, payload)을 동시에 돌리고, 작업 핸들러는 engine.fetch(url)로 페이지를 받는다.
+
+    fetch는 캐시 → (전체 동시성, 호스트 동시성, 토큰 버킷) → fetcher 순으로 가며
+    429/5xx/네트워크 오류는 지수 백오프로 재시도한다.
+    """
+
+    def __init__(self, fetcher=None, cache=None, checkpoint=None, concurrency=8, per_host=2,
+                 rate=1.0, burst=2.0, retries=3, backoff=1.0, host_rates=None):
+        self.fetcher = fetcher or UrllibFetcher()
+        self.cache = cache
+        self.checkpoint = checkpoint
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.rate = rate
+        self.burst = burst
+        self.retries = retries
+        self.backoff = backoff
+        self.host_rates = dict(host_rates or {})
+        self._hosts = {}
+        self._inflight = {}
+        self._global = None  # 전체 동시성 세마포어: 첫 fetch(또는 run) 때 이벤트 루프 안에서 만든다
+        self.stats = {
+            "tasks_done": 0, "tasks_resumed": 0, "tasks_failed": 0,
+            "fetched": 0, "cache_hits": 0, "retries": 0, "errors": 0,
+        }
+
+    def _host(self, url):
+        host = urlsplit(url).netloc.lower()
+        h = self._hosts.get(host)
+        if h is None:
+            h = self._hosts[host] = _Host(self.per_host, self.host_rates.get(host, self.rate), self.burst)
+        return h
+
+    async def fetch(self, url):
+        """URL → Page (캐시 우선, 같은 URL 동시 요청은 한 번만 보냄)"""
+        if self.cache is not None:
+            page = self.cache.get(url)
+            if page is not None:
+                self.stats["cache_hits"] += 1
+                return page
+        task = self._inflight.get(url)
+        if task is None:
+            task = self._inflight[url] = asyncio.ensure_future(self._fetch_network(url))
+            task.add_done_callback(lambda _t, u=url: self._inflight.pop(u, None))
+        return await asyncio.shield(task)
+
+    async def _fetch_network(self, url):
+        if self._global is None:  # run() 밖에서 fetch만 부른 경우
+            self._global = asyncio.Semaphore(self.concurrency)
+        host = self._host(url)
+        last = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.stats["retries"] += 1
+                delay = self.backoff * (2 ** (attempt - 1)) * (1.0 + random.random() * 0.25)
+                retry_after = getattr(last, "retry_after", None)
+                if retry_after:
+                    try:
+                        delay = max(delay, float(retry_after))
+                    except ValueError:
+                        pass
+                await asyncio.sleep(delay)
+            async with self._global, host.slots:
+                await host.bucket.acquire()
+                try:
+                    page = await self.fetcher(url)
+                except FetchError as e:
+                    last = e
+                    continue
+            self.stats["fetched"] += 1
+            if page.status in RETRY_STATUS:
+                last = page
+                continue
+            if self.cache is not None and 200 <= page.status < 300:
+                self.cache.put(page)
+            return page
+        self.stats["errors"] += 1
+        if isinstance(last, FetchError):
+            raise last
+        raise FetchError(url, f"HTTP {last.status}", last.status)
+
+    async def _worker(self, queue, handler, results, on_done):
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            key, payload = item
+            try:
+                result = await handler(self, payload)
+            except Exception as e:
+                self.stats["tasks_failed"] += 1
+                results[key] = None
+                if on_done:
+                    on_done(key, None, e)
+                continue
+            if self.checkpoint is not None:
+                self.checkpoint.record(key, result)
+            self.stats["tasks_done"] += 1
+            results[key] = result
+            if on_done:
+                on_done(key, result, None)
+
+    async def run(self, tasks, handler, workers=None, on_done=None):
+        """tasks [(key, payload)] → {key: 결과}. 체크포인트에 있는 key는 돌리지 않고 저장된 결과를 쓴다.
+
+        실패한 작업은 체크포인트에 남기지 않으므로 다음 실행에서 다시 시도된다 (결과는 None).
+        """
+        self._global = asyncio.Semaphore(self.concurrency)
+        results, todo = {}, []
+        for key, payload in tasks:
+            if self.checkpoint is not None and key in self.checkpoint:
+                results[key] = self.checkpoint.done[key]
+                self.stats["tasks_resumed"] += 1
+            else:
+                todo.append((key, payload))
+
+        queue = asyncio.Queue()
+        for item in todo:
+            queue.put_nowait(item)
+        n = max(1, min(workers or self.concurrency, len(todo) or 1))
+        for _ in range(n):
+            queue.put_nowait(None)
+        try:
+            await asyncio.gather(*(self._worker(queue, handler, results, on_done) for _ in range(n)))
+        finally:
+            if self.checkpoint is not None:
+                self.checkpoint.close()
+        return results
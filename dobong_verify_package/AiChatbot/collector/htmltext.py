@@ -0,0 +1,100 @@
+# AiChatbot/collector/htmltext.py
+"""표준 라이브러리 HTMLParser로 간단한 선택자(tag#id.class) 요소의 속성/텍스트 뽑기 (bs4 없이)"""
+import re
+from html.parser import HTMLParser
+
+_VOID = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr"}
+_NO_TEXT = {"script", "style", "noscript", "template"}
+_SELECTOR = re.compile(r"([a-zA-Z0-9]*)((?:[#.][\w-]+)*)")
+
+
+def _parse_selector(selector):
+    m = _SELECTOR.fullmatch(selector.strip())
+    if not m:
+        raise ValueError(f"지원하지 않는 선택자: {selector}")
+    rest = m.group(2)
+    return m.group(1).lower() or None, re.findall(r"#([\w-]+)", rest), set(re.findall(r"\.([\w-]+)", rest))
+
+
+def _matches(sel, tag, attrs):
+    name, ids, classes = sel
+    if name and name != tag:
+        return False
+    if ids and attrs.get("id") not in ids:
+        return False
+    return not classes or classes <= set((attrs.get("class") or "").split())
+
+
+class _Matcher(HTMLParser):
+    def __init__(self, selectors, want_text):
+        super().__init__(convert_charrefs=True)
+        self.selectors = [(s, _parse_selector(s)) for s in selectors]
+        self.want_text = want_text
+        self.found = {s: [] for s in selectors}
+        self.stack = []
+        self.active = []
+        self.skip = 0
+
+    def _open(self, tag, attrs, void):
+        attrs = {k: v or "" for k, v in attrs}
+        opened = []
+        for s, sel in self.selectors:
+            if _matches(sel, tag, attrs):
+                rec = (attrs, [])
+                self.found[s].append(rec)
+                opened.append(rec)
+        if void:
+            return
+        self.stack.append((tag, opened))
+        self.active.extend(opened)
+        if tag in _NO_TEXT:
+            self.skip += 1
+
+    def handle_starttag(self, tag, attrs):
+        self._open(tag, attrs, tag in _VOID)
+
+    def handle_startendtag(self, tag, attrs):
+        self._open(tag, attrs, True)
+
+    def handle_endtag(self, tag):
+        # 가장 가까운 같은 태그까지 닫는다 (닫히지 않은 안쪽 태그 허용)
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i][0] != tag:
+                continue
+            for t, opened in self.stack[i:]:
+                if t in _NO_TEXT:
+                    self.skip -= 1
+                for rec in opened:
+                    self.active.remove(rec)
+            del self.stack[i:]
+            return
+
+    def handle_data(self, data):
+        if self.want_text and not self.skip:
+            for _, parts in self.active:
+                parts.append(data)
+
+
+def select(html, selectors, text=False):
+    """→ {선택자: [(속성 dict, 텍스트 또는 None), ...]} (문서 순서)"""
+    m = _Matcher(selectors, text)
+    m.feed(html or "")
+    m.close()
+    return {
+        s: [(attrs, " ".join(" ".join(parts).split()) if text else None) for attrs, parts in recs]
+        for s, recs in m.found.items()
+    }
+
+
+def select_attr(html, selector, attr):
+    """선택자에 맞는 요소들의 attr 값 목록 (없는 요소는 건너뜀)"""
+    return [attrs[attr] for attrs, _ in select(html, [selector])[selector] if attrs.get(attr)]
+
+
+def first_text(html, selectors):
+    """selectors를 앞에서부터 보고 처음 맞는 요소의 텍스트 (없으면 "")"""
+    found = select(html, selectors, text=True)
+    for s in selectors:
+        if found[s]:
+            return found[s][0][1]
+    return ""
@@ -0,0 +1,112 @@
+# AiChatbot/collector/naver.py
+"""네이버 VIEW 검색 → 블로그 본문 수집 (hotplace 노트북 naver_search_links / extract_naver_blog_text 대체).
+
+장소 하나가 작업 하나: 검색 페이지에서 블로그 링크를 모으고 본문을 동시에 가져온다.
+가져오기 하나라도 실패한 장소는 체크포인트에 남기지 않아 다음 실행에서 다시 시도된다 (받은 페이지는 캐시에 있음).
+"""
+import re, csv, asyncio
+from urllib.parse import quote_plus, urljoin, urlsplit
+
+from collector.engine import FetchError
+from collector.htmltext import first_text, select, select_attr
+
+SEARCH_URL = "https://search.naver.com/search.naver?sm=tab_hty.top&where=view&query={query}"
+# 노트북 설정: 도봉구 장소 수집 / 칭찬 DNA(대표 장소) 수집
+QUERY_TEMPLATE = "{name} 도봉구 추천"
+PRAISE_QUERY_TEMPLATE = "{name} 후기 분위기 뷰 추천"
+LINKS_PER_PLACE = 5
+MIN_TEXT_CHARS = 100
+
+# 검색 결과 제목 링크 (신/구 마크업), 블로그 본문 (스킨별)
+LINK_SELECTORS = ("a.title_link", "a.api_txt_lines.total_tit")
+CONTENT_SELECTORS = ("#postViewArea", ".se-main-container", ".se_component_wrap", "#post-view")
+BLOG_HOSTS = ("blog.naver.com", "m.blog.naver.com")
+
+_HASHTAG = re.compile(r"#[^\s]+")
+
+
+def search_url(name, template=QUERY_TEMPLATE):
+    return SEARCH_URL.format(query=quote_plus(template.format(name=name)))
+
+
+def parse_search_links(html, base_url, limit=LINKS_PER_PLACE):
+    """검색 결과 HTML → 블로그 글 링크 (문서 순서, 중복 제거, limit개까지)"""
+    found = select(html, LINK_SELECTORS)
+    links = []
+    for sel in LINK_SELECTORS:
+        for attrs, _ in found[sel]:
+            href = urljoin(base_url, attrs.get("href") or "")
+            if urlsplit(href).netloc.lower() in BLOG_HOSTS and href not in links:
+                links.append(href)
+            if len(links) >= limit:
+                return links
+    return links
+
+
+def clean_text(txt):
+    """해시태그 제거 + 공백 정리"""
+    return " ".join(_HASHTAG.sub(" ", txt or "").split())
+
+
+async def fetch_post_text(engine, url):
+    """블로그 글 URL → 본문 텍스트 (구형 스킨은 mainFrame iframe 안의 글을 한 번 더 가져옴)"""
+    page = await engine.fetch(url)
+    if page.status != 200:
+        raise FetchError(url, f"HTTP {page.status}", page.status)
+    html = page.text()
+    frame = select_attr(html, "iframe#mainFrame", "src")
+    if frame:
+        inner = urljoin(page.final_url, frame[0])
+        page = await engine.fetch(inner)
+        if page.status != 200:
+            raise FetchError(inner, f"HTTP {page.status}", page.status)
+        html = page.text()
+    return clean_text(first_text(html, CONTENT_SELECTORS))
+
+
+async def collect_place(engine, job):
+    """job {"name", "query", "links"} → [{"place", "url", "text"}, ...]"""
+    url = search_url(job["name"], job["query"])
+    page = await engine.fetch(url)
+    if page.status != 200:
+        raise FetchError(url, f"HTTP {page.status}", page.status)
+    links = parse_search_links(page.text(), page.final_url, job["links"])
+    texts = await asyncio.gather(*(fetch_post_text(engine, lk) for lk in links))
+    return [
+        {"place": job["name"], "url": lk, "text": body}
+        for lk, body in zip(links, texts)
+        if len(body) >= MIN_TEXT_CHARS  # 너무 짧은 글은 광고 등
+    ]
+
+
+def read_seed_names(path, limit=0):
+    """seed CSV의 name 열 (순서 유지, 중복 제거, limit>0이면 앞에서 limit개)"""
+    names = []
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            name = (row.get("name") or "").strip()
+            if name and name not in names:
+                names.append(name)
+                if limit and len(names) >= limit:
+                    break
+    return names
+
+
+def write_texts(path, rows):
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=["place", "url", "text"])
+        w.writeheader()
+        w.writerows(rows)
+
+
+async def collect(engine, names, query=QUERY_TEMPLATE, links=LINKS_PER_PLACE, on_done=None):
+    """장소 이름 목록 → (행 목록(seed 순서), 실패한 장소 목록)"""
+    jobs = [(name, {"name": name, "query": query, "links": links}) for name in names]
+    results = await engine.run(jobs, collect_place, on_done=on_done)
+    rows, failed = [], []
+    for name in names:
+        if results.get(name) is None:
+            failed.append(name)
+        else:
+            rows.extend(results[name])
+    return rows, failed
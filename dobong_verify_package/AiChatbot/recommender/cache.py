@@ -0,0 +1,61 @@
+# AiChatbot/recommender/cache.py
+import time
+import threading
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    """크기 제한(LRU) + 만료시간(TTL)이 있는 스레드 안전 캐시"""
+
+    def __init__(self, maxsize=1024, ttl=300.0):
+        self.maxsize = int(maxsize)
+        self.ttl = float(ttl) if ttl else None
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is not _MISSING:
+                value, expires = item
+                if expires is None or expires > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value, ttl=None):
+        """ttl(초)을 주면 이 항목만 그 만료시간 (없으면 캐시 기본값)"""
+        if self.maxsize <= 0:
+            return
+        ttl = self.ttl if ttl is None else float(ttl)
+        expires = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else None,
+        }
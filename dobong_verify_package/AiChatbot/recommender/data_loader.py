@@ -1,5 +1,11 @@
 # AiChatbot/recommender/data_loader.py
-import os, json
+import os, csv, json, time, hashlib, threading
+
+from recommender.embeddings import VECTORS_FILE, VECTORS_META_FILE, open_vectors
+from recommender.entities import load_entities, resolve_data
+from recommender.grid_bands import GridBandLookup
+from recommender.place_store import SNAPSHOT_FILE, StoreRecords, open_store
+from recommender.spatial import haversine_m
 
 def _extract_list(obj):
     if isinstance(obj, list):
@@ -38,7 +44,7 @@ def _as_id_list(lst):
             out.append(str(x))
     return out
 
-def _load_json(base_path, filename):
+def _load_json(base_path, filename, errors=None):
     path = os.path.join(base_path, filename)
     try:
         with open(path, "r", encoding="utf-8") as f:
@@ -48,6 +54,9 @@ def _load_json(base_path, filename):
             return {"type":"FeatureCollection","features":[]}
         return []
     except Exception:
+        # 파일은 있는데 못 읽음(쓰는 중 등) → 핫리로드가 스냅샷을 버리도록 기록
+        if errors is not None:
+            errors.append(filename)
         if filename.endswith(".geojson"):
             return {"type":"FeatureCollection","features":[]}
         return []
@@ -63,7 +72,30 @@ def _ensure_tag(lst, tag):
         p["tags"] = tags
         p.setdefault("main_category", tag)
 
-def _bootstrap_data():
+# 스냅샷이 감시하는 원본 파일 (base_path 기준)
+DATA_FILES = (
+    "dobong_neujoh.json",
+    "dobong_hotple.json",
+    "dobong_neujoh_in_low.json",
+    "dobong_hotple_in_low.json",
+    "low20_grids.geojson",
+    "low50_grids.geojson",
+    SNAPSHOT_FILE,
+    VECTORS_FILE,
+    VECTORS_META_FILE,
+)
+# 스냅샷과 겹치는 원본 (이 중 하나라도 스냅샷보다 새로우면 스냅샷을 쓰지 않음)
+_PLACE_SOURCES = DATA_FILES[:4]
+
+# places_master.csv 이름이 같고 이 거리 안이면 같은 장소로 보고 분류 필드를 보강
+MASTER_MATCH_M = 300.0
+_MASTER_FIELDS = ("top_category", "sub_category", "base_type")
+
+def _resolve_base_path():
+    # DOBONG_DATA_DIR: 다른 데이터 폴더(벤치마크용 합성 데이터 등)로 띄울 때
+    env = os.getenv("DOBONG_DATA_DIR")
+    if env:
+        return env
     try:
         current_dir = os.path.dirname(os.path.abspath(__file__))
         base_dir = os.path.dirname(current_dir)
@@ -72,11 +104,106 @@ def _bootstrap_data():
             base_path = "tests"
     except Exception:
         base_path = "tests"
+    return base_path
 
-    raw_neu_all = _load_json(base_path, "dobong_neujoh.json")
-    raw_hot_all = _load_json(base_path, "dobong_hotple.json")
-    raw_neu_low = _load_json(base_path, "dobong_neujoh_in_low.json")
-    raw_hot_low = _load_json(base_path, "dobong_hotple_in_low.json")
+def _master_csv_path(base_path):
+    env = os.getenv("PLACES_MASTER_CSV")
+    if env:
+        return env
+    root = os.path.dirname(os.path.dirname(os.path.abspath(base_path)))
+    return os.path.join(root, "selectplace", "places_master.csv")
+
+def _norm_name(name):
+    return "".join(str(name or "").split()).lower()
+
+def _load_places_master(path):
+    """places_master.csv → {정규화 이름: [행, ...]} (없으면 빈 dict)"""
+    out = {}
+    try:
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            for row in csv.DictReader(f):
+                key = _norm_name(row.get("name"))
+                if key:
+                    out.setdefault(key, []).append(row)
+    except (OSError, csv.Error):
+        return {}
+    return out
+
+def _enrich_from_master(places, master):
+    """이름(+근접 좌표)이 맞는 master 행의 top/sub_category, base_type을 비어 있는 필드에 채움"""
+    if not master:
+        return
+    for p in places:
+        rows = master.get(_norm_name(p.get("name")))
+        if not rows:
+            continue
+        lat, lon = p.get("latitude", p.get("lat")), p.get("longitude", p.get("lon"))
+        for row in rows:
+            try:
+                if lat is not None and row.get("lat") and float(
+                    haversine_m(float(lat), float(lon), float(row["lat"]), float(row["lon"]))
+                ) > MASTER_MATCH_M:
+                    continue
+            except (TypeError, ValueError):
+                continue
+            for key in _MASTER_FIELDS:
+                if row.get(key) and p.get(key) in (None, ""):
+                    p[key] = row[key]
+            break
+
+def _snapshot_is_fresh(base_path, snap_path):
+    try:
+        snap_mtime = os.stat(snap_path).st_mtime_ns
+    except OSError:
+        return False
+    for path in [os.path.join(base_path, name) for name in _PLACE_SOURCES] + [_master_csv_path(base_path)]:
+        try:
+            if os.stat(path).st_mtime_ns > snap_mtime:
+                return False
+        except OSError:
+            continue
+    return True
+
+def _bootstrap_from_store(store):
+    extra = store.extra
+    return {
+        "핫플": StoreRecords(store, store.rows_of("핫플")),
+        "느좋": StoreRecords(store, store.rows_of("느좋")),
+        "핫플_low": list(extra.get("핫플_low") or []),
+        "느좋_low": list(extra.get("느좋_low") or []),
+        "place_store": store,
+    }
+
+def _load_grids(base_path, errors=None):
+    """(low20, low50) FeatureCollection. 밴드 조회표와 지도 레이어(map_layers)가 같이 쓴다."""
+    return (
+        _load_json(base_path, "low20_grids.geojson", errors),
+        _load_json(base_path, "low50_grids.geojson", errors),
+    )
+
+def _bootstrap_data(base_path=None, errors=None, use_snapshot=True, entities=None):
+    if base_path is None:
+        base_path = _resolve_base_path()
+
+    # 바이너리 스냅샷이 있으면(원본보다 최신이면) mmap으로 바로 연다 → JSON 파싱 생략
+    store = None
+    if use_snapshot:
+        snap_path = os.path.join(base_path, SNAPSHOT_FILE)
+        if _snapshot_is_fresh(base_path, snap_path):
+            store = open_store(snap_path)
+    if store is not None:
+        data = _bootstrap_from_store(store)
+        data["grid_geojson"] = _load_grids(base_path, errors)
+        data["grid_bands"] = GridBandLookup(*data["grid_geojson"])
+        data["place_vectors"] = open_vectors(base_path)
+        # 바이너리 스냅샷은 컴파일할 때 이미 중복을 합쳤다
+        data["entities"], data["entity_stats"] = None, None
+        return data
+
+    raw_neu_all = _load_json(base_path, "dobong_neujoh.json", errors)
+    raw_hot_all = _load_json(base_path, "dobong_hotple.json", errors)
+    raw_neu_low = _load_json(base_path, "dobong_neujoh_in_low.json", errors)
+    raw_hot_low = _load_json(base_path, "dobong_hotple_in_low.json", errors)
 
     neujoh_all = _to_place_dict_list(_extract_list(raw_neu_all))
     hotple_all = _to_place_dict_list(_extract_list(raw_hot_all))
@@ -85,17 +212,177 @@ def _bootstrap_data():
     _ensure_tag(neujoh_all, "느좋")
     _ensure_tag(hotple_all, "핫플")
 
+    master = _load_places_master(_master_csv_path(base_path))
+    _enrich_from_master(hotple_all, master)
+    _enrich_from_master(neujoh_all, master)
+
     neujoh_low = _as_id_list(_extract_list(raw_neu_low))
     hotple_low = _as_id_list(_extract_list(raw_hot_low))
 
-    return {
+    # 저득점 격자 → 좌표 O(1) 밴드 조회 테이블 (geopandas 없이)
+    grid_geojson = _load_grids(base_path, errors)
+    grid_bands = GridBandLookup(*grid_geojson)
+
+    data = {
         "느좋": neujoh_all,
         "핫플": hotple_all,
         "느좋_low": neujoh_low,
         "핫플_low": hotple_low,
+        "grid_bands": grid_bands,
+        "grid_geojson": grid_geojson,
+        "place_store": None,
     }
 
-_ALL_DATA = _bootstrap_data()
+    # 근접 중복(출처만 다른 같은 장소) → 대표 레코드 하나. 이전 상태가 있으면 바뀐 칸만 다시 묶음
+    if entities is None:
+        entities = load_entities(base_path)
+    data["entities"], data["entity_stats"] = resolve_data(data, entities)
+    data["place_vectors"] = open_vectors(base_path)
+    return data
+
+# ───────────────────────── 스냅샷 (원자적 교체 + 핫리로드) ─────────────────────────
+# 파생 인덱스 빌더: name → (builder(data, *requires 값), requires). 스냅샷을 만들 때 같이 빌드된다.
+_DERIVED_BUILDERS = {}
+
+def register_derived(name, builder, requires=()):
+    """스냅샷마다 함께 만들 파생 인덱스 등록 (이미 떠 있는 스냅샷은 첫 조회 때 빌드).
+
+    requires의 파생 인덱스를 먼저 빌드해 builder에 data 다음 인자로 넘긴다.
+    """
+    _DERIVED_BUILDERS[name] = (builder, tuple(requires))
+
+class DataSnapshot:
+    """한 시점의 데이터와 파생 인덱스 묶음. 만들어진 뒤에는 교체만 되고 수정되지 않는다."""
+
+    def __init__(self, version, data, build_seconds, fingerprint=None):
+        self.version = version
+        # 원본 파일 (이름, mtime, 크기) 해시: 같은 파일을 읽은 다른 프로세스(워커)와 같은 값
+        self.fingerprint = fingerprint
+        self.data = data
+        self.build_seconds = build_seconds  # 원본 로드만 (파생 인덱스는 derived_seconds)
+        self.built_at = time.time()
+        self.derived_seconds = {}  # 파생 인덱스 이름 → 빌드 시간(초, 의존 인덱스 제외)
+        self._derived = {}
+        self._lock = threading.Lock()
+
+    def derived(self, name):
+        value = self._derived.get(name)
+        if value is None:
+            builder, requires = _DERIVED_BUILDERS[name]
+            # 의존 인덱스는 락 밖에서 (각자 자기 이름으로 한 번만 빌드됨)
+            deps = [self.derived(r) for r in requires]
+            with self._lock:
+                value = self._derived.get(name)
+                if value is None:
+                    t0 = time.perf_counter()
+                    value = builder(self.data, *deps)
+                    self.derived_seconds[name] = time.perf_counter() - t0
+                    self._derived[name] = value
+        return value
+
+    def _build_all_derived(self):
+        for name in list(_DERIVED_BUILDERS):
+            self.derived(name)
+
+class SnapshotManager:
+    """원본 파일 mtime을 폴링해 바뀌면 백그라운드에서 새 스냅샷을 만들어 통째로 바꿔 끼운다.
+
+    요청은 시작할 때 current 하나를 잡고 끝까지 그 버전만 쓰므로
+    교체 중에도 진행 중인 요청은 영향을 받지 않는다.
+    """
+
+    def __init__(self, base_path=None, files=DATA_FILES):
+        self.base_path = base_path or _resolve_base_path()
+        self.files = tuple(files) + (_master_csv_path(self.base_path),)
+        self.last_error = None
+        self._version = 0
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+        self._entities = None
+        self._signature = self._file_signature()
+        self.current = self._build()
+
+    def _file_signature(self):
+        sig = []
+        for name in self.files:
+            try:
+                st = os.stat(os.path.join(self.base_path, name))
+                sig.append((name, st.st_mtime_ns, st.st_size))
+            except OSError:
+                sig.append((name, None, None))
+        return tuple(sig)
+
+    def _build(self):
+        t0 = time.perf_counter()
+        errors = []
+        fingerprint = hashlib.blake2b(repr(self._file_signature()).encode("utf-8"), digest_size=8).hexdigest()
+        data = _bootstrap_data(self.base_path, errors, entities=self._entities)
+        if errors and self._version > 0:
+            raise ValueError(f"원본 파일을 읽지 못했습니다: {', '.join(errors)}")
+        snap = DataSnapshot(self._version + 1, data, time.perf_counter() - t0, fingerprint)
+        # 등록된 파생 인덱스는 교체 전에 미리 빌드. 첫 스냅샷은 모듈 import 중이라 아직 등록이 없고,
+        # 각 모듈이 등록 직후(또는 첫 요청에서) 빌드한다. 어느 쪽이든 시간은 derived_seconds에 남는다
+        snap._build_all_derived()
+        self._version = snap.version
+        if data.get("entities") is not None:
+            self._entities = data["entities"]  # 다음 핫리로드는 여기서 이어서 (바뀐 칸만)
+        return snap
+
+    def reload(self, force=False):
+        """파일이 바뀌었으면(force면 무조건) 새 스냅샷을 만들어 교체. 교체했으면 True"""
+        with self._reload_lock:
+            sig = self._file_signature()
+            if not force and sig == self._signature:
+                return False
+            try:
+                snap = self._build()
+            except Exception as e:
+                self.last_error = str(e)
+                return False
+            self._signature = sig
+            self.last_error = None
+            self.current = snap  # 참조 교체 한 번 → 원자적
+            return True
+
+    def start_watching(self, interval=2.0):
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop.clear()
+
+        def _loop():
+            while not self._stop.wait(interval):
+                self.reload()
+
+        self._watcher = threading.Thread(target=_loop, name="snapshot-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+
+    def status(self):
+        snap = self.current
+        return {
+            "snapshot_version": snap.version,
+            "snapshot_source": "binary" if snap.data.get("place_store") is not None else "json",
+            "snapshot_build_ms": round(snap.build_seconds * 1000.0, 2),
+            "snapshot_index_ms": {name: round(s * 1000.0, 2) for name, s in snap.derived_seconds.items()},
+            "snapshot_built_at": snap.built_at,
+            "snapshot_watching": bool(self._watcher and self._watcher.is_alive()),
+            "snapshot_last_error": self.last_error,
+            "snapshot_entities": snap.data.get("entity_stats"),
+        }
+
+_SNAPSHOTS = SnapshotManager()
+
+def get_snapshot_manager():
+    return _SNAPSHOTS
+
+def get_snapshot():
+    return _SNAPSHOTS.current
 
 def get_all_data():
-    return _ALL_DATA
+    return _SNAPSHOTS.current.data
+
+def get_grid_bands():
+    return get_all_data()["grid_bands"]
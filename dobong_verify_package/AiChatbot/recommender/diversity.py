@@ -0,0 +1,67 @@
+# AiChatbot/recommender/diversity.py
+"""다양성 재정렬 (MMR, W_div).
+
+score_places 뒤에서 상위 후보 풀만 잘라 와, 이미 뽑힌 장소와 비슷한(같은 세부 분류/같은 출처 태그/가까운) 후보를
+깎아 가며 하나씩 고른다. 후보별 "뽑힌 것들과의 최대 유사도"를 뽑을 때마다 갱신하므로 O(k·풀 크기).
+"""
+import numpy as np
+
+from recommender.spatial import haversine_m
+
+# 유사도 구성 비율 (합 1)
+SIM_CATEGORY = 0.5
+SIM_TAG = 0.2
+SIM_NEAR = 0.3
+# 이 거리(m) 안이면 가까울수록 비슷하다고 본다
+NEAR_M = 500.0
+
+# 재정렬 후보 풀: 요청 개수의 POOL_FACTOR배 (최소 POOL_MIN개)
+POOL_FACTOR = 4
+POOL_MIN = 30
+# 이 깊이까지는 풀 크기를 고정한다 (MMR은 앞에서부터 하나씩 고르므로 풀이 같으면 offset 페이지가
+# 한 순위의 연속 구간이 된다. 요청 개수에 따라 풀이 바뀌면 페이지끼리 순서가 어긋남)
+POOL_DEPTH = 50
+
+
+def pool_size(limit):
+    return max(max(int(limit), POOL_DEPTH) * POOL_FACTOR, POOL_MIN)
+
+
+def _similarity(index, i, pool):
+    """장소 i와 후보 위치 배열 pool 사이의 유사도 (0~1)"""
+    cat = index.category[pool]
+    same_cat = (cat == index.category[i]) & (cat >= 0)
+    same_tag = (index.tag_mask[pool] & index.tag_mask[i]) != 0
+
+    sim = same_cat * SIM_CATEGORY + same_tag * SIM_TAG
+    if np.isfinite(index.lat[i]) and np.isfinite(index.lon[i]):
+        dist = haversine_m(index.lat[i], index.lon[i], index.lat[pool], index.lon[pool])
+        near = np.clip(1.0 - dist / NEAR_M, 0.0, 1.0)
+        sim = sim + np.nan_to_num(near) * SIM_NEAR
+    return sim
+
+
+def mmr_order(index, positions, scores, limit, diversity):
+    """점수 내림차순 후보(positions, scores)를 MMR로 다시 골라 앞 limit개의 순서(후보 내 번호)를 돌려준다.
+
+    diversity=0이면 원래 순서 그대로, 1이면 유사도만 본다. 관련도는 풀 안에서 0~1로 맞춰 쓴다.
+    """
+    n = len(positions)
+    limit = min(int(limit), n)
+    if diversity <= 0 or limit <= 1:
+        return np.arange(limit)
+
+    spread = float(scores.max() - scores.min()) if n else 0.0
+    rel = (scores - scores.min()) / spread if spread > 0 else np.zeros(n)
+
+    max_sim = np.zeros(n)
+    taken = np.zeros(n, dtype=bool)
+    order = []
+    for _ in range(limit):
+        mmr = (1.0 - diversity) * rel - diversity * max_sim
+        mmr[taken] = -np.inf
+        j = int(np.argmax(mmr))  # 동점이면 앞(원래 순위가 높은) 후보
+        order.append(j)
+        taken[j] = True
+        np.maximum(max_sim, _similarity(index, positions[j], positions), out=max_sim)
+    return np.asarray(order, dtype=np.int64)
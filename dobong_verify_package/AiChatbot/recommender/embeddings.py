@@ -0,0 +1,289 @@
+# AiChatbot/recommender/embeddings.py
+"""장소 임베딩 (의미 유사도 가중).
+
+오프라인에서 장소 본문을 임베더로 벡터화해 스냅샷 옆에 float32 행렬(.npy)로 저장하고,
+서버는 np.load(mmap_mode="r")로 열어 질의 벡터와 행렬-벡터 곱 한 번으로 유사도를 낸다.
+큰 코퍼스의 IVF 클러스터(중심 + 행별 번호)도 빌드할 때 같이 저장한다. 서버는 로드 시 임베딩/k-means를 하지 않는다
+(파일이 없거나 빠진 장소가 있으면 로그만 남기고 그 장소는 의미 가중 없이).
+임베더는 교체 가능: 기본은 네트워크 없이 도는 해싱 임베더, 필요하면 openai.
+
+빌드: python -m recommender.embeddings [--base tests] [--embedder hashing|hashing:512|openai]
+"""
+import os
+import json
+import hashlib
+import logging
+import argparse
+
+import numpy as np
+
+from recommender.cache import TTLCache
+from recommender.fileio import atomic_write
+from recommender.lexical import tokenize, document_text
+
+VECTORS_FILE = "places.vectors.npy"
+VECTORS_META_FILE = "places.vectors.json"
+VECTORS_IVF_FILE = "places.vectors.ivf.npz"
+DEFAULT_EMBEDDER = os.getenv("PLACE_EMBEDDER", "hashing")
+
+# 장소가 이 수 이상이면 IVF(클러스터) 사전 필터: 가까운 클러스터 IVF_NPROBE개만 계산
+IVF_MIN_PLACES = int(os.getenv("IVF_MIN_PLACES", "4096"))
+IVF_NPROBE = int(os.getenv("IVF_NPROBE", "8"))
+
+# 같은 질의 문장은 다시 임베딩하지 않는다
+_QUERY_VECTORS = TTLCache(maxsize=int(os.getenv("QUERY_EMBED_CACHE_SIZE", "4096")), ttl=0)
+
+log = logging.getLogger(__name__)
+
+
+def _normalize(mat):
+    norm = np.linalg.norm(mat, axis=1, keepdims=True)
+    norm[norm == 0] = 1.0
+    return (mat / norm).astype(np.float32)
+
+
+class HashingEmbedder:
+    """글자 2-gram + 어절을 해시로 dim 칸에 부호와 함께 더한 뒤 정규화 (결정적, 오프라인)"""
+
+    local = True
+
+    def __init__(self, dim=512):
+        self.dim = int(dim)
+        self.spec = f"hashing:{self.dim}"
+
+    def _features(self, text):
+        words = str(text or "").lower().split()
+        return tokenize(text) + words
+
+    def embed(self, texts):
+        out = np.zeros((len(texts), self.dim), dtype=np.float64)
+        for i, text in enumerate(texts):
+            for feat in self._features(text):
+                h = int.from_bytes(hashlib.blake2b(feat.encode("utf-8"), digest_size=8).digest(), "little")
+                out[i, h % self.dim] += 1.0 if (h >> 63) & 1 else -1.0
+        return _normalize(out)
+
+
+class OpenAIEmbedder:
+    """OpenAI 임베딩 API (openai 패키지 + OPENAI_API_KEY 필요)"""
+
+    local = False
+
+    def __init__(self, model=None):
+        try:
+            from openai import OpenAI
+        except ImportError as e:
+            raise RuntimeError("openai 임베더를 쓰려면 openai 패키지가 필요합니다") from e
+        self.model = model or os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+        self.spec = f"openai:{self.model}"
+        self._client = OpenAI()
+
+    def embed(self, texts, batch_size=256):
+        rows = []
+        for i in range(0, len(texts), batch_size):
+            resp = self._client.embeddings.create(model=self.model, input=list(texts[i:i + batch_size]))
+            rows.extend(d.embedding for d in resp.data)
+        return _normalize(np.asarray(rows, dtype=np.float64).reshape(len(texts), -1))
+
+
+EMBEDDERS = {"hashing": HashingEmbedder, "openai": OpenAIEmbedder}
+_INSTANCES = {}
+
+
+def get_embedder(spec=None):
+    """"이름" 또는 "이름:인자"(hashing:512, openai:text-embedding-3-large) → 임베더 (재사용)"""
+    spec = spec or DEFAULT_EMBEDDER
+    emb = _INSTANCES.get(spec)
+    if emb is None:
+        name, _, arg = spec.partition(":")
+        cls = EMBEDDERS.get(name)
+        if cls is None:
+            raise ValueError(f"알 수 없는 임베더: {spec}")
+        emb = _INSTANCES[spec] = cls(arg) if arg else cls()
+    return emb
+
+
+def query_vector(embedder, text):
+    key = (embedder.spec, text)
+    vec = _QUERY_VECTORS.get(key)
+    if vec is None:
+        vec = embedder.embed([text])[0]
+        vec.flags.writeable = False
+        _QUERY_VECTORS.put(key, vec)
+    return vec
+
+
+# ───────────────────────── 저장 / 열기 ─────────────────────────
+class PlaceVectors:
+    """디스크의 임베딩 행렬(memmap) + 행별 장소 id (+ 저장된 IVF 중심/행별 클러스터 번호)"""
+
+    def __init__(self, matrix, ids, spec, centroids=None, assign=None):
+        self.matrix = matrix
+        self.ids = ids
+        self.spec = spec
+        self.centroids = centroids
+        self.assign = assign
+
+
+def write_vectors(base_path, ids, matrix, spec, ivf=None):
+    """행렬(.npy) + 메타(.json) (+ IVF .npz, 없으면 옛 파일 삭제)를 임시 파일에 쓰고 교체"""
+    vec_path = os.path.join(base_path, VECTORS_FILE)
+    meta_path = os.path.join(base_path, VECTORS_META_FILE)
+    ivf_path = os.path.join(base_path, VECTORS_IVF_FILE)
+    with atomic_write(vec_path) as fv, atomic_write(meta_path, "w", encoding="utf-8") as fm:
+        np.save(fv, np.ascontiguousarray(matrix, dtype=np.float32))
+        json.dump({"embedder": spec, "dim": int(matrix.shape[1]), "ids": list(ids)}, fm, ensure_ascii=False)
+        if ivf is not None:
+            with atomic_write(ivf_path) as f:
+                np.savez(f, centroids=ivf[0].astype(np.float32), assign=ivf[1].astype(np.int32))
+        elif os.path.exists(ivf_path):
+            os.remove(ivf_path)
+    return vec_path
+
+
+def _open_ivf(base_path, n):
+    """저장된 IVF (중심, 행별 번호). 없거나 행 수가 다르면 (None, None)"""
+    try:
+        with np.load(os.path.join(base_path, VECTORS_IVF_FILE)) as z:
+            centroids, assign = z["centroids"], z["assign"].astype(np.int64)
+    except (OSError, ValueError, KeyError):
+        return None, None
+    if len(assign) != n or (len(assign) and (assign.min() < 0 or assign.max() >= len(centroids))):
+        return None, None
+    return centroids, assign
+
+
+def open_vectors(base_path):
+    """저장된 임베딩이 있고 형태가 맞으면 PlaceVectors, 아니면 None"""
+    try:
+        with open(os.path.join(base_path, VECTORS_META_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        matrix = np.load(os.path.join(base_path, VECTORS_FILE), mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+    ids = meta.get("ids") or []
+    if matrix.ndim != 2 or matrix.shape[0] != len(ids) or matrix.dtype != np.float32:
+        return None
+    centroids, assign = _open_ivf(base_path, len(ids))
+    return PlaceVectors(matrix, ids, meta.get("embedder") or DEFAULT_EMBEDDER, centroids, assign)
+
+
+# ───────────────────────── 검색 ─────────────────────────
+def _kmeans(matrix, k, iters=10, seed=0):
+    """코사인(정규화 벡터) k-means → (중심 행렬, 행별 클러스터 번호)"""
+    rng = np.random.default_rng(seed)
+    centroids = matrix[rng.choice(len(matrix), size=k, replace=False)].astype(np.float32)
+    assign = np.zeros(len(matrix), dtype=np.int64)
+    for _ in range(iters):
+        assign = np.argmax(matrix @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, matrix)
+        empty = np.bincount(assign, minlength=k) == 0
+        sums[empty] = centroids[empty]
+        centroids = _normalize(sums)
+    return centroids, assign
+
+
+def build_ivf(matrix):
+    """장소가 IVF_MIN_PLACES 이상이면 (중심, 행별 클러스터 번호), 아니면 None (오프라인 빌드용)"""
+    n = len(matrix)
+    if n < IVF_MIN_PLACES:
+        return None
+    return _kmeans(np.asarray(matrix), max(1, int(np.sqrt(n))))
+
+
+class VectorIndex:
+    """인덱스 위치 순서로 맞춘 임베딩 행렬 + (저장된 클러스터가 있으면) IVF 목록
+
+    assign은 행별 클러스터 번호 (-1이면 어느 목록에도 넣지 않음: 벡터가 없는 장소).
+    """
+
+    def __init__(self, matrix, embedder, centroids=None, assign=None):
+        self.matrix = matrix
+        self.embedder = embedder
+        self.centroids = None
+        self.lists = None
+        if centroids is not None and assign is not None:
+            k = len(centroids)
+            keep = np.flatnonzero(assign >= 0)
+            order = keep[np.argsort(assign[keep], kind="stable")]
+            bounds = np.searchsorted(assign[order], np.arange(k + 1))
+            self.centroids = centroids
+            self.lists = [order[bounds[c]:bounds[c + 1]] for c in range(k)]
+
+    def __len__(self):
+        return len(self.matrix)
+
+    def similarity(self, text):
+        """질의 문장 → (위치 배열, 코사인 유사도 배열)"""
+        q = query_vector(self.embedder, text)
+        if self.centroids is None:
+            return np.arange(len(self.matrix)), self.matrix @ q
+        probe = np.argsort(-(self.centroids @ q))[:IVF_NPROBE]
+        cand = np.sort(np.concatenate([self.lists[c] for c in probe]))
+        return cand, self.matrix[cand] @ q
+
+    @classmethod
+    def for_places(cls, ids, stored=None):
+        """인덱스 id 순서에 맞춘 VectorIndex (로드 시 임베딩/클러스터링은 하지 않는다).
+
+        저장본이 없으면 None, 저장본에 없는 장소는 영벡터(의미 가중 0)로 두고 로그를 남긴다.
+        """
+        ids = list(ids)
+        if stored is None:
+            log.warning("장소 임베딩 파일(%s)이 없어 의미 유사도 가중을 끕니다 "
+                        "(python -m recommender.embeddings로 빌드)", VECTORS_FILE)
+            return None
+        embedder = get_embedder(stored.spec)
+        if list(stored.ids) == ids:
+            return cls(stored.matrix, embedder, stored.centroids, stored.assign)  # 순서가 같으면 memmap 그대로
+
+        rows = {pid: r for r, pid in enumerate(stored.ids)}
+        hit = [i for i, pid in enumerate(ids) if pid in rows]
+        if not hit:
+            log.warning("장소 임베딩 파일이 현재 데이터와 맞지 않아 의미 유사도 가중을 끕니다 (다시 빌드 필요)")
+            return None
+        if len(hit) < len(ids):
+            log.warning("장소 %d곳이 임베딩 파일에 없어 의미 가중 없이 둡니다 (다시 빌드 필요)", len(ids) - len(hit))
+
+        src = [rows[ids[i]] for i in hit]
+        matrix = np.zeros((len(ids), stored.matrix.shape[1]), dtype=np.float32)
+        matrix[hit] = stored.matrix[src]
+        matrix.flags.writeable = False
+        assign = None
+        if stored.assign is not None:
+            assign = np.full(len(ids), -1, dtype=np.int64)
+            assign[hit] = stored.assign[src]
+        return cls(matrix, embedder, stored.centroids, assign)
+
+
+def build_vectors(base_path=None, spec=None):
+    """장소 JSON을 읽어 본문을 임베딩하고 스냅샷 옆에 저장"""
+    from recommender.data_loader import _bootstrap_data, _resolve_base_path
+    from recommender.scoring import _to_id
+
+    base_path = base_path or _resolve_base_path()
+    data = _bootstrap_data(base_path, use_snapshot=False)
+    merged = {}
+    for key in ("핫플", "느좋"):
+        for p in data.get(key, []) or []:
+            pid = _to_id(p)
+            if pid:
+                merged[pid] = p
+
+    embedder = get_embedder(spec)
+    matrix = embedder.embed([document_text(p) for p in merged.values()])
+    return write_vectors(base_path, merged.keys(), matrix, embedder.spec, build_ivf(matrix)), matrix.shape
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="장소 본문 → 임베딩 행렬(.npy) 빌드")
+    ap.add_argument("--base", default=None, help="원본 JSON 폴더 (기본: AiChatbot/tests)")
+    ap.add_argument("--embedder", default=None, help=f"임베더 (기본: {DEFAULT_EMBEDDER})")
+    args = ap.parse_args(argv)
+    path, shape = build_vectors(args.base, args.embedder)
+    print(f"[✔] {shape[0]}개 장소 × {shape[1]}차원 → {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+# AiChatbot/recommender/entities.py
+"""출처가 다른 같은 장소(근접 중복) 묶기.
+
+"○○카페"와 "○○ 카페 도봉점"처럼 이름 표기가 조금 다르고 좌표가 몇 m 떨어진 레코드를 한 장소로 합친다.
+좌표를 반경 크기 칸으로 나눠(공간 블로킹) 이웃 칸 안의 장소끼리만 정규화 이름 유사도를 비교하므로
+전체 쌍 비교(O(n²)) 없이 끝난다. 이전 결과(상태)를 주면 바뀐 장소 주변 칸만 다시 묶는다.
+
+    python -m recommender.entities        # → tests/places.entities.json (서버가 시작할 때 이어서 사용)
+"""
+import os, re, json, math, hashlib, argparse, unicodedata
+
+from recommender.fileio import atomic_write
+from recommender.scoring import _to_id
+from recommender.spatial import M_PER_DEG_LAT
+
+ENTITIES_FILE = "places.entities.json"
+ENTITY_STATE_VERSION = 1
+
+# 같은 장소로 볼 최대 거리(m, 0이면 끔)와 정규화 이름 유사도(바이그램 Dice) 하한
+DEDUP_RADIUS_M = float(os.getenv("DEDUP_RADIUS_M", "60"))
+DEDUP_NAME_SIM = float(os.getenv("DEDUP_NAME_SIM", "0.8"))
+
+# 경도 칸 폭은 위도 60°(cos=0.5)까지 반경 이상이 되게 → 칸 구성이 데이터와 무관하게 고정
+_LON_FACTOR = 2.0
+
+_BRACKETS = re.compile(r"\([^)]*\)|\[[^\]]*\]")
+# 마지막 단어가 "도봉점", "창동역점", "본점" 같은 지점명이면 뗀다
+_BRANCH = re.compile(r"\s+(\S{0,8}점)$")
+_NOT_BRANCH = {"편의점", "음식점", "백화점", "할인점", "전문점", "판매점", "대리점", "정육점"}
+_NON_WORD = re.compile(r"[\W_]+")
+_ID_FIELDS = ("id", "placeId", "place_id", "name")
+
+# 대표 레코드를 고를 때 보는 필드 (많이 채워진 쪽, 같으면 리뷰 수가 많은 쪽)
+_COMPLETENESS_FIELDS = (
+    "address", "imageUrl", "description", "openingHours", "phone",
+    "rating", "reviewCount", "priceLevel", "mapsUrl",
+)
+
+
+def normalize_name(name):
+    """비교용 이름: NFKC + 소문자, 괄호/지점명/공백·기호 제거"""
+    s = unicodedata.normalize("NFKC", str(name or "")).lower()
+    s = _BRACKETS.sub(" ", s).strip()
+    m = _BRANCH.search(s)
+    if m and m.group(1) not in _NOT_BRANCH:
+        s = s[:m.start()]
+    return _NON_WORD.sub("", s)
+
+
+def _bigrams(s):
+    return {s[i:i + 2] for i in range(len(s) - 1)} if len(s) > 1 else {s}
+
+
+def name_similarity(a, b):
+    """정규화 이름 두 개의 바이그램 Dice 계수 (0~1)"""
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    ga, gb = _bigrams(a), _bigrams(b)
+    return 2.0 * len(ga & gb) / (len(ga) + len(gb))
+
+
+def _cell(lat, lon, radius_m):
+    dlat = radius_m / M_PER_DEG_LAT
+    return (math.floor(lat / dlat), math.floor(lon / (dlat * _LON_FACTOR)))
+
+
+def _distance_m(lat1, lon1, lat2, lon2):
+    # 반경 수십 m 비교라 등장방형 근사로 충분 (쌍마다 numpy 호출을 피함)
+    dy = (lat2 - lat1) * M_PER_DEG_LAT
+    dx = (lon2 - lon1) * M_PER_DEG_LAT * math.cos(math.radians((lat1 + lat2) / 2.0))
+    return math.hypot(dx, dy)
+
+
+def _signature(norm, lat, lon):
+    return hashlib.blake2b(f"{norm}|{lat:.6f}|{lon:.6f}".encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _find(parent, x):
+    while parent[x] != x:
+        parent[x] = parent[parent[x]]
+        x = parent[x]
+    return x
+
+
+def cluster_places(points, previous=None, radius_m=None, min_sim=None):
+    """points [(id, 이름, lat, lon)] → ({id: 묶음 키}, 새 상태, 통계).
+
+    묶음 키는 묶음 안에서 가장 작은 id. previous(이전 상태)와 설정이 같으면
+    새로 생기거나/바뀌거나/빠진 장소의 칸과 그 이웃 칸, 그 칸에 걸친 이전 묶음만 다시 계산한다.
+    """
+    radius_m = DEDUP_RADIUS_M if radius_m is None else radius_m
+    min_sim = DEDUP_NAME_SIM if min_sim is None else min_sim
+    params = [ENTITY_STATE_VERSION, radius_m, min_sim]
+    previous = previous or {}
+    prev = (previous.get("places") or {}) if previous.get("params") == params else {}
+
+    cur = {}
+    for pid, name, lat, lon in points:
+        norm = normalize_name(name)
+        if radius_m <= 0 or not norm or lat is None or lon is None:
+            continue
+        try:
+            lat, lon = float(lat), float(lon)
+        except (TypeError, ValueError):
+            continue
+        if not (math.isfinite(lat) and math.isfinite(lon)):
+            continue
+        cur[pid] = (norm, lat, lon, _cell(lat, lon, radius_m), _signature(norm, lat, lon))
+
+    # 바뀐 칸: 새로 생기거나 바뀐 장소의 지금 칸 + 바뀌거나 빠진 장소의 이전 칸
+    changed_cells, dirty_keys = set(), set()
+    for pid, (_, _, _, cell, sig) in cur.items():
+        old = prev.get(pid)
+        if old is None or old[0] != sig:
+            changed_cells.add(cell)
+            if old is not None:
+                changed_cells.add(tuple(old[1]))
+                dirty_keys.add(old[2])
+    for pid, old in prev.items():
+        if pid not in cur:
+            changed_cells.add(tuple(old[1]))
+            dirty_keys.add(old[2])
+    dirty_cells = {(r + dr, c + dc) for r, c in changed_cells for dr in (-1, 0, 1) for dc in (-1, 0, 1)}
+    for pid, v in cur.items():
+        if v[3] in dirty_cells and pid in prev:
+            dirty_keys.add(prev[pid][2])
+
+    # 다시 묶을 장소: 바뀐 것 + 바뀐 칸 주변 + 그 칸에 걸친 이전 묶음 전체
+    # (안 바뀐 두 장소의 비교 결과는 그대로이므로, 이 밖의 장소와 새로 묶일 수 없다)
+    keys, dirty = {}, []
+    for pid, v in cur.items():
+        old = prev.get(pid)
+        if old is None or old[0] != v[4] or v[3] in dirty_cells or old[2] in dirty_keys:
+            dirty.append(pid)
+        else:
+            keys[pid] = old[2]
+
+    # 이름 블로킹(prefix filtering): 바이그램을 드문 순으로 정렬해 앞쪽 몇 개만 (칸, 바이그램)으로 색인.
+    # Dice가 하한 이상인 두 이름은 서로의 앞쪽 바이그램을 하나 이상 공유하므로 후보에서 빠지지 않는다.
+    grams = {pid: _bigrams(cur[pid][0]) for pid in dirty}
+    freq = {}
+    for g in grams.values():
+        for t in g:
+            freq[t] = freq.get(t, 0) + 1
+    prefixes, postings = {}, {}
+    for pid in dirty:
+        g = sorted(grams[pid], key=lambda t: (freq[t], t))
+        need = max(1, math.ceil(min_sim * len(g) / (2.0 - min_sim) - 1e-9))
+        prefixes[pid] = g[:len(g) - need + 1]
+        for t in prefixes[pid]:
+            postings.setdefault((cur[pid][3], t), []).append(pid)
+
+    order = {pid: i for i, pid in enumerate(dirty)}
+    parent = {pid: pid for pid in dirty}
+    comparisons = 0
+    for a in dirty:
+        na, lat_a, lon_a, (r, c), _ = cur[a]
+        ga, ia, seen = grams[a], order[a], set()
+        for dr in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                for t in prefixes[a]:
+                    for b in postings.get(((r + dr, c + dc), t), ()):
+                        if order[b] <= ia or b in seen:
+                            continue
+                        seen.add(b)
+                        comparisons += 1
+                        gb = grams[b]
+                        if na != cur[b][0] and 2.0 * len(ga & gb) < min_sim * (len(ga) + len(gb)):
+                            continue
+                        if _distance_m(lat_a, lon_a, cur[b][1], cur[b][2]) > radius_m:
+                            continue
+                        ra, rb = _find(parent, a), _find(parent, b)
+                        if ra != rb:
+                            parent[max(ra, rb, key=str)] = min(ra, rb, key=str)
+
+    groups = {}
+    for pid in dirty:
+        groups.setdefault(_find(parent, pid), []).append(pid)
+    for members in groups.values():
+        key = min(members, key=str)
+        for pid in members:
+            keys[pid] = key
+
+    state = {
+        "params": params,
+        "places": {pid: [v[4], list(v[3]), keys[pid]] for pid, v in cur.items()},
+    }
+    stats = {
+        "places": len(cur),
+        "recomputed": len(dirty),
+        "comparisons": comparisons,
+        "duplicates": len(cur) - len(set(keys.values())),
+    }
+    return keys, state, stats
+
+
+def _empty(v):
+    return v is None or v == "" or v == [] or (isinstance(v, float) and math.isnan(v))
+
+
+def _completeness(p):
+    filled = sum(1 for k in _COMPLETENESS_FIELDS if not _empty(p.get(k)))
+    try:
+        reviews = float(p.get("reviewCount") or 0.0)
+    except (TypeError, ValueError):
+        reviews = 0.0
+    return filled, reviews if math.isfinite(reviews) else 0.0
+
+
+def merge_records(records):
+    """같은 장소 레코드들 → 대표 레코드 (가장 많이 채워진 것 기준, 빈 필드는 나머지로 채우고 태그는 합침)"""
+    ordered = sorted(records, key=_completeness, reverse=True)
+    out = dict(ordered[0])
+    tags = list(out.get("tags") or [])
+    for other in ordered[1:]:
+        for k, v in other.items():
+            if k != "tags" and _empty(out.get(k)) and not _empty(v):
+                out[k] = v
+        for t in other.get("tags") or []:
+            if t not in tags:
+                tags.append(t)
+    out["tags"] = tags
+    return out
+
+
+def resolve_data(data, previous=None, sources=("핫플", "느좋")):
+    """_bootstrap_data의 장소 목록에서 근접 중복을 대표 레코드 하나로 합친다 (제자리 수정) → (상태, 통계).
+
+    대표가 아닌 레코드는 목록에서 빠지고(대표가 그 목록에 없으면 그 자리에 대표가 들어감),
+    *_low id 목록의 id도 대표 id로 바뀐다. 대표 레코드의 merged_ids에 합쳐진 id가 남는다.
+    """
+    records = {}
+    for source in sources:
+        for p in data.get(source) or []:
+            pid = _to_id(p)
+            if pid:
+                records.setdefault(pid, []).append(p)
+
+    points = [
+        (pid, recs[0].get("name"),
+         recs[0].get("latitude", recs[0].get("lat")), recs[0].get("longitude", recs[0].get("lon")))
+        for pid, recs in records.items()
+    ]
+    keys, state, stats = cluster_places(points, previous)
+
+    groups = {}
+    for pid, key in keys.items():
+        groups.setdefault(key, []).append(pid)
+    canonical, merged = {}, {}
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        best = max(members, key=lambda pid: _completeness(records[pid][0]))
+        rec = merge_records([r for pid in members for r in records[pid]])
+        for k in _ID_FIELDS:  # 빈 id 필드가 다른 레코드 값으로 채워지면 _to_id가 바뀌므로 대표 것으로 되돌림
+            if k in records[best][0]:
+                rec[k] = records[best][0][k]
+            else:
+                rec.pop(k, None)
+        rec["merged_ids"] = sorted((pid for pid in members if pid != best), key=str)
+        merged[best] = rec
+        for pid in members:
+            canonical[pid] = best
+    stats["merged_groups"] = len(merged)
+    if not canonical:
+        return state, stats
+
+    for source in sources:
+        out, placed = [], set()
+        for p in data.get(source) or []:
+            pid = _to_id(p)
+            best = canonical.get(pid)
+            if best is None:
+                out.append(p)
+            elif best not in placed:
+                placed.add(best)
+                out.append(dict(merged[best]))
+        data[source] = out
+        low_key = f"{source}_low"
+        if data.get(low_key) is not None:
+            low = [canonical.get(pid, pid) for pid in data[low_key]]
+            data[low_key] = list(dict.fromkeys(low))
+    return state, stats
+
+
+def load_entities(base_path):
+    """오프라인으로 저장해 둔 묶음 상태 (없거나 못 읽으면 None)"""
+    try:
+        with open(os.path.join(base_path, ENTITIES_FILE), "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if isinstance(state, dict) else None
+
+
+def build_entities(base_path=None):
+    """장소 JSON을 읽어 근접 중복을 묶고 상태 파일로 저장 → (경로, 통계)"""
+    from recommender.data_loader import _bootstrap_data, _resolve_base_path
+
+    base_path = base_path or _resolve_base_path()
+    data = _bootstrap_data(base_path, use_snapshot=False)
+    path = os.path.join(base_path, ENTITIES_FILE)
+    with atomic_write(path, "w", encoding="utf-8") as f:
+        json.dump(data["entities"], f, ensure_ascii=False, separators=(",", ":"))
+    return path, data["entity_stats"]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="근접 중복 장소 묶기 (공간 블로킹 + 이름 유사도)")
+    ap.add_argument("--base", default=None, help="원본 JSON 폴더 (기본: AiChatbot/tests)")
+    args = ap.parse_args(argv)
+    path, stats = build_entities(args.base)
+    print(
+        f"[✔] {stats['places']}개 장소 중 중복 {stats['duplicates']}개 → {stats['merged_groups']}곳으로 합침 "
+        f"(다시 계산 {stats['recomputed']}, 비교 {stats['comparisons']}쌍) → {path}"
+    )
+
+
+if __name__ == "__main__":
+    main()
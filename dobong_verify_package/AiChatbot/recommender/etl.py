@@ -0,0 +1,397 @@
+# AiChatbot/recommender/etl.py
+"""장소 CSV → 서버용 dobong_*.json 증분 파이프라인 (csvtojson / hotplace 노트북 대체).
+
+places_master.csv, places_sources.csv를 한 줄씩 읽어 정제(제외어/중복) → 분류(느좋/숨은핫플) →
+밴드(low20/low50 격자) → 내보내기 순으로 처리한다. 장소마다 입력 내용 해시를 상태 파일에 남겨 두고,
+다시 돌리면 바뀐 장소만 다시 분류/판정한다. 출력은 내용이 바뀐 파일만 임시 파일 → 교체로 쓴다.
+
+    python -m recommender.etl                       # selectplace/*.csv → build/data/dobong_*.json
+    python -m recommender.etl --out /tmp/data --dry-run
+
+서버 데이터 폴더(tests/ 또는 DOBONG_DATA_DIR)에 바로 쓰려면 --out으로 직접 지정한다 (핫리로드가 바로 읽음).
+카테고리 하나라도 비어 나오면 쓰지 않고 멈춘다 (--force로 무시).
+"""
+import os, csv, json, time, hashlib, argparse
+
+import numpy as np
+
+from recommender.fileio import APP_DIR, BUILD_DIR, fingerprint as _fingerprint, write_if_changed as _write_if_changed
+from recommender.grid_bands import GridBandLookup
+from recommender.scoring import BAND_LOW20
+
+SELECTPLACE_DIR = os.path.join(os.path.dirname(APP_DIR), "selectplace")
+STATE_FILE = "etl_state.json"
+
+# 분류 규칙이 바뀌면 올린다 (상태 파일의 분류 결과를 전부 버리고 다시 계산)
+PIPELINE_VERSION = 1
+
+# 프랜차이즈 / 소음·유흥
+EXCLUDE_WORDS = (
+    "스타벅스", "이디야", "빽다방", "메가커피", "더벤티",
+    "노래방", "PC방", "멀티방", "유흥", "룸", "단란주점",
+)
+
+# OSM 태그 → 기본 타입 (앞쪽이 우선)
+BASE_BY_TAG = (
+    ("amenity", "cafe", "카페/베이커리"),
+    ("shop", "bakery", "카페/베이커리"),
+    ("amenity", "library", "도서관"),
+    ("leisure", "park", "공원/정원"),
+    ("leisure", "garden", "공원/정원"),
+    ("tourism", "viewpoint", "전망/명소"),
+    ("tourism", "attraction", "전망/명소"),
+    ("highway", "footway", "산책로/둘레길"),
+    ("route", "hiking", "산책로/둘레길"),
+    ("amenity", "restaurant", "식당"),
+    ("amenity", "bar", "바/펍"),
+    ("amenity", "pub", "바/펍"),
+    ("shop", "books", "서점"),
+    ("tourism", "gallery", "문화공간"),
+    ("amenity", "arts_centre", "문화공간"),
+)
+# base_type 열(OSM 값 대문자, 카카오 카테고리 코드) → 기본 타입 (태그가 없을 때)
+BASE_BY_TYPE = {
+    "CAFE": "카페/베이커리", "BAKERY": "카페/베이커리", "CE7": "카페/베이커리",
+    "LIBRARY": "도서관", "PARK": "공원/정원", "GARDEN": "공원/정원",
+    "VIEWPOINT": "전망/명소", "ATTRACTION": "전망/명소",
+    "FOOTWAY": "산책로/둘레길", "HIKING": "산책로/둘레길",
+    "RESTAURANT": "식당", "FD6": "식당", "BAR": "바/펍", "PUB": "바/펍",
+    "BOOKS": "서점", "GALLERY": "문화공간", "ARTS_CENTRE": "문화공간",
+}
+CAFE_CALM_WORDS = ("티룸", "전통", "다도", "tea", "루프탑", "뷰", "창가", "사진", "포토", "감성", "브런치",
+                   "로스터리", "핸드드립", "스페셜티")
+CAFE_HIDDEN_WORDS = ("골목", "소규모", "작은", "디저트", "케이크", "타르트", "베이킹", "클래스", "공방")
+NIGHT_VIEW_WORDS = ("야경", "노을", "일몰")
+
+TOP_CATEGORIES = ("느좋", "숨은핫플")
+UNCLASSIFIED = "미분류"
+
+OUTPUT_FILES = {
+    "느좋": "dobong_neujoh.json",
+    "숨은핫플": "dobong_hotple.json",
+    "느좋_low": "dobong_neujoh_in_low.json",
+    "숨은핫플_low": "dobong_hotple_in_low.json",
+}
+_ENVELOPE = {"success": True, "httpStatus": 200, "message": "요청이 성공적으로 처리되었습니다."}
+
+
+RULES_FINGERPRINT = _fingerprint([
+    PIPELINE_VERSION, EXCLUDE_WORDS, BASE_BY_TAG, BASE_BY_TYPE,
+    CAFE_CALM_WORDS, CAFE_HIDDEN_WORDS, NIGHT_VIEW_WORDS,
+])
+
+
+# ───────────────────────── 1) 읽기 / 정제 ─────────────────────────
+def read_rows(path):
+    """CSV를 한 줄씩 dict로 (파일이 없으면 빈 스트림)"""
+    try:
+        f = open(path, "r", encoding="utf-8-sig", newline="")
+    except OSError:
+        return
+    with f:
+        yield from csv.DictReader(f)
+
+
+def _float(v):
+    try:
+        x = float(v)
+    except (TypeError, ValueError):
+        return None
+    return x if np.isfinite(x) else None
+
+
+def normalize_row(row):
+    """CSV 행 → 정규화 행 (이름/좌표가 없거나 제외어면 None)"""
+    name = " ".join(str(row.get("name") or "").split())
+    lat, lon = _float(row.get("lat")), _float(row.get("lon"))
+    if not name or lat is None or lon is None:
+        return None
+    if any(w.lower() in name.lower() for w in EXCLUDE_WORDS):
+        return None
+    return {
+        "name": name,
+        "address": (row.get("address") or "").strip(),
+        "lat": lat,
+        "lon": lon,
+        "base_type": (row.get("base_type") or "").strip(),
+        "top_category": (row.get("top_category") or "").strip(),
+        "sub_category": (row.get("sub_category") or "").strip(),
+        "sources": sorted({s for s in [(row.get("source") or "").strip()] if s}),
+        "raw": row.get("raw") or row.get("raw_tags") or "",
+    }
+
+
+def place_key(row):
+    """근접 중복 기준: 이름 + 좌표 소수 5자리 (노트북과 같음)"""
+    return f"{row['name']}|{row['lat']:.5f}|{row['lon']:.5f}"
+
+
+def merge_rows(paths, stats):
+    """여러 CSV를 순서대로 흘려 같은 장소끼리 합친다 (앞 파일 우선, 빈 필드만 뒤 파일로 채움)"""
+    merged = {}
+    for path in paths:
+        for raw in read_rows(path):
+            stats["rows"] += 1
+            row = normalize_row(raw)
+            if row is None:
+                stats["skipped"] += 1
+                continue
+            key = place_key(row)
+            cur = merged.get(key)
+            if cur is None:
+                merged[key] = row
+                continue
+            for k, v in row.items():
+                if k == "sources":
+                    cur[k] = sorted(set(cur[k]) | set(v))
+                elif v and not cur.get(k):
+                    cur[k] = v
+    return merged
+
+
+def row_hash(row):
+    return _fingerprint(row)
+
+
+# ───────────────────────── 2) 분류 ─────────────────────────
+def _tags(row):
+    try:
+        tags = json.loads(row.get("raw") or "{}")
+    except ValueError:
+        return {}
+    return tags if isinstance(tags, dict) else {}
+
+
+def base_type_of(tags, base_type=""):
+    for key, value, base in BASE_BY_TAG:
+        if tags.get(key) == value:
+            return base
+    return BASE_BY_TYPE.get(base_type.upper(), "기타")
+
+
+def classify(row):
+    """→ (기본 타입, 상위, 세부). master에 이미 느좋/숨은핫플 분류가 있으면 그것을 쓴다."""
+    tags = _tags(row)
+    base = base_type_of(tags, row.get("base_type") or "")
+    if row.get("top_category") in TOP_CATEGORIES:
+        return base, row["top_category"], row.get("sub_category") or UNCLASSIFIED
+
+    name = row["name"].lower()
+    top, sub = UNCLASSIFIED, UNCLASSIFIED
+    if base == "공원/정원":
+        top, sub = "느좋", "근린공원/정원"
+    elif base == "산책로/둘레길":
+        top, sub = "느좋", "둘레길/숲길"
+    elif base == "도서관":
+        top, sub = "느좋", "작은도서관"
+    elif base == "전망/명소":
+        top, sub = "느좋", "야경스팟" if any(k in name for k in NIGHT_VIEW_WORDS) else "전망대"
+    elif base == "카페/베이커리":
+        if any(k in name for k in CAFE_CALM_WORDS):
+            top, sub = "느좋", "독립/감성카페"
+        elif any(k in name for k in CAFE_HIDDEN_WORDS):
+            top, sub = "숨은핫플", "골목/디저트카페"
+    elif base == "식당":
+        top, sub = "숨은핫플", "개성있는 식당"
+    elif base == "바/펍":
+        top, sub = "숨은핫플", "특색있는 바/펍"
+    elif base == "서점":
+        top, sub = "숨은핫플", "독립/테마서점"
+    elif base == "문화공간":
+        top, sub = "숨은핫플", "갤러리/문화공간"
+    return base, top, sub
+
+
+# ───────────────────────── 3) 밴드 ─────────────────────────
+def _load_geojson(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"type": "FeatureCollection", "features": []}
+
+
+def load_grids(grids_dir):
+    """→ (GridBandLookup, 격자 파일 내용 지문)"""
+    low20 = _load_geojson(os.path.join(grids_dir, "low20_grids.geojson"))
+    low50 = _load_geojson(os.path.join(grids_dir, "low50_grids.geojson"))
+    return GridBandLookup(low20, low50), _fingerprint([low20, low50])
+
+
+def band_rows(lookup, rows):
+    """정규화 행 목록 → [밴드, grid_id, rank_pct] 목록 (좌표 배열로 한 번에 판정)"""
+    if not rows:
+        return []
+    lat = np.array([r["lat"] for r in rows], dtype=np.float64)
+    lon = np.array([r["lon"] for r in rows], dtype=np.float64)
+    cell = lookup.locate(lat, lon)
+    out = []
+    for c in cell.tolist():
+        if c < 0:
+            out.append([0, None, None])
+            continue
+        rank = float(lookup.rank_pct[c])
+        out.append([int(lookup.band[c]), int(lookup.grid_id[c]), None if np.isnan(rank) else rank])
+    return out
+
+
+# ───────────────────────── 4) 내보내기 ─────────────────────────
+def place_id(key):
+    return "place_" + hashlib.blake2b(key.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def to_record(key, row, labels):
+    """정규화 행 → 서버 장소 레코드 (Google 수집본과 같은 필드 + 분류 필드)"""
+    tags = _tags(row)
+    base, top, sub = labels
+    lat, lon = row["lat"], row["lon"]
+    return {
+        "placeId": place_id(key),
+        "name": row["name"],
+        "address": row["address"] or None,
+        "latitude": lat,
+        "longitude": lon,
+        "distanceMeters": None,
+        "distanceText": None,
+        "imageUrl": None,
+        "description": tags.get("description") or None,
+        "openingHours": None,
+        "priceLevel": None,
+        "mapsUrl": f"https://maps.google.com/?q={lat},{lon}",
+        "phone": tags.get("phone") or tags.get("contact:phone") or tags.get("phone_number") or None,
+        "rating": None,
+        "reviewCount": None,
+        "top_category": top,
+        "sub_category": sub,
+        "base_type": base,
+    }
+
+
+def _encode(items):
+    return json.dumps(dict(_ENVELOPE, data=items), ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _load_state(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return state if state.get("version") == PIPELINE_VERSION else {}
+
+
+# ───────────────────────── 파이프라인 ─────────────────────────
+def run_pipeline(inputs, out_dir, grids_dir=None, dry_run=False, force=False):
+    """inputs(CSV 경로, 앞이 우선) → out_dir/dobong_*.json. 처리 통계 dict를 돌려준다.
+
+    느좋/숨은핫플 중 빈 카테고리가 있으면 (force가 아니면) 아무 파일도 쓰지 않고 ValueError.
+    """
+    t0 = time.perf_counter()
+    stats = {"rows": 0, "skipped": 0, "places": 0, "reused": 0, "classified": 0, "banded": 0, "removed": 0}
+
+    state_path = os.path.join(out_dir, STATE_FILE)
+    state = _load_state(state_path)
+    old = state.get("places") or {}
+    same_rules = state.get("rules") == RULES_FINGERPRINT
+    lookup, grids_fp = load_grids(grids_dir or out_dir)
+    same_grids = state.get("grids") == grids_fp
+
+    merged = merge_rows(inputs, stats)
+    stats["places"] = len(merged)
+
+    places, to_band = {}, []
+    for key, row in merged.items():
+        h = row_hash(row)
+        prev = old.get(key)
+        unchanged = prev is not None and prev.get("hash") == h
+        entry = {"hash": h}
+        if unchanged and same_rules:
+            entry["labels"] = prev["labels"]
+        else:
+            entry["labels"] = list(classify(row))
+            stats["classified"] += 1
+        if unchanged and same_grids and "band" in prev:
+            entry["band"] = prev["band"]
+        else:
+            to_band.append(key)
+        if unchanged and same_rules and same_grids:
+            stats["reused"] += 1
+        places[key] = entry
+    stats["removed"] = sum(1 for key in old if key not in places)
+
+    for key, band in zip(to_band, band_rows(lookup, [merged[k] for k in to_band])):
+        places[key]["band"] = band
+    stats["banded"] = len(to_band)
+
+    outputs = {name: [] for name in OUTPUT_FILES}
+    for key, entry in places.items():
+        top = entry["labels"][1]
+        if top not in TOP_CATEGORIES:
+            continue
+        rec = to_record(key, merged[key], entry["labels"])
+        outputs[top].append(rec)
+        if entry["band"][0] >= BAND_LOW20:
+            outputs[top + "_low"].append(rec)
+
+    empty = [name for name in TOP_CATEGORIES if not outputs[name]]
+    if empty and not dry_run and not force:
+        raise ValueError(
+            f"빈 카테고리({', '.join(empty)})가 나와 {out_dir}에 쓰지 않았습니다 "
+            f"(입력 CSV를 확인하거나 --force)"
+        )
+
+    written, unchanged = [], []
+    if not dry_run:
+        os.makedirs(out_dir, exist_ok=True)
+        for name, filename in OUTPUT_FILES.items():
+            items = sorted(outputs[name], key=lambda r: (r["name"], r["placeId"]))
+            changed = _write_if_changed(os.path.join(out_dir, filename), _encode(items))
+            (written if changed else unchanged).append(filename)
+        _write_if_changed(state_path, json.dumps({
+            "version": PIPELINE_VERSION,
+            "rules": RULES_FINGERPRINT,
+            "grids": grids_fp,
+            "places": places,
+        }, ensure_ascii=False).encode("utf-8"))
+
+    stats.update({
+        "counts": {name: len(items) for name, items in outputs.items()},
+        "empty": empty,
+        "written": written,
+        "unchanged": unchanged,
+        "seconds": round(time.perf_counter() - t0, 3),
+    })
+    return stats
+
+
+def main(argv=None):
+    data_dir = os.getenv("DOBONG_DATA_DIR") or os.path.join(APP_DIR, "tests")
+    ap = argparse.ArgumentParser(description="places_master/places_sources CSV → dobong_*.json (증분)")
+    ap.add_argument("--master", default=os.path.join(SELECTPLACE_DIR, "places_master.csv"))
+    ap.add_argument("--sources", default=os.path.join(SELECTPLACE_DIR, "places_sources.csv"))
+    ap.add_argument("--out", default=BUILD_DIR,
+                    help="출력 폴더 (기본: build/data, 서버 데이터 폴더는 직접 지정)")
+    ap.add_argument("--grids", default=data_dir, help="low20/low50 격자 폴더 (기본: 서버 데이터 폴더)")
+    ap.add_argument("--dry-run", action="store_true", help="파일을 쓰지 않고 통계만")
+    ap.add_argument("--force", action="store_true", help="빈 카테고리가 있어도 쓴다")
+    args = ap.parse_args(argv)
+
+    try:
+        stats = run_pipeline([args.master, args.sources], args.out, args.grids, args.dry_run, args.force)
+    except ValueError as e:
+        raise SystemExit(f"[✘] {e}")
+    counts = stats["counts"]
+    print(
+        f"[✔] 행 {stats['rows']}개 → 장소 {stats['places']}곳 "
+        f"(재사용 {stats['reused']}, 분류 {stats['classified']}, 밴드 {stats['banded']}, 삭제 {stats['removed']}) "
+        f"| 느좋 {counts['느좋']}(low {counts['느좋_low']}), 숨은핫플 {counts['숨은핫플']}(low {counts['숨은핫플_low']}) "
+        f"| {stats['seconds']}s"
+    )
+    if stats["written"]:
+        print(f"    갱신: {', '.join(stats['written'])}")
+    if stats["empty"]:
+        print(f"    [!] 빈 카테고리: {', '.join(stats['empty'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# AiChatbot/recommender/fileio.py
+"""빌드 산출물(JSON/GeoJSON/npy/스냅샷) 쓰기 공용 도구.
+
+서버가 핫리로드로 데이터 폴더를 읽고 있으므로 산출물은 항상 임시 파일에 다 쓴 뒤 os.replace로 바꿔 끼운다
+(읽는 쪽은 이전 파일이나 새 파일 중 하나만 본다). 내용 해시(fingerprint)는 증분 빌드 상태 파일에 쓴다.
+"""
+import os, json, hashlib
+from contextlib import contextmanager
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 빌드 스크립트 기본 출력 폴더 (서버 데이터 폴더에 바로 쓰려면 --out으로 지정)
+BUILD_DIR = os.path.join(APP_DIR, "build", "data")
+
+
+def fingerprint(obj):
+    """JSON으로 직렬화 가능한 값의 내용 해시 (키 순서 무관)"""
+    return hashlib.blake2b(json.dumps(obj, ensure_ascii=False, sort_keys=True).encode("utf-8"), digest_size=16).hexdigest()
+
+
+@contextmanager
+def atomic_write(path, mode="wb", encoding=None):
+    """path + '.tmp'에 쓰고 블록이 끝나면 교체. 도중에 실패하면 임시 파일만 지우고 기존 파일은 그대로"""
+    tmp = path + ".tmp"
+    f = open(tmp, mode, encoding=encoding)
+    try:
+        with f:
+            yield f
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def write_if_changed(path, body):
+    """내용이 같으면 건드리지 않는다 (mtime 유지 → 서버가 다시 읽지 않음). 썼으면 True"""
+    try:
+        with open(path, "rb") as f:
+            if f.read() == body:
+                return False
+    except OSError:
+        pass
+    with atomic_write(path) as f:
+        f.write(body)
+    return True
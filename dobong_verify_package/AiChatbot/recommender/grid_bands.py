@@ -0,0 +1,133 @@
+# AiChatbot/recommender/grid_bands.py
+import numpy as np
+
+from recommender.scoring import BAND_NONE, BAND_LOW50, BAND_LOW20
+
+# 칸 경계에 걸친 좌표는 이웃 칸 bbox까지 확인 (격자가 살짝 기울어 있음)
+_NEIGHBOURS = [(0, 0)] + [(dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if (dr, dc) != (0, 0)]
+
+
+def _feature_bbox(feature):
+    """properties의 min/max 우선, 없으면 geometry 좌표에서 계산"""
+    props = feature.get("properties") or {}
+    keys = ("min_lat", "min_lon", "max_lat", "max_lon")
+    if all(props.get(k) is not None for k in keys):
+        return tuple(float(props[k]) for k in keys)
+
+    geom = feature.get("geometry") or {}
+    flat = []
+
+    def _walk(c):
+        if len(c) and isinstance(c[0], (int, float)):
+            flat.append((float(c[0]), float(c[1])))
+        else:
+            for x in c:
+                _walk(x)
+
+    _walk(geom.get("coordinates") or [])
+    if not flat:
+        return None
+    lons, lats = zip(*flat)
+    return (min(lats), min(lons), max(lats), max(lons))
+
+
+class GridBandLookup:
+    """low20/low50 격자를 정규 격자 테이블로 컴파일한 좌표 → (grid_id, rank_pct, 밴드) 조회기.
+
+    격자 원점/칸 크기를 min_lat/min_lon과 centroid로 복원해 (행, 열) → 칸 번호 테이블을 만들고,
+    조회는 좌표를 칸 번호로 나눈 뒤 그 칸(과 이웃 칸)의 bbox만 확인한다.
+    """
+
+    def __init__(self, low20, low50):
+        cells = {}
+        # 50%를 먼저 넣고 20%로 덮어써 두 파일에 모두 있으면 20%가 남게 한다
+        for fc, band in ((low50, BAND_LOW50), (low20, BAND_LOW20)):
+            for feat in (fc or {}).get("features") or []:
+                props = feat.get("properties") or {}
+                gid = props.get("grid_id")
+                bbox = _feature_bbox(feat)
+                if gid is None or bbox is None:
+                    continue
+                rank = props.get("rank_pct")
+                cells[int(gid)] = (bbox, float(rank) if rank is not None else np.nan, band)
+
+        n = len(cells)
+        self.grid_id = np.array(list(cells.keys()), dtype=np.int64)
+        self.bbox = np.array([c[0] for c in cells.values()], dtype=np.float64).reshape(n, 4)
+        self.rank_pct = np.array([c[1] for c in cells.values()], dtype=np.float64)
+        self.band = np.array([c[2] for c in cells.values()], dtype=np.int8)
+
+        if n == 0:
+            self.origin = (0.0, 0.0)
+            self.step = (1.0, 1.0)
+            self.table = np.full((0, 0), -1, dtype=np.int32)
+            return
+
+        min_lat, min_lon, max_lat, max_lon = self.bbox.T
+        self.origin = (float(min_lat.min()), float(min_lon.min()))
+        self.step = (float(np.median(max_lat - min_lat)), float(np.median(max_lon - min_lon)))
+
+        c_lat = (min_lat + max_lat) / 2.0
+        c_lon = (min_lon + max_lon) / 2.0
+        rows = np.floor((c_lat - self.origin[0]) / self.step[0]).astype(np.int64)
+        cols = np.floor((c_lon - self.origin[1]) / self.step[1]).astype(np.int64)
+        self.table = np.full((rows.max() + 1, cols.max() + 1), -1, dtype=np.int32)
+        self.table[rows, cols] = np.arange(n, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.grid_id)
+
+    def count_within(self, band):
+        """band 이내 격자 수 (20% 격자는 50% 이내에도 포함)"""
+        return int(np.count_nonzero(self.band >= band))
+
+    def locate(self, lat, lon):
+        """좌표 배열 → 칸 번호 배열 (어느 격자에도 없으면 -1)"""
+        lat = np.atleast_1d(np.asarray(lat, dtype=np.float64))
+        lon = np.atleast_1d(np.asarray(lon, dtype=np.float64))
+        found = np.full(lat.shape, -1, dtype=np.int32)
+        if self.table.size == 0:
+            return found
+
+        ok = np.isfinite(lat) & np.isfinite(lon)
+        base_r = np.floor((np.where(ok, lat, 0.0) - self.origin[0]) / self.step[0]).astype(np.int64)
+        base_c = np.floor((np.where(ok, lon, 0.0) - self.origin[1]) / self.step[1]).astype(np.int64)
+        n_rows, n_cols = self.table.shape
+
+        for dr, dc in _NEIGHBOURS:
+            todo = ok & (found < 0)
+            if not todo.any():
+                break
+            r = base_r + dr
+            c = base_c + dc
+            inside = todo & (r >= 0) & (r < n_rows) & (c >= 0) & (c < n_cols)
+            cand = np.full(lat.shape, -1, dtype=np.int32)
+            cand[inside] = self.table[r[inside], c[inside]]
+            hit = cand >= 0
+            b = self.bbox[np.where(hit, cand, 0)]
+            hit &= (b[:, 0] <= lat) & (lat <= b[:, 2]) & (b[:, 1] <= lon) & (lon <= b[:, 3])
+            found[hit] = cand[hit]
+        return found
+
+    def bands_for(self, lat, lon):
+        """좌표 배열 → 밴드 코드 배열 (BAND_NONE/BAND_LOW50/BAND_LOW20)"""
+        cell = self.locate(lat, lon)
+        out = np.full(cell.shape, BAND_NONE, dtype=np.int8)
+        hit = cell >= 0
+        out[hit] = self.band[cell[hit]]
+        return out
+
+    def lookup(self, lat, lon):
+        """단일 좌표 → {"grid_id", "rank_pct", "band"} 또는 None"""
+        try:
+            cell = int(self.locate(float(lat), float(lon))[0])
+        except (TypeError, ValueError):
+            return None
+        if cell < 0:
+            return None
+        rank = float(self.rank_pct[cell])
+        return {
+            "grid_id": int(self.grid_id[cell]),
+            "rank_pct": None if np.isnan(rank) else rank,
+            "band": int(self.band[cell]),
+        }
@@ -0,0 +1,309 @@
+# AiChatbot/recommender/grid_scores.py
+"""격자 점수(final_score)/분위(rank_pct) 재계산 → low20/low50 GeoJSON.
+
+노트북에서 한 번 계산해 고정해 둔 격자 점수를 장소 좌표 밀도로 다시 매긴다 (geopandas 공간 조인 없이
+GridBandLookup의 정규 격자 테이블로 좌표를 칸 번호로 나눠 np.bincount). 밀도가 낮은 칸일수록 순위가 앞이다.
+장소별 기여(칸, 가중치)를 상태 파일에 남겨 두고, 다시 돌리면 추가/삭제/이동한 장소만 칸 합계에 더하고 뺀다.
+
+격자 배치는 기존 피처(grid_id/min_lat/min_lon...)를 그대로 쓴다. 입력이 하위 50% 격자뿐이면(기존 rank_pct 최대 0.5)
+그 격자들 안에서 다시 순위를 매겨 원래 분위 범위(0~0.5)에 맞추고, 전체 격자 파일(--universe)을 주면 전체에서 매긴다.
+
+    python -m recommender.grid_scores                        # tests/dobong_*.json 밀도 → build/data/low20/low50
+    python -m recommender.grid_scores --places ../selectplace/places_master.csv --dry-run
+"""
+import os, csv, json, math, argparse
+
+import numpy as np
+
+from recommender.fileio import BUILD_DIR, fingerprint as _fingerprint, write_if_changed as _write_if_changed
+from recommender.grid_bands import GridBandLookup
+
+LOW20_PCT = 0.2
+LOW50_PCT = 0.5
+STATE_FILE = "grid_scores.state.json"
+PLACE_FILES = ("dobong_hotple.json", "dobong_neujoh.json")
+
+# 3×3 이웃 칸 평활 가중치 (가운데 1, 변 0.5, 모서리 0.25)
+_SMOOTH_1D = np.array([0.5, 1.0, 0.5])
+_CRS = {"type": "name", "properties": {"name": "urn:ogc:def:crs:OGC:1.3:CRS84"}}
+
+
+def _features(*fcs):
+    """여러 FeatureCollection의 피처를 grid_id 기준으로 합침 (앞쪽 우선)"""
+    out = {}
+    for fc in fcs:
+        for feat in (fc or {}).get("features") or []:
+            gid = (feat.get("properties") or {}).get("grid_id")
+            if gid is not None and int(gid) not in out:
+                out[int(gid)] = feat
+    return out
+
+
+class GridScorer:
+    """격자 칸별 장소 밀도 → final_score / rank_pct / 밴드.
+
+    update(places)로 장소 집합을 통째로 넘기면 이전 집합과의 차이만 칸 합계에 반영한다.
+    """
+
+    def __init__(self, features, smooth=True, state=None):
+        self.features = features
+        fc = {"features": list(features.values())}
+        # 좌표 → 칸 번호는 서버의 밴드 조회기와 같은 테이블을 쓴다 (둘 다 low50 밴드로 넣음)
+        self.lookup = GridBandLookup({"features": []}, fc)
+        n = len(self.lookup)
+        props = [features[int(g)].get("properties") or {} for g in self.lookup.grid_id]
+        # 동점 정렬용: 노트북이 매긴 원래 점수(base_score로 보존)
+        self.base_score = np.array([_float(p.get("base_score", p.get("final_score"))) for p in props])
+        base_rank = np.array([_float(p.get("rank_pct")) for p in props])
+        # 입력 격자가 전체의 일부(하위 50% 등)면 그 분위 범위 안에서 다시 매긴다
+        self.rank_scale = float(np.nanmax(base_rank)) if n and np.isfinite(base_rank).any() else 1.0
+        self.smooth = smooth
+        self.layout = _fingerprint(sorted(
+            [int(g)] + [round(float(x), 9) for x in b] for g, b in zip(self.lookup.grid_id, self.lookup.bbox)
+        ))
+
+        # 상태 파일은 칸 위치 대신 grid_id로 저장 (피처 순서가 바뀌어도 이어서 쓸 수 있게)
+        self._pos = {int(g): i for i, g in enumerate(self.lookup.grid_id)}
+        self.counts = np.zeros(n, dtype=np.float64)
+        self.contrib = {}
+        if state and state.get("layout") == self.layout:
+            for gid, v in (state.get("counts") or {}).items():
+                self.counts[self._pos[int(gid)]] = v
+            self.contrib = {
+                k: (self._pos[gid] if gid >= 0 else -1, w) for k, (gid, w) in (state.get("contrib") or {}).items()
+            }
+
+        rows, cols = np.nonzero(self.lookup.table >= 0)
+        cells = self.lookup.table[rows, cols]
+        self._rc = np.empty((n, 2), dtype=np.int64)
+        self._rc[cells] = np.stack([rows, cols], axis=1)
+
+    def __len__(self):
+        return len(self.counts)
+
+    def update(self, places):
+        """places {id: (lat, lon, 가중치)} → {"added", "removed", "moved", "unchanged"}"""
+        ids = list(places)
+        lat = np.array([places[k][0] for k in ids], dtype=np.float64)
+        lon = np.array([places[k][1] for k in ids], dtype=np.float64)
+        cells = self.lookup.locate(lat, lon) if ids else np.zeros(0, dtype=np.int32)
+
+        stats = {"added": 0, "removed": 0, "moved": 0, "unchanged": 0}
+        sub_cells, sub_w, add_cells, add_w = [], [], [], []
+        new = {}
+        for k, cell, (_, _, w) in zip(ids, cells.tolist(), (places[k] for k in ids)):
+            entry = (int(cell), float(w))
+            new[k] = entry
+            old = self.contrib.get(k)
+            if old == entry:
+                stats["unchanged"] += 1
+                continue
+            if old is None:
+                stats["added"] += 1
+            else:
+                stats["moved"] += 1
+                sub_cells.append(old[0])
+                sub_w.append(old[1])
+            add_cells.append(entry[0])
+            add_w.append(entry[1])
+        for k, old in self.contrib.items():
+            if k not in new:
+                stats["removed"] += 1
+                sub_cells.append(old[0])
+                sub_w.append(old[1])
+
+        n = len(self.counts)
+        for cells_, w_, sign in ((add_cells, add_w, 1.0), (sub_cells, sub_w, -1.0)):
+            c = np.asarray(cells_, dtype=np.int64)
+            w = np.asarray(w_, dtype=np.float64)
+            inside = c >= 0  # 격자 밖 장소는 기여 없음
+            if inside.any():
+                self.counts += sign * np.bincount(c[inside], weights=w[inside], minlength=n)
+        np.maximum(self.counts, 0.0, out=self.counts)  # 더하고 뺀 부동소수 오차
+        self.contrib = new
+        return stats
+
+    def density(self):
+        """칸별 밀도 점수 (smooth면 3×3 이웃 가중 합)"""
+        if not self.smooth or not len(self.counts):
+            return self.counts.copy()
+        shape = self.lookup.table.shape
+        dense = np.zeros((shape[0] + 2, shape[1] + 2))
+        dense[self._rc[:, 0] + 1, self._rc[:, 1] + 1] = self.counts
+        out = np.zeros(shape)
+        for dr, wr in enumerate(_SMOOTH_1D):
+            for dc, wc in enumerate(_SMOOTH_1D):
+                out += wr * wc * dense[dr:dr + shape[0], dc:dc + shape[1]]
+        return out[self._rc[:, 0], self._rc[:, 1]]
+
+    def ranks(self, score):
+        """점수 오름차순 분위 (동점은 기존 점수 → grid_id 순), rank_scale 범위로"""
+        n = len(score)
+        order = np.lexsort((self.lookup.grid_id, np.nan_to_num(self.base_score, nan=np.inf), score))
+        rank = np.empty(n)
+        rank[order] = (np.arange(n) + 1.0) / max(n, 1) * self.rank_scale
+        return rank
+
+    def feature_collections(self):
+        """→ (low20 FeatureCollection, low50 FeatureCollection). 원래 피처의 geometry/속성 순서 유지."""
+        score = self.density()
+        rank = self.ranks(score)
+        low20, low50 = [], []
+        for i in np.lexsort((self.lookup.grid_id,)).tolist():
+            feat = self.features[int(self.lookup.grid_id[i])]
+            props = dict(feat.get("properties") or {})
+            props.setdefault("base_score", props.get("final_score"))
+            props["final_score"] = float(score[i])
+            props["rank_pct"] = float(rank[i])
+            out = {"type": "Feature", "properties": props, "geometry": feat.get("geometry")}
+            if rank[i] <= LOW50_PCT + 1e-12:
+                low50.append(out)
+            if rank[i] <= LOW20_PCT + 1e-12:
+                low20.append(out)
+        return _fc("low20_grids", low20), _fc("low50_grids", low50)
+
+    def state(self):
+        gids = self.lookup.grid_id.tolist()
+        return {
+            "layout": self.layout,
+            "counts": {str(g): c for g, c in zip(gids, self.counts.tolist()) if c},
+            "contrib": {k: [gids[c] if c >= 0 else -1, w] for k, (c, w) in self.contrib.items()},
+        }
+
+
+def _float(v):
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _fc(name, features):
+    return {"type": "FeatureCollection", "name": name, "crs": _CRS, "features": features}
+
+
+def encode_geojson(fc):
+    """원본(GDAL 출력)처럼 피처 한 줄씩 → bytes"""
+    head = (
+        '{\n"type": "FeatureCollection",\n'
+        f'"name": {json.dumps(fc.get("name"), ensure_ascii=False)},\n'
+        f'"crs": {json.dumps(fc.get("crs"), ensure_ascii=False)},\n'
+        '"features": [\n'
+    )
+    body = ",\n".join(json.dumps(f, ensure_ascii=False) for f in fc["features"])
+    return (head + body + "\n]\n}\n").encode("utf-8")
+
+
+# ───────────────────────── 장소 읽기 ─────────────────────────
+def _place_list(obj):
+    if isinstance(obj, dict):
+        for k in ("data", "results", "items", "places"):
+            if isinstance(obj.get(k), list):
+                return obj[k]
+        return []
+    return obj if isinstance(obj, list) else []
+
+
+def _coord(rec, *keys):
+    for k in keys:
+        v = _float(rec.get(k))
+        if math.isfinite(v):
+            return v
+    return None
+
+
+def load_places(paths, weight="count"):
+    """JSON(API 봉투/리스트) 또는 CSV(lat/lon 열) → {id: (lat, lon, 가중치)} (id 없으면 이름+좌표)"""
+    places = {}
+    for path in paths:
+        try:
+            if path.lower().endswith(".csv"):
+                with open(path, "r", encoding="utf-8-sig", newline="") as f:
+                    records = list(csv.DictReader(f))
+            else:
+                with open(path, "r", encoding="utf-8") as f:
+                    records = _place_list(json.load(f))
+        except (OSError, ValueError):
+            continue
+        for rec in records:
+            if not isinstance(rec, dict):
+                continue
+            lat, lon = _coord(rec, "latitude", "lat"), _coord(rec, "longitude", "lon", "lng")
+            if lat is None or lon is None:
+                continue
+            pid = rec.get("placeId") or rec.get("id") or rec.get("place_id") or f"{rec.get('name')}|{lat:.5f}|{lon:.5f}"
+            w = 1.0
+            if weight == "reviews":
+                reviews = _float(rec.get("reviewCount"))
+                w += math.log1p(reviews) if math.isfinite(reviews) and reviews > 0 else 0.0
+            places[str(pid)] = (lat, lon, w)
+    return places
+
+
+# ───────────────────────── 파이프라인 ─────────────────────────
+def _read_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def recompute(places, grids_dir, out_dir=None, universe=None, smooth=True, dry_run=False):
+    """places {id: (lat, lon, w)} → 격자 재계산. 새 GridBandLookup과 통계를 돌려준다."""
+    out_dir = out_dir or grids_dir
+    low20 = _read_json(os.path.join(grids_dir, "low20_grids.geojson"))
+    low50 = _read_json(os.path.join(grids_dir, "low50_grids.geojson"))
+    features = _features(_read_json(universe) if universe else None, low50, low20)
+
+    state_path = os.path.join(out_dir, STATE_FILE)
+    scorer = GridScorer(features, smooth=smooth, state=_read_json(state_path))
+    stats = scorer.update(places)
+    new20, new50 = scorer.feature_collections()
+
+    written = []
+    if not dry_run:
+        os.makedirs(out_dir, exist_ok=True)
+        for name, fc in (("low20_grids.geojson", new20), ("low50_grids.geojson", new50)):
+            if _write_if_changed(os.path.join(out_dir, name), encode_geojson(fc)):
+                written.append(name)
+        _write_if_changed(state_path, json.dumps(scorer.state(), ensure_ascii=False).encode("utf-8"))
+
+    stats.update({
+        "cells": len(scorer),
+        "low20": len(new20["features"]),
+        "low50": len(new50["features"]),
+        "outside": sum(1 for c, _ in scorer.contrib.values() if c < 0),
+        "written": written,
+    })
+    return GridBandLookup(new20, new50), stats
+
+
+def main(argv=None):
+    from recommender.data_loader import _resolve_base_path  # 서버 데이터 폴더 규칙만 빌림
+
+    ap = argparse.ArgumentParser(description="장소 밀도로 low20/low50 격자 점수·분위 재계산")
+    ap.add_argument("--base", default=None, help="격자/장소 폴더 (기본: AiChatbot/tests)")
+    ap.add_argument("--places", nargs="*", default=None, help=f"장소 JSON/CSV (기본: <base>/{'·'.join(PLACE_FILES)})")
+    ap.add_argument("--universe", default=None, help="전체 격자 GeoJSON (없으면 low50 ∪ low20 안에서만)")
+    ap.add_argument("--out", default=BUILD_DIR,
+                    help="출력 폴더 (기본: AiChatbot/build/data; 서버 데이터 폴더에 바로 쓰려면 그 경로를 지정)")
+    ap.add_argument("--weight", choices=("count", "reviews"), default="count", help="장소 가중치 (reviews: 1+log1p(리뷰 수))")
+    ap.add_argument("--no-smooth", action="store_true", help="이웃 칸 평활 끔")
+    ap.add_argument("--dry-run", action="store_true")
+    args = ap.parse_args(argv)
+
+    base = args.base or _resolve_base_path()
+    paths = args.places or [os.path.join(base, name) for name in PLACE_FILES]
+    places = load_places(paths, args.weight)
+    lookup, stats = recompute(places, base, args.out, args.universe, not args.no_smooth, args.dry_run)
+    print(
+        f"[✔] 장소 {len(places)}곳 (추가 {stats['added']}, 이동 {stats['moved']}, 삭제 {stats['removed']}, "
+        f"격자 밖 {stats['outside']}) → 격자 {stats['cells']}칸 중 low20 {stats['low20']}, low50 {stats['low50']}"
+    )
+    if stats["written"]:
+        print(f"    갱신: {', '.join(stats['written'])}")
+
+
+if __name__ == "__main__":
+    main()
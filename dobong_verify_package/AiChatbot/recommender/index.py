@@ -0,0 +1,223 @@
+# AiChatbot/recommender/index.py
+import logging
+
+import numpy as np
+
+from recommender.data_loader import get_snapshot, register_derived
+from recommender.embeddings import VectorIndex
+from recommender.lexical import LEXICAL_FIELDS, LexicalIndex, document_text
+from recommender.opening_hours import OpeningHoursTable
+from recommender.payload import PlaceFragments
+from recommender.place_store import StoreRecords
+from recommender.spatial import GridBucketIndex
+from recommender.scoring import (
+    TAG_NAMES, TAG_BITS, BAND_LOW20, _to_id, _to_id_set,
+)
+
+
+log = logging.getLogger(__name__)
+
+
+def _readonly(arr):
+    arr.flags.writeable = False
+    return arr
+
+
+def _coord(place, *keys):
+    for key in keys:
+        v = place.get(key)
+        if v is None:
+            continue
+        try:
+            return float(v)
+        except (TypeError, ValueError):
+            return np.nan
+    return np.nan
+
+
+# 다양성 재정렬용 세부 분류 (앞일수록 우선, places_master.csv 보강 필드)
+_CATEGORY_FIELDS = ("sub_category", "base_type", "top_category")
+# 인덱스 빌드(본문 색인/임베딩, 영업시간, 세부 분류)에 쓰는 필드
+_BUILD_FIELDS = tuple(dict.fromkeys(LEXICAL_FIELDS + ("tags", "openingHours") + _CATEGORY_FIELDS))
+
+
+def _build_rows(places):
+    """인덱스 빌드용 필드만 담은 행 목록.
+
+    바이너리 스냅샷이면 PlaceStore 열에서 필요한 필드만 꺼내 만든다 (전체 레코드 dict는 만들지 않음).
+    """
+    if not isinstance(places, StoreRecords):
+        return places
+    cols = [places.store.field_values(f, places.rows) for f in _BUILD_FIELDS]
+    return [{f: v for f, v in zip(_BUILD_FIELDS, vals) if v is not None} for vals in zip(*cols)]
+
+
+class RecommendationIndex:
+    """get_all_data()를 한 번만 병합/해석해 둔 읽기 전용 추천 인덱스.
+
+    places[i]의 id/밴드/태그가 같은 위치 i의 배열 원소로 들어 있어
+    score_places가 요청마다 dict를 다시 훑지 않고 배열 연산만 하면 된다.
+    """
+
+    __slots__ = (
+        "ids", "places", "pos", "names",
+        "band", "tag_mask", "tag_matrix", "lat", "lon", "category",
+        "spatial", "lexical", "vectors", "hours", "fragments",
+    )
+
+    def __init__(self, ids, places, vectors=None, rows=None, **arrays):
+        object.__setattr__(self, "ids", tuple(ids))
+        # 바이너리 스냅샷이면 레코드는 필요할 때만 만드는 지연 시퀀스 그대로 둔다
+        if not isinstance(places, StoreRecords):
+            places = tuple(places)
+        # 색인/영업시간은 빌드용 행(스냅샷이면 열에서 뽑은 필드만)으로 만든다
+        if rows is None:
+            rows = _build_rows(places)
+        # 이름만 필요한 파생 인덱스(지명 사전/지도 레이어)가 레코드를 만들지 않도록
+        object.__setattr__(self, "names", tuple(p.get("name") for p in rows))
+        object.__setattr__(self, "places", places)
+        object.__setattr__(self, "pos", {pid: i for i, pid in enumerate(self.ids)})
+        for name in ("band", "tag_mask", "tag_matrix", "lat", "lon", "category"):
+            object.__setattr__(self, name, _readonly(arrays[name]))
+        object.__setattr__(self, "spatial", GridBucketIndex(self.lat, self.lon))
+        # 대분류 태그(느좋/핫플)는 tag_mask로 따로 가중하므로 본문 색인에서는 뺀다
+        object.__setattr__(self, "lexical", LexicalIndex(document_text(p, TAG_NAMES) for p in rows))
+        object.__setattr__(self, "vectors", vectors)
+        # 영업시간 문자열은 여기서 한 번만 파싱 (요청 시에는 비트 열 하나만 본다)
+        object.__setattr__(self, "hours", OpeningHoursTable(p.get("openingHours") for p in rows))
+        # 응답용 정제/인코딩 조각: 응답에 처음 실릴 때 만들고 LRU로 보관
+        object.__setattr__(self, "fragments", PlaceFragments(places))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RecommendationIndex is immutable")
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def _category_codes(places):
+    """세부 분류 문자열 → 정수 코드 배열 (없으면 -1)"""
+    codes = {}
+    out = np.full(len(places), -1, dtype=np.int32)
+    for i, p in enumerate(places):
+        for key in _CATEGORY_FIELDS:
+            v = p.get(key)
+            if v:
+                out[i] = codes.setdefault(v, len(codes))
+                break
+    return out
+
+
+# _to_id 우선순위 (앞일수록 우선)
+_ID_FIELDS = ("id", "placeId", "place_id", "name")
+
+
+def _build_index_from_store(data, store):
+    """PlaceStore 열에서 바로 인덱스 배열을 만든다 (레코드 dict를 만들지 않음)"""
+    ids = [None] * len(store)
+    for key in reversed(_ID_FIELDS):
+        if store.field_kind(key) != "str":
+            continue
+        for i, v in enumerate(store.strings_of(key)):
+            if v:
+                ids[i] = v
+
+    merged = {}
+    for source in ("핫플", "느좋"):
+        for r in store.rows_of(source).tolist():
+            if ids[r]:
+                merged[ids[r]] = r
+    rows = np.fromiter(merged.values(), dtype=np.int64, count=len(merged))
+
+    low20_ids = _to_id_set(data.get("핫플_low")) | _to_id_set(data.get("느좋_low"))
+    band = np.array([BAND_LOW20 if pid in low20_ids else 0 for pid in merged], dtype=np.int8)
+
+    tag_mask = np.zeros(len(rows), dtype=np.uint8)
+    tag_matrix = np.zeros((len(rows), len(TAG_NAMES)), dtype=np.float32)
+    for j, tag in enumerate(TAG_NAMES):
+        has = store.list_contains("tags", store.find_string(tag))[rows]
+        tag_mask[has] |= TAG_BITS[tag]
+        tag_matrix[has, j] = 1.0
+
+    def _coords(*keys):
+        for key in keys:
+            if store.field_kind(key) in ("num", "int"):
+                return store.column(key)[rows]
+        return np.full(len(rows), np.nan)
+
+    return merged.keys(), StoreRecords(store, rows), band, tag_mask, tag_matrix, \
+        _coords("latitude", "lat"), _coords("longitude", "lon", "lng")
+
+
+def _build_index_from_dicts(data):
+    merged = {}
+    for key in ("핫플", "느좋"):
+        for p in data.get(key, []) or []:
+            pid = _to_id(p)
+            if pid:
+                merged[pid] = p
+
+    low20_ids = _to_id_set(data.get("핫플_low")) | _to_id_set(data.get("느좋_low"))
+
+    n = len(merged)
+    band = np.zeros(n, dtype=np.int8)
+    tag_mask = np.zeros(n, dtype=np.uint8)
+    tag_matrix = np.zeros((n, len(TAG_NAMES)), dtype=np.float32)
+    lat = np.full(n, np.nan)
+    lon = np.full(n, np.nan)
+
+    for i, (pid, p) in enumerate(merged.items()):
+        if pid in low20_ids:
+            band[i] = BAND_LOW20
+
+        tags = p.get("tags") or []
+        for j, tag in enumerate(TAG_NAMES):
+            if tag in tags:
+                tag_mask[i] |= TAG_BITS[tag]
+                tag_matrix[i, j] = 1.0
+
+        lat[i] = _coord(p, "latitude", "lat")
+        lon[i] = _coord(p, "longitude", "lon", "lng")
+
+    return merged.keys(), merged.values(), band, tag_mask, tag_matrix, lat, lon
+
+
+def build_index(data):
+    """핫플/느좋 병합(id 기준, 느좋 우선) + 밴드/태그/좌표를 배열로 미리 계산"""
+    store = data.get("place_store")
+    if store is not None and all(store.field_kind(k) in (None, "str") for k in _ID_FIELDS):
+        ids, places, band, tag_mask, tag_matrix, lat, lon = _build_index_from_store(data, store)
+    else:
+        ids, places, band, tag_mask, tag_matrix, lat, lon = _build_index_from_dicts(data)
+
+    # 좌표가 low20/low50 격자 안이면 그 밴드 (오프라인 id 목록과 겹치면 높은 쪽)
+    grid_bands = data.get("grid_bands")
+    if grid_bands is not None:
+        band = np.maximum(band, grid_bands.bands_for(lat, lon))
+
+    # 임베딩: 저장본(있으면 memmap)을 인덱스 순서에 맞춤, 없으면 로컬 임베더로 바로 계산
+    ids = list(ids)
+    if not isinstance(places, StoreRecords):
+        places = tuple(places)
+    rows = _build_rows(places)
+    try:
+        vectors = VectorIndex.for_places(ids, data.get("place_vectors"))
+    except (OSError, ValueError, RuntimeError):
+        # 임베더 설정/파일 읽기 문제: 의미 가중만 끄고 나머지 인덱스는 그대로 (원인은 로그에)
+        log.exception("장소 임베딩 인덱스를 만들지 못해 의미 유사도 가중을 끕니다")
+        vectors = None
+
+    return RecommendationIndex(
+        ids, places, vectors=vectors, rows=rows,
+        band=band, tag_mask=tag_mask, tag_matrix=tag_matrix, lat=lat, lon=lon,
+        category=_category_codes(rows),
+    )
+
+
+register_derived("recommendation_index", build_index)
+
+def get_index(snapshot=None):
+    """snapshot(없으면 현재 스냅샷)의 추천 인덱스"""
+    return (snapshot or get_snapshot()).derived("recommendation_index")
+
+get_index()  # 첫 스냅샷 인덱스는 import 시점에 미리 빌드
@@ -0,0 +1,420 @@
+# AiChatbot/recommender/intent.py
+"""채팅 문장 → 의도(카테고리 / 키워드 / 장소·랜드마크 참조 / 기준 위치) 로컬 해석.
+
+1) 키워드는 사전 매처(KEYWORD_MATCHER), 2) 카테고리는 글자 n-gram 나이브 베이즈(가중치는 미리 계산)와 사전 힌트,
+3) 장소 참조는 도봉구 랜드마크 + 스냅샷 장소 이름 매처로 찾는다. 전부 로컬이라 요청 경로에서 부담이 없다.
+확신도가 MIN_CONFIDENCE 아래일 때만 원격 해석기(intent_remote, INTENT_BACKEND)를 부르고, 그 답은 캐시된다.
+
+가중치 빌드 (사전 + 장소 본문): python -m recommender.intent [--base tests]
+없으면 import 시 사전만으로 계산한다.
+"""
+import os
+import re
+import json
+import argparse
+import threading
+import unicodedata
+
+import numpy as np
+
+from recommender.data_loader import _resolve_base_path, get_snapshot, register_derived
+from recommender.entities import normalize_name
+from recommender.fileio import atomic_write
+from recommender.index import get_index  # noqa: F401  (requires의 "recommendation_index" 등록)
+from recommender.intent_remote import get_remote_intent
+from recommender.keyword_matcher import KeywordMatcher
+from recommender.lexical import document_text
+from recommender.scoring import (
+    CATEGORY_HINTS, KEYWORD_TO_TAG_MAP, KEYWORD_SYNONYMS, match_keywords,
+)
+
+WEIGHTS_FILE = "intent.weights.json"
+CLASSES = tuple(CATEGORY_HINTS)               # ("느좋", "숨은핫플")
+TAG_CLASS = {"느좋": "느좋", "핫플": "숨은핫플"}  # 장소 태그 / 키워드 비율 → 카테고리
+NGRAM_SIZES = (2, 3)
+NB_ALPHA = 0.5
+# 아는 n-gram이 든 어절이 이만큼 되어야 확신도를 그대로 쓴다 (적으면 0.5 쪽으로 당김: 한 글자 조각만 맞은 문장 방지)
+EVIDENCE_WORDS = 2
+# 장소 본문은 길어서 문장 하나가 사전 표현 하나보다 훨씬 많은 n-gram을 가진다 → 가중을 낮춘다
+PLACE_DOC_WEIGHT = 0.2
+# 이 확신도 미만이면 분류기 카테고리를 쓰지 않고(원격이 있으면) 원격 해석으로
+MIN_CONFIDENCE = float(os.getenv("INTENT_MIN_CONFIDENCE", "0.7"))
+# 사전 힌트로 정한 카테고리의 확신도
+DICTIONARY_CONFIDENCE = 0.9
+
+# 도봉구 랜드마크(역/산/공원/동) → (위도, 경도). 말하면 그 근처를 기준 위치로 쓴다
+LANDMARKS = {
+    "도봉산역": (37.6895, 127.0461),
+    "도봉역": (37.6792, 127.0456),
+    "방학역": (37.6675, 127.0443),
+    "창동역": (37.6530, 127.0477),
+    "쌍문역": (37.6485, 127.0346),
+    "녹천역": (37.6447, 127.0514),
+    "도봉산": (37.6987, 127.0153),
+    "서울창포원": (37.6893, 127.0471),
+    "창포원": (37.6893, 127.0471),
+    "둘리뮤지엄": (37.6524, 127.0274),
+    "초안산": (37.6428, 127.0452),
+    "발바닥공원": (37.6625, 127.0353),
+    "도봉동": (37.6790, 127.0420),
+    "방학동": (37.6660, 127.0330),
+    "창동": (37.6500, 127.0460),
+    "쌍문동": (37.6480, 127.0290),
+}
+# 장소 이름은 "○○ 근처/주변" 같이 기준으로 말할 때만 위치로 쓴다 ("○○ 같은 곳"은 위치 아님)
+NEAR_CUES = ("근처", "주변", "가까운", "가까이", "부근", "인근", "근방", "옆", "앞")
+MIN_PLACE_NAME_CHARS = 3
+
+_WORD = re.compile(r"\w+")
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def _word_ngrams(word):
+    w = f"^{word}$"
+    return [w[i:i + n] for n in NGRAM_SIZES for i in range(len(w) - n + 1)]
+
+
+def _words(text):
+    return _WORD.findall(unicodedata.normalize("NFKC", str(text or "")).lower())
+
+
+def char_ngrams(text):
+    """문장 → 어절별 글자 2/3-gram (어절 경계 ^, $ 포함)"""
+    return [g for word in _words(text) for g in _word_ngrams(word)]
+
+
+# ───────────────────────── 카테고리 분류기 ─────────────────────────
+class NgramClassifier:
+    """글자 n-gram 다항 나이브 베이즈. 특징별 가중치(클래스 평균을 뺀 로그 우도)를 미리 계산해 둔다.
+
+    학습에 없던 n-gram은 무시하고, 아는 n-gram이 하나도 없으면 확신도 0.
+    아는 n-gram이 든 어절이 EVIDENCE_WORDS개보다 적으면 확신도를 그 비율만큼 0.5 쪽으로 줄인다.
+    """
+
+    def __init__(self, classes, prior, weights):
+        self.classes = tuple(classes)
+        self.prior = np.asarray(prior, dtype=np.float64)
+        self.weights = {f: np.asarray(w, dtype=np.float64) for f, w in weights.items()}
+
+    def __len__(self):
+        return len(self.weights)
+
+    @classmethod
+    def train(cls, examples, classes=CLASSES, alpha=NB_ALPHA):
+        """examples: [(문장, {클래스: 가중치}), ...]"""
+        col = {c: j for j, c in enumerate(classes)}
+        counts = {}
+        class_total = np.zeros(len(classes))
+        for text, labels in examples:
+            grams = char_ngrams(text)
+            for c, w in labels.items():
+                if c not in col or w <= 0:
+                    continue
+                class_total[col[c]] += w
+                for g in grams:
+                    counts.setdefault(g, np.zeros(len(classes)))[col[c]] += w
+        if not counts:
+            return cls(classes, np.zeros(len(classes)), {})
+
+        feats = list(counts)
+        mat = np.stack([counts[f] for f in feats]) + alpha
+        loglik = np.log(mat / mat.sum(axis=0, keepdims=True))
+        loglik -= loglik.mean(axis=1, keepdims=True)
+        prior = np.log((class_total + 1.0) / (class_total.sum() + len(classes)))
+        prior -= prior.mean()
+        return cls(classes, prior, dict(zip(feats, loglik)))
+
+    def predict(self, text):
+        """→ (클래스 또는 None, 확신도 0~1)"""
+        scores = self.prior.copy()
+        known_words = 0
+        for word in _words(text):
+            known = False
+            for g in _word_ngrams(word):
+                w = self.weights.get(g)
+                if w is not None:
+                    scores += w
+                    known = True
+            known_words += known
+        if not known_words:
+            return None, 0.0
+        p = np.exp(scores - scores.max())
+        p /= p.sum()
+        j = int(np.argmax(p))
+        evidence = min(1.0, known_words / EVIDENCE_WORDS)
+        return self.classes[j], float(0.5 + (p[j] - 0.5) * evidence)
+
+    def to_json(self):
+        return {
+            "classes": list(self.classes),
+            "prior": [round(float(x), 6) for x in self.prior],
+            "weights": {f: [round(float(x), 6) for x in w] for f, w in self.weights.items()},
+        }
+
+    @classmethod
+    def from_json(cls, obj):
+        return cls(obj["classes"], obj["prior"], obj["weights"])
+
+
+def dictionary_examples():
+    """키워드 사전(카테고리 힌트 / 태그 비율 / 동의어) → 학습 예시"""
+    examples = []
+    for category, hints in CATEGORY_HINTS.items():
+        examples.extend((h, {category: 1.0}) for h in hints)
+
+    def _labels(kw):
+        tags = KEYWORD_TO_TAG_MAP.get(kw)
+        if tags:
+            return {TAG_CLASS[t]: float(w) for t, w in tags.items() if t in TAG_CLASS}
+        return {c: 1.0 for c, hints in CATEGORY_HINTS.items() if kw in hints}
+
+    for kw in KEYWORD_TO_TAG_MAP:
+        examples.append((kw, _labels(kw)))
+    for kw, synonyms in KEYWORD_SYNONYMS.items():
+        labels = _labels(kw)
+        if labels:
+            examples.extend((s, labels) for s in synonyms)
+    return examples
+
+
+def place_examples(places):
+    """장소 본문 → 태그(느좋/핫플)를 정답으로 한 학습 예시"""
+    examples = []
+    for p in places:
+        tags = [TAG_CLASS[t] for t in (p.get("tags") or []) if t in TAG_CLASS]
+        if tags:
+            examples.append((document_text(p, TAG_CLASS), {c: PLACE_DOC_WEIGHT / len(tags) for c in tags}))
+    return examples
+
+
+def load_classifier(base_path=None):
+    """저장된 가중치가 있으면 그것, 없거나 못 읽으면 사전만으로 학습"""
+    path = os.path.join(base_path or _resolve_base_path(), WEIGHTS_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return NgramClassifier.from_json(json.load(f))
+    except (OSError, ValueError, KeyError):
+        return NgramClassifier.train(dictionary_examples())
+
+
+# ───────────────────────── 장소 / 랜드마크 참조 ─────────────────────────
+def _compact(text):
+    """매칭용: NFKC + 소문자, 공백/기호 제거 ("창동 역" == "창동역")"""
+    return _NON_WORD.sub("", unicodedata.normalize("NFKC", str(text or "")).lower())
+
+
+class Gazetteer:
+    """랜드마크 + 장소 이름 → 참조 {"name", "kind", "lat", "lon"(, "placeId")} 매처 (공백 무시)"""
+
+    def __init__(self, refs):
+        self.refs = {}
+        for surface, ref in refs:
+            self.refs.setdefault(surface, ref)
+        self.matcher = KeywordMatcher({s: s for s in self.refs})
+
+    def find(self, text):
+        """문장에 나온 참조 (문장 순서, 겹치면 긴 이름)"""
+        seen, out = set(), []
+        for surface, _, _ in self.matcher.find(_compact(text)):
+            if surface not in seen:
+                seen.add(surface)
+                out.append(self.refs[surface])
+        return out
+
+    def lookup(self, name):
+        """이름 하나 → 참조 (통째로 같거나, 이름 안에 든 가장 앞/긴 참조), 없으면 None"""
+        surface = _compact(name)
+        if surface in self.refs:
+            return self.refs[surface]
+        found = self.find(name)
+        return found[0] if found else None
+
+
+# 사전 표면형 (장소 이름이 이것과 같으면 참조로 쓰지 않음)
+_DICTIONARY_SURFACES = (
+    set(KEYWORD_TO_TAG_MAP)
+    | {h for hints in CATEGORY_HINTS.values() for h in hints}
+    | {s for syns in KEYWORD_SYNONYMS.values() for s in syns}
+)
+
+
+def build_gazetteer(data, index):
+    """랜드마크 + 스냅샷 장소 이름 (너무 짧거나 사전 키워드와 같거나 여러 장소가 같은 이름이면 뺀다)"""
+    refs = [
+        (_compact(name), {"name": name, "kind": "landmark", "lat": lat, "lon": lon})
+        for name, (lat, lon) in LANDMARKS.items()
+    ]
+    reserved = {_compact(s) for s in _DICTIONARY_SURFACES} | {r[0] for r in refs}
+    by_name = {}
+    for i, name in enumerate(index.names):
+        if not (np.isfinite(index.lat[i]) and np.isfinite(index.lon[i])):
+            continue
+        surface = normalize_name(name)
+        if len(surface) < MIN_PLACE_NAME_CHARS or surface in reserved:
+            continue
+        by_name.setdefault(surface, []).append(i)
+    for surface, pos in by_name.items():
+        if len(pos) == 1:
+            i = pos[0]
+            refs.append((surface, {
+                "name": index.names[i], "kind": "place", "placeId": index.ids[i],
+                "lat": float(index.lat[i]), "lon": float(index.lon[i]),
+            }))
+    # 장소 이름이 랜드마크를 품으면("도봉산 마당바위") 매처가 긴 쪽을 고른다
+    return Gazetteer(refs)
+
+
+register_derived("intent_gazetteer", build_gazetteer, requires=("recommendation_index",))
+
+
+# ───────────────────────── 해석 ─────────────────────────
+def _category_of(found):
+    for category, hints in CATEGORY_HINTS.items():
+        if any(kw in hints for kw in found):
+            return category
+    return None
+
+
+def _location_of(refs, text):
+    """랜드마크는 바로, 장소는 근처/주변 같은 말이 있을 때만 기준 위치 (lat, lon)"""
+    near = any(cue in text for cue in NEAR_CUES)
+    for ref in refs:
+        if ref["kind"] == "landmark" or near:
+            return (ref["lat"], ref["lon"])
+    return None
+
+
+def _signature(parsed):
+    """원격 캐시 서명: 로컬이 찾은 키워드 + 참조 이름 (다르면 다른 질의)"""
+    return (tuple(parsed["keywords"]), tuple(r["name"] for r in parsed["places"]))
+
+
+class IntentParser:
+    """로컬 해석 → (확신도가 낮고 원격 해석기가 있으면) 캐시/원격 답으로 보강"""
+
+    def __init__(self, classifier, remote=None, min_confidence=MIN_CONFIDENCE):
+        self.classifier = classifier
+        self.remote = remote
+        self.min_confidence = float(min_confidence)
+
+    def parse_local(self, text, gazetteer=None):
+        text = text or ""
+        found = match_keywords(text)
+        category = _category_of(found)
+        predicted, p = self.classifier.predict(text)
+        if category is not None:
+            confidence = max(DICTIONARY_CONFIDENCE, p) if predicted == category else DICTIONARY_CONFIDENCE
+        else:
+            confidence = p
+            if p >= self.min_confidence:
+                category = predicted
+
+        # 가중치가 있는 키워드는 전부 (여러 개면 공백으로 이어 점수에서 비율을 섞는다)
+        keywords = [kw for kw in found if kw in KEYWORD_TO_TAG_MAP]
+        refs = gazetteer.find(text) if gazetteer is not None else []
+        return {
+            "category": category,
+            "keyword": " ".join(keywords) or None,
+            "keywords": keywords,
+            "user_location": _location_of(refs, text),
+            "places": refs,
+            "confidence": round(confidence, 4),
+            "source": "local",
+        }
+
+    def parse(self, text, gazetteer=None):
+        parsed = self.parse_local(text, gazetteer)
+        if self.remote is None or parsed["confidence"] >= self.min_confidence:
+            return parsed
+        answer, source = self.remote.resolve(text, _signature(parsed))
+        if answer is None:
+            # 시간 초과/오류면 source로 표시 (응답 캐시가 이 임시 결과를 오래 들고 있지 않게)
+            return parsed if source in ("cache", "remote") else dict(parsed, source=source)
+        return _merge(parsed, answer, gazetteer, source)
+
+
+def _merge(parsed, answer, gazetteer, source):
+    """로컬 결과 + 원격 답 (카테고리는 원격, 키워드/참조는 합침, 위치는 로컬이 못 찾았을 때만)"""
+    out = dict(parsed, source=source)
+    if answer.get("category"):
+        out["category"] = answer["category"]
+    keywords = list(parsed["keywords"])
+    keywords.extend(k for k in answer.get("keywords") or [] if k not in keywords)
+    out["keywords"] = keywords
+    out["keyword"] = " ".join(keywords) or None
+    refs = list(parsed["places"])
+    if gazetteer is not None:
+        for name in answer.get("places") or []:
+            ref = gazetteer.lookup(name)
+            if ref is not None and ref not in refs:
+                refs.append(ref)
+    out["places"] = refs
+    if out["user_location"] is None and refs:
+        # 원격이 기준 장소로 짚은 이름이면 근처 표현이 없어도 위치로 쓴다
+        out["user_location"] = (refs[0]["lat"], refs[0]["lon"])
+    return out
+
+
+_PARSER = None
+_PARSER_LOCK = threading.Lock()
+
+
+def get_intent_parser():
+    global _PARSER
+    if _PARSER is None:
+        with _PARSER_LOCK:
+            if _PARSER is None:
+                _PARSER = IntentParser(load_classifier(), get_remote_intent())
+    return _PARSER
+
+
+def intent_status():
+    """/api/health용: 분류기 크기, 확신도 기준, 원격 해석기(캐시/묶음) 통계"""
+    parser = get_intent_parser()
+    return {
+        "classifier_ngrams": len(parser.classifier),
+        "min_confidence": parser.min_confidence,
+        "remote": parser.remote.stats() if parser.remote is not None else None,
+    }
+
+
+def parse_intent(text, snapshot=None):
+    """문장 → {"category", "keyword", "keywords", "user_location", "places", "confidence", "source"}"""
+    gazetteer = (snapshot or get_snapshot()).derived("intent_gazetteer")
+    return get_intent_parser().parse(text, gazetteer)
+
+
+# ───────────────────────── 가중치 빌드 ─────────────────────────
+def build_weights(base_path=None, with_places=True):
+    """사전 (+ 장소 본문) → 분류기 학습 → base_path/intent.weights.json"""
+    from recommender.data_loader import _bootstrap_data
+
+    base_path = base_path or _resolve_base_path()
+    examples = dictionary_examples()
+    if with_places:
+        data = _bootstrap_data(base_path, use_snapshot=False)
+        for key in ("느좋", "핫플"):
+            examples.extend(place_examples(data.get(key) or []))
+    clf = NgramClassifier.train(examples)
+    path = os.path.join(base_path, WEIGHTS_FILE)
+    with atomic_write(path, "w", encoding="utf-8") as f:
+        json.dump(clf.to_json(), f, ensure_ascii=False, separators=(",", ":"))
+    return path, clf, len(examples)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="채팅 의도 분류기 가중치 빌드 / 문장 해석 확인")
+    ap.add_argument("--base", default=None, help="원본 JSON 폴더 (기본: AiChatbot/tests)")
+    ap.add_argument("--no-places", action="store_true", help="장소 본문 없이 키워드 사전만으로 학습")
+    ap.add_argument("--parse", metavar="TEXT", help="빌드 대신 문장 하나를 해석해 출력")
+    args = ap.parse_args(argv)
+
+    if args.parse is not None:
+        print(json.dumps(parse_intent(args.parse), ensure_ascii=False, indent=2))
+        return
+    path, clf, n = build_weights(args.base, not args.no_places)
+    print(f"[✔] 예시 {n}개 → n-gram {len(clf)}개 × {len(clf.classes)}클래스 → {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+# AiChatbot/recommender/intent_remote.py
+"""원격(LLM) 의도 해석: 로컬 해석(intent)의 확신도가 낮은 문장만 여기로 온다.
+
+같은/비슷한 문장은 정규화·의미 캐시에서 바로 답하고, 못 찾은 문장만 짧게 모아(batch) 백엔드를 한 번 부른다.
+시간 안에 답이 없으면 로컬 결과를 쓰고, 늦게 온 답은 캐시에만 넣어 다음 요청부터 쓴다.
+
+백엔드(INTENT_BACKEND): 없음(기본, 로컬만) | stub(네트워크 없는 대역, 테스트용) | openai[:모델]
+"""
+import os
+import re
+import json
+import time
+import queue
+import threading
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import numpy as np
+
+from recommender.cache import TTLCache
+from recommender.embeddings import HashingEmbedder
+from recommender.scoring import CATEGORY_HINTS, match_keywords
+from recommender.singleflight import SingleFlight
+
+INTENT_BACKEND = os.getenv("INTENT_BACKEND", "")
+# 한 묶음 최대 문장 수 / 첫 문장 뒤 더 기다리는 시간 / 동시에 보내는 묶음 수
+BATCH_MAX = int(os.getenv("INTENT_BATCH_MAX", "16"))
+BATCH_WAIT_MS = float(os.getenv("INTENT_BATCH_WAIT_MS", "15"))
+BATCH_CONCURRENCY = int(os.getenv("INTENT_BATCH_CONCURRENCY", "4"))
+# 요청이 원격 답을 기다리는 최대 시간(초). 넘으면 로컬 결과로 응답
+REMOTE_TIMEOUT = float(os.getenv("INTENT_REMOTE_TIMEOUT", "1.5"))
+CACHE_SIZE = int(os.getenv("INTENT_CACHE_SIZE", "4096"))
+CACHE_TTL = float(os.getenv("INTENT_CACHE_TTL", "86400"))
+# 정규화 키가 달라도 이 코사인 이상이면 같은 질의로 본다 (같은 서명 안에서만)
+# ("분위기좋은 술집"/"분위기 좋은 술집 있어" ≈ 0.85~1.0, "분위기 나쁜 술집"/"혼자→둘이" ≈ 0.4~0.7)
+CACHE_MIN_SIM = float(os.getenv("INTENT_CACHE_MIN_SIM", "0.85"))
+
+CATEGORIES = tuple(CATEGORY_HINTS)
+MAX_REMOTE_KEYWORDS = 5
+MAX_REMOTE_PLACES = 3
+
+# 의미 없는 요청 꼬리말 (정규화 키에서 뺀다)
+_FILLERS = re.compile(r"(추천해\s*주세요|추천해\s*줘|추천\s*좀|알려\s*주세요|알려\s*줘|찾아\s*주세요|찾아\s*줘|있을까요|있나요|어디야|어디)")
+_NON_WORD = re.compile(r"[^\w\s]+")
+
+
+def normalize_query(text):
+    """캐시 키: NFKC + 소문자, 기호/요청 꼬리말 제거, 공백 정리"""
+    s = unicodedata.normalize("NFKC", str(text or "")).lower()
+    s = _FILLERS.sub(" ", _NON_WORD.sub(" ", s))
+    return " ".join(s.split())
+
+
+def clean_result(result):
+    """백엔드 답 → {"category", "keywords", "places"} (모르는 값은 버림), 쓸 게 없으면 None"""
+    if not isinstance(result, dict):
+        return None
+    category = result.get("category")
+    if category not in CATEGORIES:
+        category = None
+
+    def _strings(v, limit):
+        if isinstance(v, str):
+            v = [v]
+        if not isinstance(v, (list, tuple)):
+            return []
+        out = []
+        for x in v:
+            x = " ".join(str(x).split()) if x is not None else ""
+            if x and x not in out:
+                out.append(x)
+        return out[:limit]
+
+    cleaned = {
+        "category": category,
+        "keywords": _strings(result.get("keywords"), MAX_REMOTE_KEYWORDS),
+        "places": _strings(result.get("places"), MAX_REMOTE_PLACES),
+    }
+    if cleaned["category"] is None and not cleaned["keywords"] and not cleaned["places"]:
+        return None
+    return cleaned
+
+
+# ───────────────────────── 캐시 ─────────────────────────
+class QueryEmbedder(HashingEmbedder):
+    """정규화 질의용 해싱 임베더: 띄어쓰기를 지운 글자 2/3-gram만 (어절 특징은 띄어쓰기 차이에 민감해서 뺌)"""
+
+    def _features(self, text):
+        s = str(text or "").replace(" ", "")
+        return [s[i:i + n] for n in (2, 3) for i in range(len(s) - n + 1)] or [s]
+
+
+class IntentCache:
+    """정규화 문장 → 원격 해석 결과.
+
+    정확히 같은 키가 없으면, 서명(로컬이 찾은 키워드/장소 참조)이 같은 항목 중
+    해싱 임베딩 코사인이 min_sim 이상인 것을 쓴다 (서명이 다르면 장소/키워드가 다른 질의라 섞지 않음).
+    """
+
+    def __init__(self, maxsize=CACHE_SIZE, ttl=CACHE_TTL, min_sim=CACHE_MIN_SIM, dim=1024):
+        self.min_sim = float(min_sim)
+        self._exact = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._embedder = QueryEmbedder(dim)
+        # 서명 → {키: 벡터}, 전체 키 순서(오래된 것부터 버림)
+        self._vectors = {}
+        self._order = OrderedDict()
+        self._lock = threading.Lock()
+        self.semantic_hits = 0
+
+    def __len__(self):
+        return len(self._order)
+
+    def get(self, key, signature):
+        value = self._exact.get(key)
+        if value is not None or self.min_sim > 1.0:
+            return value
+        with self._lock:
+            rows = self._vectors.get(signature)
+            if not rows:
+                return None
+            keys = list(rows)
+            matrix = np.stack([rows[k] for k in keys])
+        sims = matrix @ self._embedder.embed([key])[0]
+        best = int(np.argmax(sims))
+        if sims[best] < self.min_sim:
+            return None
+        value = self._exact.get(keys[best])
+        if value is not None:
+            self.semantic_hits += 1
+        return value
+
+    def put(self, key, signature, value):
+        vec = self._embedder.embed([key])[0]
+        self._exact.put(key, value)
+        with self._lock:
+            old = self._order.pop(key, None)
+            if old is not None:
+                self._vectors.get(old, {}).pop(key, None)
+            self._order[key] = signature
+            self._vectors.setdefault(signature, {})[key] = vec
+            while len(self._order) > self._exact.maxsize:
+                k, sig = self._order.popitem(last=False)
+                rows = self._vectors.get(sig)
+                if rows is not None:
+                    rows.pop(k, None)
+                    if not rows:
+                        del self._vectors[sig]
+
+    def stats(self):
+        out = self._exact.stats()
+        out["semantic_hits"] = self.semantic_hits
+        return out
+
+
+# ───────────────────────── 백엔드 ─────────────────────────
+class StubBackend:
+    """네트워크 없이 도는 대역 백엔드 (테스트/로컬 개발용).
+
+    answers(정규화 문장 → 답)에 있으면 그 답, 없으면 사전 키워드로 규칙 답. 받은 묶음은 batches에 남는다.
+    delay(초)로 원격 지연을 흉내 낸다 (INTENT_BACKEND=stub:0.2).
+    """
+
+    def __init__(self, delay=0.0, answers=None):
+        self.spec = f"stub:{float(delay):g}" if delay else "stub"
+        self.answers = {normalize_query(k): v for k, v in (answers or {}).items()}
+        self.delay = float(delay)
+        self.batches = []
+
+    def parse_batch(self, texts):
+        self.batches.append(list(texts))
+        if self.delay:
+            time.sleep(self.delay)
+        out = []
+        for text in texts:
+            answer = self.answers.get(normalize_query(text))
+            if answer is None:
+                found = match_keywords(text or "")
+                category = next((c for c, hints in CATEGORY_HINTS.items() if any(kw in hints for kw in found)), "느좋")
+                answer = {"category": category, "keywords": list(found), "places": []}
+            out.append(answer)
+        return out
+
+
+_OPENAI_PROMPT = (
+    "너는 서울 도봉구 장소 추천 챗봇의 질의 해석기다. 입력은 {\"items\": [{\"i\": 번호, \"text\": 문장}, ...]}이다. "
+    "각 문장마다 category(\"느좋\" = 조용하고 분위기 좋은 곳/자연, \"숨은핫플\" = 카페·맛집·바 같은 핫플, 모르면 null), "
+    "keywords(검색에 쓸 짧은 명사/형용사 최대 5개), places(사용자가 기준으로 말한 장소·역·동네 이름, 없으면 [])를 뽑아 "
+    "{\"results\": [{\"i\": 번호, \"category\": ..., \"keywords\": [...], \"places\": [...]}, ...]} JSON만 답하라."
+)
+
+
+class OpenAIBackend:
+    """OpenAI 채팅 API (openai 패키지 + OPENAI_API_KEY 필요). 묶음 하나를 요청 한 번(JSON 응답)으로 해석."""
+
+    def __init__(self, model=None):
+        try:
+            from openai import OpenAI
+        except ImportError as e:
+            raise RuntimeError("openai 의도 해석기를 쓰려면 openai 패키지가 필요합니다") from e
+        self.model = model or os.getenv("OPENAI_INTENT_MODEL", "gpt-4o-mini")
+        self.spec = f"openai:{self.model}"
+        self._client = OpenAI()
+
+    def parse_batch(self, texts):
+        resp = self._client.chat.completions.create(
+            model=self.model,
+            temperature=0,
+            response_format={"type": "json_object"},
+            messages=[
+                {"role": "system", "content": _OPENAI_PROMPT},
+                {"role": "user", "content": json.dumps(
+                    {"items": [{"i": i, "text": t} for i, t in enumerate(texts)]}, ensure_ascii=False,
+                )},
+            ],
+        )
+        data = json.loads(resp.choices[0].message.content or "{}").get("results") or []
+        by_i = {r.get("i"): r for r in data if isinstance(r, dict)}
+        return [by_i.get(i) for i in range(len(texts))]
+
+
+BACKENDS = {"stub": StubBackend, "openai": OpenAIBackend}
+
+
+def make_backend(spec):
+    """"이름" 또는 "이름:인자"(stub:0.2, openai:gpt-4o-mini) → 백엔드"""
+    name, _, arg = spec.partition(":")
+    cls = BACKENDS.get(name)
+    if cls is None:
+        raise ValueError(f"알 수 없는 의도 해석 백엔드: {spec}")
+    return cls(arg) if arg else cls()
+
+
+# ───────────────────────── 묶음 ─────────────────────────
+class BatchingClient:
+    """submit(text) → Future. 백그라운드 스레드가 첫 문장부터 max_wait_ms 동안(또는 max_batch개가 찰 때까지)
+    모은 문장을 중복 없이 backend.parse_batch 한 번으로 보낸다. 묶음은 최대 concurrency개까지 동시에 나간다.
+    """
+
+    def __init__(self, backend, max_batch=BATCH_MAX, max_wait_ms=BATCH_WAIT_MS, concurrency=BATCH_CONCURRENCY):
+        self.backend = backend
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._queue = queue.Queue()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, int(concurrency)), thread_name_prefix="intent-batch")
+        self._thread = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.texts = 0
+        self.errors = 0
+
+    def submit(self, text):
+        fut = Future()
+        self._queue.put((text, fut))
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, name="intent-batcher", daemon=True)
+                    self._thread.start()
+        return fut
+
+    def _loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._pool.submit(self._dispatch, batch)
+
+    def _dispatch(self, batch):
+        texts = list(dict.fromkeys(t for t, _ in batch))
+        try:
+            results = self.backend.parse_batch(texts)
+            if len(results) != len(texts):
+                raise ValueError(f"백엔드 답 개수가 다릅니다 ({len(results)} != {len(texts)})")
+        except Exception as e:
+            self.errors += 1
+            for _, fut in batch:
+                fut.set_exception(e)
+            return
+        self.batches += 1
+        self.texts += len(texts)
+        by_text = dict(zip(texts, results))
+        for text, fut in batch:
+            fut.set_result(by_text[text])
+
+    def stats(self):
+        return {"batches": self.batches, "texts": self.texts, "errors": self.errors, "queued": self._queue.qsize()}
+
+
+class RemoteIntent:
+    """캐시 → (없으면) 같은 키 요청 합치기 → 묶음 백엔드 호출"""
+
+    def __init__(self, backend, cache=None, batcher=None, timeout=REMOTE_TIMEOUT):
+        self.backend = backend
+        self.cache = cache or IntentCache()
+        self.batcher = batcher or BatchingClient(backend)
+        self.timeout = float(timeout)
+        self._flights = SingleFlight()
+        self.calls = 0
+        self.timeouts = 0
+        self.failures = 0
+
+    def resolve(self, text, signature):
+        """→ (정리된 답 또는 None, "cache" | "remote" | "timeout" | "error")"""
+        key = normalize_query(text)
+        hit = self.cache.get(key, signature)
+        if hit is not None:
+            return hit, "cache"
+        try:
+            result, _ = self._flights.do((key, signature), lambda: self._fetch(key, text, signature))
+        except FutureTimeout:
+            self.timeouts += 1
+            return None, "timeout"
+        except Exception:
+            self.failures += 1
+            return None, "error"
+        return result, "remote"
+
+    def _fetch(self, key, text, signature):
+        self.calls += 1
+        fut = self.batcher.submit(text)
+        late = []
+
+        def _store(f):
+            if f.exception() is None:
+                cleaned = clean_result(f.result())
+                if cleaned is not None:
+                    self.cache.put(key, signature, cleaned)
+
+        # 시간을 넘겨 도착한 답도 캐시에는 넣어 다음 요청부터 쓴다
+        fut.add_done_callback(lambda f: late and _store(f))
+        try:
+            result = fut.result(timeout=self.timeout)
+        except FutureTimeout:
+            late.append(True)
+            if fut.done():
+                _store(fut)
+            raise
+        cleaned = clean_result(result)
+        if cleaned is not None:
+            self.cache.put(key, signature, cleaned)
+        return cleaned
+
+    def stats(self):
+        return {
+            "backend": self.backend.spec,
+            "calls": self.calls,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "cache": self.cache.stats(),
+            "batching": self.batcher.stats(),
+        }
+
+
+_REMOTE = {}
+_REMOTE_LOCK = threading.Lock()
+
+
+def get_remote_intent(spec=None):
+    """INTENT_BACKEND(또는 spec)의 RemoteIntent (재사용), 설정이 없으면 None"""
+    spec = INTENT_BACKEND if spec is None else spec
+    if not spec:
+        return None
+    remote = _REMOTE.get(spec)
+    if remote is None:
+        with _REMOTE_LOCK:
+            remote = _REMOTE.get(spec)
+            if remote is None:
+                remote = _REMOTE[spec] = RemoteIntent(make_backend(spec))
+    return remote
@@ -0,0 +1,83 @@
+# AiChatbot/recommender/keyword_matcher.py
+"""키워드/동의어 사전을 한 번 컴파일해 두는 다중 패턴 매처 (Aho-Corasick).
+
+문장을 한 번 훑으면서 사전의 모든 표면형을 동시에 찾으므로
+요청당 비용은 사전 크기가 아니라 문장 길이(+ 찾은 개수)에 비례한다.
+"""
+from collections import deque
+
+
+class KeywordMatcher:
+    """표면형 → 대표 키워드 사전으로 만든 오토마톤.
+
+    find()는 겹치는 후보 중 왼쪽에서 가장 긴 것을 골라(예: "여자친구" > "친구")
+    겹치지 않는 매칭을 문장 순서대로 돌려준다.
+    """
+
+    def __init__(self, patterns):
+        # 상태 0 = 루트. goto[s]: 문자 → 다음 상태, out[s]: 여기서 끝나는 (길이, 대표 키워드)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        self.size = 0
+        for surface, canonical in patterns.items():
+            self._add(str(surface).lower(), canonical)
+        self._link()
+
+    def _add(self, surface, canonical):
+        if not surface:
+            return
+        s = 0
+        for ch in surface:
+            nxt = self._goto[s].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[s][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            s = nxt
+        self._out[s] = self._out[s] + ((len(surface), canonical),)
+        self.size += 1
+
+    def _link(self):
+        """BFS로 실패 링크를 잇고, 실패 상태의 출력도 미리 합쳐 둔다"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            s = queue.popleft()
+            for ch, nxt in self._goto[s].items():
+                f = self._fail[s]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                fail = self._goto[f].get(ch, 0)
+                self._fail[nxt] = fail if fail != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+                queue.append(nxt)
+
+    def find(self, text):
+        """text 안의 매칭 [(대표 키워드, 시작, 끝), ...] (왼쪽-최장, 겹침 없음, 문장 순서)"""
+        hits = []
+        s = 0
+        for i, ch in enumerate(str(text or "").lower()):
+            while s and ch not in self._goto[s]:
+                s = self._fail[s]
+            s = self._goto[s].get(ch, 0)
+            for length, canonical in self._out[s]:
+                hits.append((i + 1 - length, i + 1, canonical))
+
+        hits.sort(key=lambda h: (h[0], h[0] - h[1]))  # 시작 오름차순, 같으면 긴 것 먼저
+        picked = []
+        end = 0
+        for start, stop, canonical in hits:
+            if start >= end:
+                picked.append((canonical, start, stop))
+                end = stop
+        return picked
+
+    def keywords(self, text):
+        """text에 나온 대표 키워드 (중복 제거, 처음 나온 순서)"""
+        seen = []
+        for canonical, _, _ in self.find(text):
+            if canonical not in seen:
+                seen.append(canonical)
+        return seen
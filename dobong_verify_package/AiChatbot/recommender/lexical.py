@@ -0,0 +1,90 @@
+# AiChatbot/recommender/lexical.py
+"""장소 본문(이름/주소/설명/분류/태그) BM25 역색인.
+
+한국어는 띄어쓰기/조사가 들쭉날쭉해서 단어 대신 어절 안의 글자 2-gram을 토큰으로 쓴다
+("브런치카페" → 브런, 런치, 치카, 카페). 문서 길이 정규화까지 끝낸 항 가중치를
+색인 시점에 포스팅에 넣어 두므로 질의는 해당 토큰의 포스팅만 더하면 된다.
+"""
+import re
+import math
+from collections import Counter
+
+import numpy as np
+
+# 색인할 필드 (places_master.csv 보강 필드 포함). main_category는 출처 태그(느좋/핫플) 사본이라 뺀다
+LEXICAL_FIELDS = ("name", "address", "description", "top_category", "sub_category", "base_type")
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """텍스트 → 글자 2-gram 목록 (한 글자 어절은 그대로)"""
+    out = []
+    for word in _WORD.findall(str(text or "").lower()):
+        if len(word) == 1:
+            out.append(word)
+        else:
+            out.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return out
+
+
+def document_text(place, skip_tags=()):
+    """장소 dict → 색인할 본문 한 덩어리 (skip_tags와 같은 값은 태그든 분류 필드든 뺀다)"""
+    parts = [v for v in (place.get(f) for f in LEXICAL_FIELDS) if v not in skip_tags]
+    parts.extend(t for t in (place.get("tags") or []) if t not in skip_tags)
+    return " ".join(str(p) for p in parts if p)
+
+
+class LexicalIndex:
+    """토큰 → (문서 위치 배열, BM25 항 가중치 배열) 포스팅 목록"""
+
+    def __init__(self, docs, k1=BM25_K1, b=BM25_B):
+        raw = {}
+        lengths = []
+        for d, text in enumerate(docs):
+            tokens = tokenize(text)
+            lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                raw.setdefault(term, []).append((d, tf))
+
+        self.count = len(lengths)
+        doc_len = np.asarray(lengths, dtype=np.float64)
+        avgdl = float(doc_len.mean()) if self.count and doc_len.mean() > 0 else 1.0
+
+        self._postings = {}
+        for term, plist in raw.items():
+            ids = np.array([d for d, _ in plist], dtype=np.int64)
+            tf = np.array([c for _, c in plist], dtype=np.float64)
+            df = len(plist)
+            idf = math.log(1.0 + (self.count - df + 0.5) / (df + 0.5))
+            weight = idf * tf * (k1 + 1.0) / (tf + k1 * (1.0 - b + b * doc_len[ids] / avgdl))
+            ids.flags.writeable = False
+            weight.flags.writeable = False
+            self._postings[term] = (ids, weight)
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def vocabulary_size(self):
+        return len(self._postings)
+
+    def search(self, query):
+        """질의 → (매칭된 문서 위치 배열, BM25 점수 배열). 질의 토큰의 포스팅만 훑는다."""
+        lists = []
+        for term, qtf in Counter(tokenize(query)).items():
+            posting = self._postings.get(term)
+            if posting is not None:
+                lists.append((posting[0], posting[1] * qtf))
+        if not lists:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+        if len(lists) == 1:
+            return lists[0]
+
+        ids = np.concatenate([ids for ids, _ in lists])
+        weights = np.concatenate([w for _, w in lists])
+        hit, inverse = np.unique(ids, return_inverse=True)
+        return hit, np.bincount(inverse, weights=weights)
@@ -0,0 +1,328 @@
+# AiChatbot/recommender/map_layers.py
+"""지도 뷰포트(bbox + 줌) 질의용 격자/장소 레이어.
+
+스냅샷마다 한 번: 격자 폴리곤을 줌 단계별로 단순화(Douglas–Peucker + 좌표 자릿수 줄이기)해
+피처 하나씩 GeoJSON 바이트 조각으로 인코딩하고, 격자 bbox / 장소 좌표는 BoxBucketIndex에 넣어 둔다.
+장소는 낮은 줌 단계에서 화면 칸 단위 묶음(cluster)으로 미리 합쳐 둔다.
+요청은 bbox에 걸린 조각만 이어 붙이므로 폴리곤을 다시 직렬화하지 않는다.
+"""
+import os
+import math
+
+import numpy as np
+
+from recommender.data_loader import get_snapshot, register_derived
+from recommender.grid_bands import _feature_bbox
+from recommender.index import get_index  # noqa: F401  (requires의 "recommendation_index" 등록)
+from recommender.payload import encode_json
+from recommender.scoring import BAND_NONE, BAND_LOW50, BAND_LOW20, BAND_LABELS, TAG_NAMES, TAG_BITS
+from recommender.spatial import BoxBucketIndex
+
+# 미리 만들어 두는 줌 단계. 요청 줌은 그 이하에서 가장 가까운 단계로 내린다 (가장 낮은 단계보다 낮으면 그 단계)
+ZOOM_LEVELS = (11, 13, 15, 17)
+TILE_PX = 256
+# 단순화 허용 오차(픽셀)
+SIMPLIFY_PX = 0.5
+# 이 줌 단계부터 장소를 하나씩, 그 아래는 CLUSTER_PX 픽셀 칸 묶음으로
+PLACE_POINT_ZOOM = int(os.getenv("MAP_PLACE_POINT_ZOOM", "15"))
+CLUSTER_PX = 64
+# 한 응답의 최대 피처 수 (넘으면 잘라내고 truncated: true)
+MAX_FEATURES = int(os.getenv("MAP_MAX_FEATURES", "5000"))
+
+# band 파라미터(20/50) → 최소 밴드
+BAND_FILTERS = {None: BAND_NONE, 50: BAND_LOW50, 20: BAND_LOW20}
+
+
+def pixel_deg(zoom):
+    """웹 메르카토르 줌에서 1픽셀의 경도 폭(도)"""
+    return 360.0 / (TILE_PX * 2 ** zoom)
+
+
+def level_for(zoom):
+    """요청 줌 → 미리 만들어 둔 줌 단계"""
+    below = [z for z in ZOOM_LEVELS if z <= zoom]
+    return below[-1] if below else ZOOM_LEVELS[0]
+
+
+def snap_bbox(bbox, level):
+    """(min_lon, min_lat, max_lon, max_lat)를 그 줌의 타일(경위도 같은 폭) 경계로 바깥쪽으로 맞춤.
+
+    조금씩 움직인 뷰포트도 같은 타일 범위면 같은 응답(캐시 키)이 된다.
+    """
+    t = 360.0 / 2 ** level
+    w, s, e, n = bbox
+    return (
+        round(math.floor(w / t) * t, 10), round(math.floor(s / t) * t, 10),
+        round(math.ceil(e / t) * t, 10), round(math.ceil(n / t) * t, 10),
+    )
+
+
+def viewport(bbox, zoom):
+    """요청 (bbox, 줌) → (줌 단계, 타일 경계로 넓힌 bbox). 응답과 캐시 키는 이 값으로 정해진다."""
+    level = level_for(zoom)
+    return level, snap_bbox(bbox, level)
+
+
+def _decimals(level):
+    """좌표 반올림 오차가 1/4픽셀 이하가 되는 소수 자릿수"""
+    return max(0, math.ceil(math.log10(2.0 / pixel_deg(level))))
+
+
+# ───────────────────────── 폴리곤 단순화 ─────────────────────────
+def _simplify_line(pts, tol):
+    """Douglas–Peucker: 양 끝점은 두고 tol 이내로 벗어난 점만 남김 (pts: (n, 2) 배열)"""
+    n = len(pts)
+    if n < 3:
+        return pts
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        seg = pts[b] - pts[a]
+        rel = pts[a + 1:b] - pts[a]
+        norm = math.hypot(seg[0], seg[1])
+        if norm == 0.0:
+            d = np.hypot(rel[:, 0], rel[:, 1])
+        else:
+            d = np.abs(seg[0] * rel[:, 1] - seg[1] * rel[:, 0]) / norm
+        i = int(np.argmax(d))
+        if d[i] > tol:
+            m = a + 1 + i
+            keep[m] = True
+            stack.append((a, m))
+            stack.append((m, b))
+    return pts[keep]
+
+
+def _simplify_ring(ring, tol, decimals):
+    """닫힌 고리 → 단순화 + 반올림된 좌표 목록, 점 4개 미만으로 줄면 None.
+
+    시작점에서 가장 먼 점으로 고리를 둘로 나눠 각각 단순화한다.
+    """
+    pts = np.asarray([c[:2] for c in ring], dtype=np.float64).reshape(-1, 2)
+    if len(pts) < 3:
+        return None
+    if not np.array_equal(pts[0], pts[-1]):
+        pts = np.vstack([pts, pts[:1]])
+    far = int(np.argmax(np.hypot(*(pts - pts[0]).T)))
+    if far == 0:
+        return None
+    out = np.vstack([_simplify_line(pts[:far + 1], tol)[:-1], _simplify_line(pts[far:], tol)])
+    out = np.round(out, decimals)
+    # 반올림으로 겹친 연속 점 제거
+    out = out[np.r_[True, np.any(out[1:] != out[:-1], axis=1)]]
+    return out.tolist() if len(out) >= 4 else None
+
+
+def _simplify_polygon(rings, tol, decimals):
+    outer = _simplify_ring(rings[0], tol, decimals) if rings else None
+    if outer is None:
+        return None
+    holes = [h for h in (_simplify_ring(r, tol, decimals) for r in rings[1:]) if h is not None]
+    return [outer] + holes
+
+
+def simplify_geometry(geom, level, bbox):
+    """Polygon/MultiPolygon → 그 줌 단계용 geometry. 픽셀보다 작아져 사라지면 bbox 중심 Point."""
+    tol = SIMPLIFY_PX * pixel_deg(level)
+    decimals = _decimals(level)
+    kind = (geom or {}).get("type")
+    coords = (geom or {}).get("coordinates") or []
+    if kind == "Polygon":
+        poly = _simplify_polygon(coords, tol, decimals)
+        if poly is not None:
+            return {"type": "Polygon", "coordinates": poly}
+    elif kind == "MultiPolygon":
+        polys = [p for p in (_simplify_polygon(c, tol, decimals) for c in coords) if p is not None]
+        if polys:
+            return {"type": "MultiPolygon", "coordinates": polys}
+    min_lat, min_lon, max_lat, max_lon = bbox
+    return {
+        "type": "Point",
+        "coordinates": [round((min_lon + max_lon) / 2.0, decimals), round((min_lat + max_lat) / 2.0, decimals)],
+    }
+
+
+# ───────────────────────── 레이어 ─────────────────────────
+def _feature(props, geometry):
+    return encode_json({"type": "Feature", "properties": props, "geometry": geometry})
+
+
+class MapLayer:
+    """bbox 인덱스 + 피처 조각(위치별 인코딩된 바이트) + 필터용 밴드/태그 배열"""
+
+    __slots__ = ("spatial", "chunks", "band", "tag_mask")
+
+    def __init__(self, boxes, chunks, band, tag_mask):
+        self.spatial = BoxBucketIndex(boxes)
+        self.chunks = tuple(chunks)
+        self.band = np.asarray(band, dtype=np.int8)
+        self.tag_mask = np.asarray(tag_mask, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def query(self, bbox, min_band=BAND_NONE, tag_bit=0, limit=MAX_FEATURES):
+        """(min_lon, min_lat, max_lon, max_lat) → (조각 목록, 잘렸는지)"""
+        w, s, e, n = bbox
+        pos = self.spatial.query_bbox(s, w, n, e)
+        if min_band > BAND_NONE:
+            pos = pos[self.band[pos] >= min_band]
+        if tag_bit:
+            pos = pos[(self.tag_mask[pos] & tag_bit) != 0]
+        return [self.chunks[i] for i in pos[:limit].tolist()], len(pos) > limit
+
+
+def _grid_cells(grid_geojson):
+    """(low20, low50) FeatureCollection → grid_id 순 [(grid_id, props, geometry, bbox, 밴드)].
+
+    GridBandLookup처럼 두 파일에 다 있는 칸은 20%로 남긴다.
+    """
+    low20, low50 = grid_geojson or (None, None)
+    cells = {}
+    for fc, band in ((low50, BAND_LOW50), (low20, BAND_LOW20)):
+        for feat in (fc or {}).get("features") or []:
+            props = feat.get("properties") or {}
+            gid = props.get("grid_id")
+            bbox = _feature_bbox(feat)
+            if gid is None or bbox is None:
+                continue
+            cells[int(gid)] = (props, feat.get("geometry"), bbox, band)
+    return [(gid,) + cells[gid] for gid in sorted(cells)]
+
+
+def build_grid_layers(grid_geojson):
+    """줌 단계 → 격자 MapLayer (단계마다 geometry를 단순화해 인코딩)"""
+    cells = _grid_cells(grid_geojson)
+    boxes = [c[3] for c in cells]
+    band = [c[4] for c in cells]
+    layers = {}
+    for level in ZOOM_LEVELS:
+        chunks = [
+            _feature(
+                {
+                    "grid_id": gid, "band_label": BAND_LABELS[b],
+                    "rank_pct": props.get("rank_pct"), "final_score": props.get("final_score"),
+                },
+                simplify_geometry(geom, level, bbox),
+            )
+            for gid, props, geom, bbox, b in cells
+        ]
+        layers[level] = MapLayer(boxes, chunks, band, np.zeros(len(cells)))
+    return layers
+
+
+def _cluster_layer(index, point_chunks, members, level):
+    """members(인덱스 위치)를 CLUSTER_PX 픽셀 칸으로 묶은 MapLayer (혼자인 칸은 장소 피처 그대로)"""
+    if len(members) == 0:
+        return MapLayer(np.zeros((0, 4)), [], [], [])
+    cell = CLUSTER_PX * pixel_deg(level)
+    decimals = _decimals(level)
+    lat, lon = index.lat[members], index.lon[members]
+    keys = np.stack([np.floor(lat / cell), np.floor(lon / cell)], axis=1)
+    _, inv = np.unique(keys, axis=0, return_inverse=True)
+    inv = inv.reshape(-1)
+    count = np.bincount(inv)
+    c_lat = np.bincount(inv, lat) / count
+    c_lon = np.bincount(inv, lon) / count
+    band = np.zeros(len(count), dtype=np.int8)
+    np.maximum.at(band, inv, index.band[members])
+    tags = np.zeros(len(count), dtype=np.int64)
+    np.bitwise_or.at(tags, inv, index.tag_mask[members].astype(np.int64))
+    # 혼자인 칸의 장소 위치 (여럿인 칸은 쓰지 않음)
+    first = np.zeros(len(count), dtype=np.int64)
+    first[inv] = members
+
+    chunks, boxes = [], []
+    for k in range(len(count)):
+        if count[k] == 1:
+            chunks.append(point_chunks[first[k]])
+            boxes.append((c_lat[k], c_lon[k], c_lat[k], c_lon[k]))
+            continue
+        y, x = round(float(c_lat[k]), decimals), round(float(c_lon[k]), decimals)
+        chunks.append(_feature(
+            {"cluster": True, "count": int(count[k]), "band_label": BAND_LABELS[band[k]]},
+            {"type": "Point", "coordinates": [x, y]},
+        ))
+        boxes.append((y, x, y, x))
+    return MapLayer(boxes, chunks, band, tags)
+
+
+class MapLayers:
+    """스냅샷 하나의 지도 레이어: 줌 단계별 격자 / 장소(낮은 줌은 필터 조합별 묶음)"""
+
+    def __init__(self, grid_geojson, index):
+        self.grids = build_grid_layers(grid_geojson)
+
+        n = len(index.ids)
+        coords = np.isfinite(index.lat) & np.isfinite(index.lon)
+        point_chunks = [None] * n
+        for i in np.flatnonzero(coords).tolist():
+            point_chunks[i] = _feature(
+                {
+                    "placeId": index.ids[i], "name": index.names[i],
+                    "tags": [t for t in TAG_NAMES if index.tag_mask[i] & TAG_BITS[t]],
+                    "band_label": BAND_LABELS[index.band[i]],
+                },
+                {"type": "Point", "coordinates": [float(index.lon[i]), float(index.lat[i])]},
+            )
+        members = np.flatnonzero(coords)
+        lat, lon = index.lat[members], index.lon[members]
+        points = MapLayer(
+            np.stack([lat, lon, lat, lon], axis=1),
+            [point_chunks[i] for i in members.tolist()],
+            index.band[members], index.tag_mask[members],
+        )
+
+        # 묶음은 필터를 먼저 적용한 장소로 만들어야 개수가 맞으므로 (태그, 최소 밴드) 조합마다 따로 둔다
+        self.places = {}
+        for level in ZOOM_LEVELS:
+            if level >= PLACE_POINT_ZOOM:
+                self.places[level] = points
+                continue
+            for tag_bit in (0,) + tuple(TAG_BITS[t] for t in TAG_NAMES):
+                for min_band in sorted(set(BAND_FILTERS.values())):
+                    keep = index.band[members] >= min_band
+                    if tag_bit:
+                        keep &= (index.tag_mask[members] & tag_bit) != 0
+                    self.places[(level, tag_bit, min_band)] = _cluster_layer(
+                        index, point_chunks, members[keep], level,
+                    )
+
+    def grids_body(self, level, bbox, band=None):
+        """격자 FeatureCollection 바이트 (level, bbox는 viewport()를 거친 값)"""
+        chunks, truncated = self.grids[level].query(bbox, BAND_FILTERS[band])
+        return _collection(level, bbox, chunks, truncated)
+
+    def places_body(self, level, bbox, category=None, band=None, limit=MAX_FEATURES):
+        """장소 FeatureCollection 바이트 (PLACE_POINT_ZOOM 아래 단계는 묶음 + 혼자인 장소)"""
+        tag_bit = TAG_BITS[category] if category else 0
+        min_band = BAND_FILTERS[band]
+        layer = self.places.get(level)
+        if layer is not None:
+            chunks, truncated = layer.query(bbox, min_band, tag_bit, limit)
+        else:
+            chunks, truncated = self.places[(level, tag_bit, min_band)].query(bbox, limit=limit)
+        return _collection(level, bbox, chunks, truncated)
+
+
+def _collection(level, bbox, chunks, truncated):
+    head = encode_json({
+        "type": "FeatureCollection", "zoom": level, "bbox": list(bbox),
+        "count": len(chunks), "truncated": truncated,
+    })
+    return head[:-1] + b',"features":[' + b",".join(chunks) + b"]}"
+
+
+def build_map_layers(data, index):
+    return MapLayers(data.get("grid_geojson"), index)
+
+
+register_derived("map_layers", build_map_layers, requires=("recommendation_index",))
+
+def get_map_layers(snapshot=None):
+    """snapshot(없으면 현재 스냅샷)의 지도 레이어"""
+    return (snapshot or get_snapshot()).derived("map_layers")
@@ -0,0 +1,231 @@
+# AiChatbot/recommender/metrics.py
+"""요청/단계별 지연 시간 히스토그램 + Prometheus 텍스트 출력 + 표본 cProfile.
+
+핫패스에서는 perf_counter 두 번과 버킷 카운트 증가만 한다. 분위수(p50/p95/p99)는
+읽을 때 버킷에서 보간해 계산한다.
+"""
+import os, time, random, threading, cProfile
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+
+# 히스토그램 버킷 상한(초). 마지막 버킷 위는 +Inf
+BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+QUANTILES = (0.5, 0.95, 0.99)
+
+_local = threading.local()
+
+
+def set_route(route):
+    """지금 스레드가 처리 중인 라우트 (단계 타이머의 라벨)"""
+    _local.route = route
+
+
+def current_route():
+    return getattr(_local, "route", "other")
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def quantile(self, q):
+        """버킷 안에서 선형 보간한 q 분위수(초). 관측이 없으면 None"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if c and seen + c >= rank:
+                lo = BUCKETS[i - 1] if i else 0.0
+                if i == len(BUCKETS):  # +Inf 버킷은 마지막 상한으로
+                    return lo
+                return lo + (BUCKETS[i] - lo) * (rank - seen) / c
+            seen += c
+        return BUCKETS[-1]
+
+    def summary(self):
+        out = {"count": self.count}
+        for q in QUANTILES:
+            v = self.quantile(q)
+            out[f"p{int(q * 100)}_ms"] = None if v is None else round(v * 1000, 3)
+        return out
+
+
+def _labels(**labels):
+    parts = []
+    for k, v in labels.items():
+        v = str(v).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        parts.append(f'{k}="{v}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _num(v):
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class Metrics:
+    """(라우트, 단계) 히스토그램 + 라우트별 요청 수/응답 캐시 결과 카운터"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hist = {}
+        self._requests = Counter()
+        self._cache = Counter()
+
+    def observe(self, stage, seconds, route=None):
+        key = (route or current_route(), stage)
+        with self._lock:
+            hist = self._hist.get(key)
+            if hist is None:
+                hist = self._hist[key] = Histogram()
+            hist.observe(seconds)
+
+    @contextmanager
+    def timed(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def record_request(self, route, status, seconds, cache_state=None):
+        """요청 하나 끝: 전체 시간은 stage="request"로, 상태 코드/캐시 결과는 카운터로"""
+        with self._lock:
+            self._requests[(route, int(status))] += 1
+            if cache_state:
+                self._cache[(route, cache_state)] += 1
+        self.observe("request", seconds, route)
+
+    def summary(self):
+        """/api/health용: 라우트별 요청 수, 단계별 p50/p95/p99(ms), 응답 캐시 적중률"""
+        with self._lock:
+            hist = {k: h.summary() for k, h in self._hist.items()}
+            requests = dict(self._requests)
+            cache = dict(self._cache)
+
+        out = {}
+        for (route, stage), s in sorted(hist.items()):
+            entry = out.setdefault(route, {"requests": 0, "stages": {}})
+            entry["stages"][stage] = s
+        for (route, status), n in requests.items():
+            entry = out.setdefault(route, {"requests": 0, "stages": {}})
+            entry["requests"] += n
+            entry.setdefault("status", {})[str(status)] = n
+        for route, entry in out.items():
+            states = {state: n for (r, state), n in cache.items() if r == route}
+            if states:
+                looked = sum(states.values())
+                entry["cache"] = states
+                entry["cache_hit_rate"] = round(states.get("HIT", 0) / looked, 4)
+        return out
+
+    def render_prometheus(self, extra=()):
+        """Prometheus 텍스트 포맷(0.0.4). extra: (이름, 타입, 설명, 값) 목록"""
+        with self._lock:
+            hist = [(k, list(h.counts), h.total, h.count) for k, h in sorted(self._hist.items())]
+            requests = sorted(self._requests.items())
+            cache = sorted(self._cache.items())
+
+        lines = [
+            "# HELP dobong_stage_seconds Latency of each request stage in seconds.",
+            "# TYPE dobong_stage_seconds histogram",
+        ]
+        for (route, stage), counts, total, count in hist:
+            cum = 0
+            for bound, c in zip(BUCKETS, counts):
+                cum += c
+                lines.append(f"dobong_stage_seconds_bucket{_labels(route=route, stage=stage, le=bound)} {cum}")
+            lines.append(f"dobong_stage_seconds_bucket{_labels(route=route, stage=stage, le='+Inf')} {count}")
+            lines.append(f"dobong_stage_seconds_sum{_labels(route=route, stage=stage)} {total!r}")
+            lines.append(f"dobong_stage_seconds_count{_labels(route=route, stage=stage)} {count}")
+
+        lines += [
+            "# HELP dobong_requests_total Requests by route and status code.",
+            "# TYPE dobong_requests_total counter",
+        ]
+        for (route, status), n in requests:
+            lines.append(f"dobong_requests_total{_labels(route=route, status=status)} {n}")
+
+        lines += [
+            "# HELP dobong_response_cache_total Response cache lookups by route and result.",
+            "# TYPE dobong_response_cache_total counter",
+        ]
+        for (route, state), n in cache:
+            lines.append(f"dobong_response_cache_total{_labels(route=route, result=state)} {n}")
+
+        for name, kind, help_text, value in extra:
+            if value is None:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {_num(value)}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+
+
+def timed(stage):
+    """with timed("score"): ... → 지금 라우트의 단계 히스토그램에 기록"""
+    return METRICS.timed(stage)
+
+
+# ───────────────────────── 표본 프로파일링 ─────────────────────────
+# PROFILE_DIR가 있을 때만 켜진다. X-Profile 헤더가 붙은 요청 중 PROFILE_SAMPLE_RATE 비율만 cProfile로 떠서 저장.
+PROFILE_HEADER = "X-Profile"
+PROFILE_DIR = os.getenv("PROFILE_DIR", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0.1"))
+
+
+class SamplingProfiler:
+    """한 번에 한 요청만 프로파일 (cProfile은 동시에 여러 개 켜면 결과가 섞인다)"""
+
+    def __init__(self, directory=PROFILE_DIR, rate=PROFILE_SAMPLE_RATE):
+        self.directory = directory
+        self.rate = float(rate)
+        self.dumps = 0
+        self._busy = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.directory) and self.rate > 0
+
+    def start(self, requested):
+        """요청에 프로파일 헤더가 있고 표본에 뽑히면 켜진 Profile, 아니면 None"""
+        if not (self.enabled and requested) or random.random() >= self.rate:
+            return None
+        if not self._busy.acquire(blocking=False):
+            return None
+        prof = cProfile.Profile()
+        try:
+            prof.enable()
+        except ValueError:  # 다른 프로파일러가 이미 켜져 있음
+            self._busy.release()
+            return None
+        return prof
+
+    def finish(self, prof, route):
+        """프로파일을 끄고 <PROFILE_DIR>/<라우트>-<ms>-<pid>.prof로 저장 → 파일 경로"""
+        try:
+            prof.disable()
+            os.makedirs(self.directory, exist_ok=True)
+            name = route.strip("/").replace("/", "_") or "root"
+            path = os.path.join(self.directory, f"{name}-{int(time.time() * 1000)}-{os.getpid()}.prof")
+            prof.dump_stats(path)
+            self.dumps += 1
+            return path
+        finally:
+            self._busy.release()
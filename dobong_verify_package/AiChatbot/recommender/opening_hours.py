@@ -0,0 +1,140 @@
+# AiChatbot/recommender/opening_hours.py
+"""영업시간 문자열 → 주간 분 단위 비트맵.
+
+Google Places의 weekday_text("Monday: 11:00 AM – 9:30 PM", "Sunday: Closed", "Open 24 hours")를
+로드 시 한 번 파싱해 장소마다 7×1440비트(1260바이트)로 압축해 두고,
+요청 시에는 "그 분(minute)의 비트"만 열 하나로 꺼내 영업 중 마스크를 만든다.
+"""
+import re
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+MINUTES_PER_DAY = 1440
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+KST = timezone(timedelta(hours=9))  # 서머타임 없음
+
+_DAYS = {
+    "monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3, "friday": 4, "saturday": 5, "sunday": 6,
+    "월요일": 0, "화요일": 1, "수요일": 2, "목요일": 3, "금요일": 4, "토요일": 5, "일요일": 6,
+}
+_SPACES = re.compile(r"[   \s]+")
+_DASHES = re.compile(r"\s*[–—~-]\s*")
+_TIME = re.compile(r"(오전|오후)?\s*(\d{1,2})(?::(\d{2}))?\s*(am|pm)?", re.I)
+
+
+def _clock(match, default_meridiem=None):
+    """정규식 매치 → (하루 중 분, 오전/오후 표기 or None)"""
+    ko, hh, mm, en = match.groups()
+    meridiem = (en or "").lower() or {"오전": "am", "오후": "pm"}.get(ko) or default_meridiem
+    h, m = int(hh), int(mm or 0)
+    if meridiem == "pm" and h < 12:
+        h += 12
+    elif meridiem == "am" and h == 12:
+        h = 0
+    return h * 60 + m, meridiem
+
+
+def _parse_range(text):
+    """"11:00 AM-9:30 PM" → (시작 분, 끝 분) 또는 None. 시작에 오전/오후가 없으면 끝 것을 따른다."""
+    parts = _DASHES.split(text.strip(), maxsplit=1)
+    if len(parts) != 2:
+        return None
+    m0, m1 = _TIME.fullmatch(parts[0].strip()), _TIME.fullmatch(parts[1].strip())
+    if not m0 or not m1:
+        return None
+    end, end_meridiem = _clock(m1)
+    start, _ = _clock(m0, end_meridiem)
+    if m0.group(1) is None and m0.group(4) is None and end_meridiem and start > end:
+        start, _ = _clock(m0, "am")  # "11:00 – 2:30 PM" → 오전 11시
+    return start, end
+
+
+def parse_week(lines):
+    """영업시간 문자열 목록 → 주간 bool 배열(길이 10080, 월요일 0시 기준) 또는 None(정보 없음/해석 불가)"""
+    if not lines:
+        return None
+    week = np.zeros(MINUTES_PER_WEEK, dtype=bool)
+    seen = False
+    for line in lines:
+        day_name, sep, rest = _SPACES.sub(" ", str(line)).partition(":")
+        day = _DAYS.get(day_name.strip().lower())
+        if day is None or not sep:
+            continue
+        rest = rest.strip().lower()
+        base = day * MINUTES_PER_DAY
+        seen = True
+        if rest in ("closed", "휴무일", "휴무"):
+            continue
+        if rest in ("open 24 hours", "24시간 영업"):
+            week[base:base + MINUTES_PER_DAY] = True
+            continue
+        for chunk in rest.split(","):
+            rng = _parse_range(chunk)
+            if rng is None:
+                continue
+            start, end = rng
+            if end <= start:
+                end += MINUTES_PER_DAY  # 자정을 넘기는 영업
+            idx = np.arange(base + start, base + end) % MINUTES_PER_WEEK
+            week[idx] = True
+    return week if seen else None
+
+
+def minute_of_week(dt):
+    """datetime → 월요일 0시 기준 분 (naive는 KST로 본다)"""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(KST)
+    return dt.weekday() * MINUTES_PER_DAY + dt.hour * 60 + dt.minute
+
+
+def now_minute_of_week():
+    return minute_of_week(datetime.now(KST))
+
+
+def parse_open_at(value):
+    """open_at 파라미터 → 주간 분. ISO 날짜시각("2025-10-18T14:30", 오프셋 가능) 또는 정수(주간 분)"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool):
+        raise ValueError("open_at 형식이 올바르지 않습니다")
+    if isinstance(value, (int, float)):
+        return int(value) % MINUTES_PER_WEEK
+    return minute_of_week(datetime.fromisoformat(str(value).strip()))
+
+
+class OpeningHoursTable:
+    """장소별 주간 비트맵 (n × 1260바이트, np.packbits 순서) + 정보 유무"""
+
+    def __init__(self, hours_lists):
+        # 같은 영업시간 표기(체인/템플릿이 많음)는 한 번만 파싱해 비트맵을 같이 쓴다
+        distinct, table, codes = {}, [np.zeros(MINUTES_PER_WEEK // 8, dtype=np.uint8)], []
+        known = [False]
+        for h in hours_lists:
+            key = None if not h else h if isinstance(h, str) else tuple(str(x) for x in h)
+            code = distinct.get(key)
+            if code is None:
+                week = parse_week(h)
+                if week is None:
+                    code = 0  # 정보 없음 → 0번(빈 비트맵)
+                else:
+                    code = len(table)
+                    table.append(np.packbits(week))
+                    known.append(True)
+                distinct[key] = code
+            codes.append(code)
+        codes = np.asarray(codes, dtype=np.int64)
+        self.known = np.asarray(known, dtype=bool)[codes]
+        self.bits = np.stack(table)[codes]
+        self.known.flags.writeable = False
+        self.bits.flags.writeable = False
+
+    def __len__(self):
+        return len(self.known)
+
+    def open_mask(self, minute, unknown_open=True):
+        """그 주간 분에 영업 중인 장소 마스크 (영업시간 정보가 없으면 unknown_open)"""
+        minute = int(minute) % MINUTES_PER_WEEK
+        col = self.bits[:, minute // 8]
+        is_open = ((col >> (7 - minute % 8)) & 1).astype(bool)
+        return np.where(self.known, is_open, unknown_open)
@@ -0,0 +1,141 @@
+# AiChatbot/recommender/payload.py
+"""응답 JSON 조립.
+
+장소 레코드는 인덱스 위치마다 한 번만 NaN/Infinity 정제 + 필드별 JSON 인코딩을 해 두고(PlaceFragments),
+응답은 그 조각들에 요청별 필드(band_label, final_score)만 붙여 이어 붙인다.
+"""
+import os
+import json
+import math
+from collections.abc import Mapping
+
+from recommender.cache import TTLCache
+
+_SEPARATORS = (",", ":")
+# 인덱스마다 만들어 둘 장소 조각 수 (LRU). 응답에 자주 실리는 장소만 남는다
+FRAGMENT_CACHE_SIZE = int(os.getenv("FRAGMENT_CACHE_SIZE", "4096"))
+
+
+def sanitize(obj):
+    """dict/list 깊은 곳까지 NaN/Infinity를 None으로 치환"""
+    if isinstance(obj, dict):
+        return {k: sanitize(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [sanitize(x) for x in obj]
+    if isinstance(obj, float):
+        if math.isnan(obj) or math.isinf(obj):
+            return None
+    return obj
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=_SEPARATORS).encode("utf-8")
+
+
+def _member(key, value):
+    """이미 정제된 값 → b'"key":value'"""
+    return _dumps(str(key)) + b":" + _dumps(value)
+
+
+def parse_fields(value):
+    """fields 파라미터("name,placeId" 또는 리스트) → 정렬된 튜플, 없으면 None(전체)"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.split(",")
+    try:
+        names = {str(v).strip() for v in value}
+    except TypeError:
+        return None
+    names.discard("")
+    return tuple(sorted(names)) or None
+
+
+class PlaceFragments:
+    """인덱스 위치 → (정제된 dict, ((필드, 인코딩된 조각), ...)) 메모.
+
+    처음 응답에 실릴 때 만들고 최근 maxsize개만 들고 있는다 (로드/핫리로드 때 전부 인코딩하지 않음).
+    """
+
+    def __init__(self, places, maxsize=FRAGMENT_CACHE_SIZE):
+        self.places = places
+        self._memo = TTLCache(maxsize=maxsize, ttl=0)
+
+    def __len__(self):
+        return len(self._memo)
+
+    def get(self, i):
+        item = self._memo.get(i)
+        if item is None:
+            clean = sanitize(dict(self.places[i]))
+            parts = tuple(
+                (k, _member(k, v)) for k, v in clean.items()
+                if k not in PlaceView.REQUEST_FIELDS
+            )
+            item = (clean, parts)
+            self._memo.put(i, item)
+        return item
+
+    def stats(self):
+        return self._memo.stats()
+
+    def view(self, i, band_label, final_score, fields=None):
+        clean, parts = self.get(i)
+        return PlaceView(clean, parts, band_label, final_score, fields)
+
+
+class PlaceView(Mapping):
+    """요청별 결과 레코드. 원본 조각은 공유하고 band_label/final_score만 얹는다.
+
+    dict처럼 읽을 수 있고(r.get("name") 등), 인코딩은 to_json()이 조각을 이어 붙여 한다.
+    fields가 있으면 그 장소 필드만 남긴다 (band_label/final_score는 항상 포함).
+    """
+
+    REQUEST_FIELDS = ("band_label", "final_score")
+    __slots__ = ("_clean", "_parts", "band_label", "final_score", "fields")
+
+    def __init__(self, clean, parts, band_label, final_score, fields=None):
+        self._clean = clean
+        self._parts = parts
+        self.band_label = band_label
+        self.final_score = final_score
+        self.fields = frozenset(fields) if fields else None
+
+    def _place_keys(self):
+        return [k for k, _ in self._parts if self.fields is None or k in self.fields]
+
+    def __getitem__(self, key):
+        if key == "band_label":
+            return self.band_label
+        if key == "final_score":
+            return self.final_score
+        if key in self.REQUEST_FIELDS or (self.fields is not None and key not in self.fields):
+            raise KeyError(key)
+        return self._clean[key]
+
+    def __iter__(self):
+        yield from self._place_keys()
+        yield from self.REQUEST_FIELDS
+
+    def __len__(self):
+        return len(self._place_keys()) + len(self.REQUEST_FIELDS)
+
+    def to_json(self):
+        body = [p for k, p in self._parts if self.fields is None or k in self.fields]
+        body.append(_member("band_label", self.band_label))
+        body.append(_member("final_score", sanitize(self.final_score)))
+        return b"{" + b",".join(body) + b"}"
+
+
+def encode_json(obj):
+    """응답 객체 → UTF-8 JSON 바이트. PlaceView는 캐시된 조각을 그대로 이어 붙인다."""
+    if isinstance(obj, PlaceView):
+        return obj.to_json()
+    if isinstance(obj, dict):
+        return b"{" + b",".join(
+            _dumps(k if isinstance(k, str) else str(k)) + b":" + encode_json(v)
+            for k, v in obj.items()
+        ) + b"}"
+    if isinstance(obj, (list, tuple)):
+        return b"[" + b",".join(encode_json(x) for x in obj) + b"]"
+    return _dumps(sanitize(obj))
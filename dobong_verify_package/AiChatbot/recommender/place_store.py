@@ -0,0 +1,342 @@
+# AiChatbot/recommender/place_store.py
+"""장소 스냅샷(.snapshot) 바이너리 포맷.
+
+JSON 원본을 열 단위로 펼쳐 한 파일에 담는다. 서버는 mmap으로 열어 배열을 복사 없이 보고,
+레코드 dict는 필요한 것(응답에 실릴 k개 등)만 그때그때 만든다.
+
+레이아웃: MAGIC(4) | FORMAT_VERSION(uint32) | header_len(uint64) | header(JSON) | 8바이트 정렬 | 데이터 영역
+- strings.off/strings.data : 중복 제거한 문자열 테이블 (uint64 오프셋 + UTF-8 바이트)
+- present / nulls          : 레코드별 필드 존재 / 값이 null인 비트 (uint64)
+- source                   : 레코드 출처 (SOURCES 순서, uint8)
+- <필드>                    : str/json → 문자열 id(int32), num/int → float64
+- <필드>.off/<필드>.items     : strlist → 오프셋 테이블(uint32) + 문자열 id 목록(int32)
+
+빌드: python -m recommender.place_store [--base tests] [--out tests/places.snapshot]
+"""
+import os, json, mmap, struct, argparse
+
+import numpy as np
+
+from recommender.fileio import atomic_write
+
+MAGIC = b"DBPS"
+FORMAT_VERSION = 1
+SNAPSHOT_FILE = "places.snapshot"
+SOURCES = ("핫플", "느좋")
+
+_PREFIX = struct.Struct("<4sIQ")
+_MAX_FIELDS = 64  # present 비트 수
+
+
+def _align(n, a=8):
+    return (n + a - 1) // a * a
+
+
+def _field_kind(values):
+    vals = [v for v in values if v is not None]
+    if all(isinstance(v, str) for v in vals):
+        return "str"
+    if all(isinstance(v, int) and not isinstance(v, bool) for v in vals):
+        return "int"
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in vals):
+        return "num"
+    if all(isinstance(v, list) and all(isinstance(x, str) for x in v) for v in vals):
+        return "strlist"
+    return "json"
+
+
+class _StringTable:
+    def __init__(self):
+        self.ids = {}
+        self.items = []
+
+    def intern(self, s):
+        sid = self.ids.get(s)
+        if sid is None:
+            sid = self.ids[s] = len(self.items)
+            self.items.append(s)
+        return sid
+
+
+def write_store(path, records, sources, extra=None):
+    """records(dict 목록)와 출처 코드 목록을 열 단위 스냅샷 파일로 기록 (임시 파일 → 교체)"""
+    n = len(records)
+    names = []
+    for rec in records:
+        for k in rec:
+            if k not in names:
+                names.append(k)
+    if len(names) > _MAX_FIELDS:
+        raise ValueError(f"필드가 너무 많습니다({len(names)} > {_MAX_FIELDS})")
+
+    strings = _StringTable()
+    fields = []
+    columns = {}
+    present = np.zeros(n, dtype=np.uint64)
+    nulls = np.zeros(n, dtype=np.uint64)
+
+    for j, name in enumerate(names):
+        values = [rec.get(name) for rec in records]
+        kind = _field_kind(values)
+        fields.append({"name": name, "kind": kind})
+        bit = np.uint64(1 << j)
+        for i, rec in enumerate(records):
+            if name in rec:
+                present[i] |= bit
+                if rec[name] is None:
+                    nulls[i] |= bit
+
+        if kind in ("str", "json"):
+            col = np.full(n, -1, dtype=np.int32)
+            for i, v in enumerate(values):
+                if v is not None:
+                    text = v if kind == "str" else json.dumps(v, ensure_ascii=False)
+                    col[i] = strings.intern(text)
+            columns[name] = col
+        elif kind in ("num", "int"):
+            columns[name] = np.array(
+                [np.nan if v is None else float(v) for v in values], dtype=np.float64
+            )
+        else:  # strlist
+            off = np.zeros(n + 1, dtype=np.uint32)
+            items = []
+            for i, v in enumerate(values):
+                items.extend(strings.intern(x) for x in (v or []))
+                off[i + 1] = len(items)
+            columns[name + ".off"] = off
+            columns[name + ".items"] = np.array(items, dtype=np.int32)
+
+    encoded = [s.encode("utf-8") for s in strings.items]
+    str_off = np.zeros(len(encoded) + 1, dtype=np.uint64)
+    if encoded:
+        str_off[1:] = np.cumsum([len(b) for b in encoded])
+    columns["strings.off"] = str_off
+    columns["strings.data"] = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    columns["present"] = present
+    columns["nulls"] = nulls
+    columns["source"] = np.asarray(sources, dtype=np.uint8)
+
+    layout = {}
+    offset = 0
+    for name, arr in columns.items():
+        layout[name] = [arr.dtype.str, offset, int(arr.size)]
+        offset = _align(offset + arr.nbytes)
+
+    header = json.dumps({
+        "count": n,
+        "sources": list(SOURCES),
+        "fields": fields,
+        "columns": layout,
+        "extra": extra or {},
+    }, ensure_ascii=False).encode("utf-8")
+    data_start = _align(_PREFIX.size + len(header))
+
+    with atomic_write(path) as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        f.write(b"\0" * (data_start - _PREFIX.size - len(header)))
+        for name, arr in columns.items():
+            start = data_start + layout[name][1]
+            f.write(b"\0" * (start - f.tell()))
+            f.write(np.ascontiguousarray(arr).tobytes())
+
+
+class PlaceStore:
+    """mmap으로 연 장소 스냅샷. 열은 복사 없는 numpy 뷰, 레코드는 요청 시 dict로 만든다."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, header_len = _PREFIX.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 스냅샷 파일입니다: {path}")
+
+        header = json.loads(bytes(self._mm[_PREFIX.size:_PREFIX.size + header_len]).decode("utf-8"))
+        data_start = _align(_PREFIX.size + header_len)
+        self.count = header["count"]
+        self.sources = tuple(header["sources"])
+        self.fields = [(fd["name"], fd["kind"]) for fd in header["fields"]]
+        self.extra = header.get("extra") or {}
+        self._cols = {
+            name: np.frombuffer(self._mm, dtype=np.dtype(dt), count=size, offset=data_start + off)
+            for name, (dt, off, size) in header["columns"].items()
+        }
+        self._str_off = self._cols["strings.off"]
+        self._str_data = self._cols["strings.data"]
+
+    def __len__(self):
+        return self.count
+
+    def column(self, name):
+        return self._cols[name]
+
+    def has_column(self, name):
+        return name in self._cols
+
+    def string(self, sid):
+        if sid < 0:
+            return None
+        a, b = int(self._str_off[sid]), int(self._str_off[sid + 1])
+        return self._str_data[a:b].tobytes().decode("utf-8")
+
+    def find_string(self, text):
+        """문자열 테이블에서 text의 id (없으면 -1). 빌드 시점용 선형 탐색"""
+        target = text.encode("utf-8")
+        off = self._str_off
+        data = self._str_data.tobytes()
+        for sid in range(len(off) - 1):
+            if data[int(off[sid]):int(off[sid + 1])] == target:
+                return sid
+        return -1
+
+    def field_kind(self, name):
+        for fname, kind in self.fields:
+            if fname == name:
+                return kind
+        return None
+
+    def list_contains(self, name, sid):
+        """strlist 필드 name에 문자열 id sid가 들어 있는 행 마스크"""
+        mask = np.zeros(self.count, dtype=bool)
+        if sid < 0 or name + ".off" not in self._cols:
+            return mask
+        off = self._cols[name + ".off"].astype(np.int64)
+        owner = np.repeat(np.arange(self.count), np.diff(off))
+        mask[owner[self._cols[name + ".items"] == sid]] = True
+        return mask
+
+    def strings_of(self, name):
+        """str 필드 전체를 파이썬 문자열 목록으로 (null → None)"""
+        return [self.string(int(sid)) for sid in self._cols[name]]
+
+    def field_values(self, name, rows=None):
+        """필드 name의 값을 rows 순서로 (없거나 null → None). 레코드 dict 없이 열에서 바로 만든다.
+
+        같은 문자열 id는 한 번만 디코딩한다 (분류/태그처럼 반복이 많은 필드용).
+        """
+        rows = np.arange(self.count) if rows is None else np.asarray(rows, dtype=np.int64)
+        j = next((j for j, (fname, _) in enumerate(self.fields) if fname == name), None)
+        if j is None:
+            return [None] * len(rows)
+        kind = self.fields[j][1]
+        bit = np.uint64(1 << j)
+        valid = ((self._cols["present"][rows] & bit) != 0) & ((self._cols["nulls"][rows] & bit) == 0)
+
+        memo = {}
+
+        def _string(sid):
+            s = memo.get(sid)
+            if s is None:
+                s = memo[sid] = self.string(sid)
+            return s
+
+        if kind == "strlist":
+            off = self._cols[name + ".off"]
+            items = self._cols[name + ".items"]
+            return [
+                [_string(sid) for sid in items[int(off[r]):int(off[r + 1])].tolist()] if ok else None
+                for r, ok in zip(rows.tolist(), valid.tolist())
+            ]
+        col = self._cols[name][rows].tolist()
+        if kind == "str":
+            return [_string(v) if ok else None for v, ok in zip(col, valid.tolist())]
+        if kind == "json":
+            return [json.loads(_string(v)) if ok else None for v, ok in zip(col, valid.tolist())]
+        cast = int if kind == "int" else float
+        return [cast(v) if ok else None for v, ok in zip(col, valid.tolist())]
+
+    def string_list(self, name, i):
+        off = self._cols[name + ".off"]
+        items = self._cols[name + ".items"][int(off[i]):int(off[i + 1])]
+        return [self.string(int(sid)) for sid in items]
+
+    def record(self, i):
+        bits = int(self._cols["present"][i])
+        null_bits = int(self._cols["nulls"][i])
+        rec = {}
+        for j, (name, kind) in enumerate(self.fields):
+            if not (bits >> j) & 1:
+                continue
+            if (null_bits >> j) & 1:
+                rec[name] = None
+                continue
+            if kind == "strlist":
+                rec[name] = self.string_list(name, i)
+                continue
+            v = self._cols[name][i]
+            if kind == "str":
+                rec[name] = self.string(int(v))
+            elif kind == "json":
+                rec[name] = json.loads(self.string(int(v)))
+            else:
+                rec[name] = int(v) if kind == "int" else float(v)
+        return rec
+
+    def rows_of(self, source):
+        return np.flatnonzero(self._cols["source"] == self.sources.index(source))
+
+
+class StoreRecords:
+    """PlaceStore 행들을 list처럼 보이게 하는 지연 시퀀스 (인덱싱할 때만 dict 생성)"""
+
+    def __init__(self, store, rows):
+        self.store = store
+        self.rows = np.asarray(rows, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.store.record(int(r)) for r in self.rows[i]]
+        return self.store.record(int(self.rows[i]))
+
+    def __iter__(self):
+        for r in self.rows:
+            yield self.store.record(int(r))
+
+    def __bool__(self):
+        return len(self.rows) > 0
+
+
+def open_store(path):
+    """스냅샷 파일이 있고 읽을 수 있으면 PlaceStore, 아니면 None"""
+    if not os.path.isfile(path):
+        return None
+    try:
+        return PlaceStore(path)
+    except Exception:
+        return None
+
+
+def build_snapshot(base_path=None, out_path=None):
+    """JSON 원본(+ places_master.csv 보강)을 읽어 스냅샷 파일로 컴파일"""
+    from recommender.data_loader import _bootstrap_data, _resolve_base_path
+
+    base_path = base_path or _resolve_base_path()
+    out_path = out_path or os.path.join(base_path, SNAPSHOT_FILE)
+    data = _bootstrap_data(base_path, use_snapshot=False)
+
+    records, sources = [], []
+    for code, source in enumerate(SOURCES):
+        for rec in data.get(source, []):
+            records.append(rec)
+            sources.append(code)
+
+    extra = {"핫플_low": data.get("핫플_low", []), "느좋_low": data.get("느좋_low", [])}
+    write_store(out_path, records, sources, extra)
+    return out_path, len(records)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="장소 JSON → 바이너리 스냅샷 컴파일")
+    ap.add_argument("--base", default=None, help="원본 JSON 폴더 (기본: AiChatbot/tests)")
+    ap.add_argument("--out", default=None, help=f"출력 파일 (기본: <base>/{SNAPSHOT_FILE})")
+    args = ap.parse_args(argv)
+    path, n = build_snapshot(args.base, args.out)
+    print(f"[✔] {n}개 장소 → {path} ({os.path.getsize(path):,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,15 @@
 # AiChatbot/recommender/reask.py
-def parse_user_text(user_text: str):
-    parsed = {"category": None, "keyword": None, "user_location": None}
-    s = (user_text or "").lower()
+from recommender.intent import parse_intent
+from recommender.scoring import CATEGORY_HINTS, match_keywords
 
-    if any(kw in s for kw in ["조용한", "둘레길", "공원", "자연", "느긋", "정원", "야경"]):
-        parsed["category"] = "느좋"
-    elif any(kw in s for kw in ["핫플", "카페", "맛집", "친구", "연인", "데이트"]):
-        parsed["category"] = "숨은핫플"
+def parse_user_text(user_text: str, snapshot=None):
+    """채팅 문장 → 카테고리/키워드/장소 참조/기준 위치 (로컬 해석, 확신도가 낮을 때만 원격 — intent 참고)"""
+    return parse_intent(user_text or "", snapshot)
 
-    for kw in ["친구","연인","데이트","카페","맛집","가족","조용한","둘레길","공원","자연","정원","야경"]:
-        if kw in s:
-            parsed["keyword"] = kw
-            break
-
-    parsed["user_location"] = None
-    return parsed
+def default_category(keyword):
+    """카테고리를 못 정했을 때: 핫플 쪽 키워드가 있으면 숨은핫플, 아니면 느좋"""
+    found = match_keywords(keyword or "")
+    return "숨은핫플" if any(kw in CATEGORY_HINTS["숨은핫플"] for kw in found) else "느좋"
 
 def suggest_alternatives(category, keyword):
     base = ["브런치 카페", "야경 좋은 곳", "조용한 정원", "둘레길"]
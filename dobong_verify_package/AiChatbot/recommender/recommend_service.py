@@ -1,6 +1,16 @@
 # AiChatbot/recommender/recommend_service.py
-from recommender.data_loader import get_all_data
-from recommender.scoring import score_places, _to_id_set, KEYWORD_TO_TAG_MAP
+import os, json, math, zlib, base64, hashlib, threading
+from concurrent.futures import ThreadPoolExecutor
+
+from recommender.cache import TTLCache
+from recommender.diversity import mmr_order, pool_size
+from recommender.data_loader import get_snapshot, get_snapshot_manager, get_grid_bands
+from recommender.index import get_index
+from recommender.metrics import timed, set_route, current_route
+from recommender.scoring import (
+    score_places, base_scores, nearby_places, top_k_indices,
+    WEIGHTS, BAND_LABELS, BAND_LOW20, BAND_LOW50,
+)
 
 def _detect_requested_bias(category, keyword):
     if category in ("느좋", "핫플"):
@@ -13,51 +23,287 @@ def _detect_requested_bias(category, keyword):
                 return k
     return None
 
-def recommend_places(category, keyword, user_loc, k, seed, offset=0):
-    data = get_all_data()
+def _rank(
+    index, category, keyword, user_loc, seed, limit, radius_m=None,
+    base=None, nearby=None, open_at=None, open_mode="exclude", diversity=None, query=None,
+):
+    """상위 limit개의 (인덱스 위치, 점수) 배열. diversity>0이면 MMR 순서, 아니면 점수 내림차순"""
+    requested_bias = _detect_requested_bias(category, keyword)
 
-    hot_all = data.get("핫플", []) or []
-    neu_all = data.get("느좋", []) or []
-    hot_low = data.get("핫플_low", []) or []
-    neu_low = data.get("느좋_low", []) or []
+    with timed("score"):
+        positions, scores = score_places(
+            index,
+            keyword=keyword,
+            user_loc=user_loc,
+            seed=seed,
+            requested_bias=requested_bias,
+            radius_m=radius_m,
+            base=base,
+            nearby=nearby,
+            open_at=open_at,
+            open_mode=open_mode,
+            query=query,
+        )
+    diversity = _diversity(diversity)
+    if diversity <= 0:
+        # 상위 limit개만 부분 선택 (전체 정렬 없음)
+        with timed("select"):
+            top = top_k_indices(scores, limit)
+        return positions[top], scores[top]
 
-    # id 병합
-    def _to_id(p):
-        return p.get("id") or p.get("placeId") or p.get("place_id") or p.get("name")
+    # 다양성: 상위 후보 풀만 잘라 MMR로 다시 고른다
+    with timed("diversity"):
+        top = top_k_indices(scores, pool_size(limit))
+        pick = top[mmr_order(index, positions[top], scores[top], limit, diversity)]
+    return positions[pick], scores[pick]
 
-    merged = {}
-    for p in hot_all:
-        pid = _to_id(p)
-        if pid: merged[pid] = p
-    for p in neu_all:
-        pid = _to_id(p)
-        if pid: merged[pid] = p
+def _diversity(value):
+    """요청 diversity(요청 본문 값 그대로) → 0~1로 자른 값, 없으면 WEIGHTS["W_div"]. 숫자가 아니면 ValueError"""
+    if value is None:
+        return WEIGHTS["W_div"]
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        value = math.nan
+    if not math.isfinite(value):
+        raise ValueError("diversity는 0~1 사이 숫자여야 합니다")
+    return min(max(value, 0.0), 1.0)
 
-    low20_ids = _to_id_set(hot_low) | _to_id_set(neu_low)
-    low50_ids = set()  # 필요 시 확장
+def _views(index, positions, scores, fields=None):
+    """요청별 결과 레코드: 인덱스가 캐시한 장소 조각 위에 밴드/점수만 얹은 PlaceView"""
+    with timed("views"):
+        return [
+            index.fragments.view(i, BAND_LABELS[index.band[i]], float(s), fields)
+            for i, s in zip(positions, scores)
+        ]
 
-    requested_bias = _detect_requested_bias(category, keyword)
-
-    scored_list = score_places(
-        places_all=list(merged.values()),
-        low20_ids=low20_ids,
-        low50_ids=low50_ids,
-        keyword=keyword,
-        user_loc=user_loc,
-        seed=seed,
-        requested_bias=requested_bias,
-    )
+def recommend_places(
+    category, keyword, user_loc, k, seed, offset=0, radius_m=None, snapshot=None, fields=None,
+    open_at=None, open_mode="exclude", diversity=None, query=None,
+):
+    index = get_index(snapshot or get_snapshot())  # 요청 내내 같은 스냅샷
 
     start = max(0, int(offset or 0))
     end = start + int(k or 5)
-    return scored_list[start:end]
+
+    # 상위 offset+k개만 골라 필요한 k개만 결과 뷰로 만든다
+    positions, scores = _rank(
+        index, category, keyword, user_loc, seed, end, radius_m,
+        open_at=open_at, open_mode=open_mode, diversity=diversity, query=query,
+    )
+    return _views(index, positions[start:], scores[start:], fields)
+
+# ───────────────────────── 배치 추천 ─────────────────────────
+# 한 화면에서 여러 키워드/카테고리를 한 번에: 스냅샷 1회 조회, 키워드별 기본 점수/위치별 주변 후보는 한 번만 계산
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "4"))
+BATCH_PARALLEL_MIN = int(os.getenv("BATCH_PARALLEL_MIN", "16"))  # 이 개수 이상이면 풀에서 병렬 처리
+
+_BATCH_POOL = None
+_BATCH_POOL_LOCK = threading.Lock()
+
+def _batch_pool():
+    global _BATCH_POOL
+    if _BATCH_POOL is None:
+        with _BATCH_POOL_LOCK:
+            if _BATCH_POOL is None:
+                _BATCH_POOL = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix="recommend-batch")
+    return _BATCH_POOL
+
+def recommend_batch(queries, snapshot=None):
+    """질의 dict 목록(category/keyword/user_loc/k/seed/offset/radius_m/fields) → 같은 순서의 결과 목록.
+
+    항목별로 실패하면 그 자리에 예외 객체가 들어가고 나머지는 그대로 계산한다.
+    """
+    index = get_index(snapshot or get_snapshot())
+    bases, nearby = {}, {}
+    route = current_route()  # 풀 스레드에서도 단계 시간이 요청 라우트로 잡히게
+
+    def prepare(q):
+        category, keyword = q.get("category"), q.get("keyword")
+        user_loc, radius_m = q.get("user_loc"), q.get("radius_m")
+        bias = _detect_requested_bias(category, keyword)
+        bkey = (keyword, bias)
+        if bkey not in bases:
+            with timed("base"):
+                bases[bkey] = base_scores(index, keyword, bias)
+        near = None
+        if user_loc is not None:
+            nkey = (tuple(user_loc), radius_m)
+            if nkey not in nearby:
+                with timed("nearby"):
+                    nearby[nkey] = nearby_places(index, user_loc, radius_m)
+            near = nearby[nkey]
+        return bases[bkey], near
+
+    def run(job):
+        q, base, near = job
+        start = max(0, int(q.get("offset") or 0))
+        end = start + int(q.get("k") or 5)
+        positions, scores = _rank(
+            index, q.get("category"), q.get("keyword"), q.get("user_loc"), q.get("seed"), end,
+            q.get("radius_m"), base=base, nearby=near,
+            open_at=q.get("open_at"), open_mode=q.get("open_mode") or "exclude",
+            diversity=q.get("diversity"),
+        )
+        return _views(index, positions[start:], scores[start:], q.get("fields"))
+
+    def safe_run(job):
+        if isinstance(job, Exception):
+            return job
+        set_route(route)
+        try:
+            return run(job)
+        except Exception as e:
+            return e
+
+    # 공유 계산은 먼저 순서대로 (딕셔너리 채우기), 항목별 순위 계산만 병렬
+    jobs = []
+    for q in queries:
+        try:
+            jobs.append((q,) + prepare(q))
+        except Exception as e:
+            jobs.append(e)
+
+    if BATCH_WORKERS > 1 and len(jobs) >= BATCH_PARALLEL_MIN:
+        return list(_batch_pool().map(safe_run, jobs))
+    return [safe_run(job) for job in jobs]
+
+# ───────────────────────── 커서 페이지네이션 (세션 순위 캐시) ─────────────────────────
+# 첫 요청에서 RANKING_DEPTH개까지 순위를 한 번 매겨 두고, 커서로 오는 다음 페이지는 그 순위를 잘라 준다.
+# 커서에는 순위 조건(스냅샷 지문 포함)이 통째로 들어 있어서, 캐시가 없는 다른 워커(serve.py --workers)나
+# 만료 뒤에도 같은 순위를 다시 계산해 이어 준다. 스냅샷이 바뀌었으면 None → 호출 측이 offset 방식으로 폴백.
+RANKING_DEPTH = 50
+# 커서로 다시 계산할 수 있는 최대 깊이 (조작된 커서로 큰 순위를 만들지 않게)
+MAX_CURSOR_DEPTH = int(os.getenv("MAX_CURSOR_DEPTH", "1000"))
+_RANKINGS = TTLCache(
+    maxsize=int(os.getenv("RANKING_SESSION_SIZE", "2048")),
+    ttl=float(os.getenv("RANKING_SESSION_TTL", "900")),
+)
+
+class _Ranking:
+    __slots__ = ("index", "positions", "scores", "complete", "meta")
+
+    def __init__(self, index, positions, scores, complete, meta):
+        self.index = index
+        self.positions = positions
+        self.scores = scores
+        self.complete = complete  # 후보 전체가 들어 있으면 True (깊이에서 잘리지 않음)
+        self.meta = meta
+
+# 커서 안의 순위 조건 순서
+_SPEC_FIELDS = (
+    "fingerprint", "category", "keyword", "query", "user_loc", "seed",
+    "radius_m", "open_at", "open_mode", "diversity", "depth",
+)
+
+def _spec_token(spec):
+    raw = json.dumps(spec, ensure_ascii=False, default=str)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=12).hexdigest()
+
+def _encode_cursor(spec, meta, offset):
+    raw = json.dumps([spec, meta, int(offset)], ensure_ascii=False, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(zlib.compress(raw.encode("utf-8"), 9)).decode("ascii").rstrip("=")
+
+def _decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(str(cursor) + "=" * (-len(str(cursor)) % 4))
+        spec, meta, offset = json.loads(zlib.decompress(raw).decode("utf-8"))
+        if not isinstance(spec, list) or len(spec) != len(_SPEC_FIELDS) or not isinstance(meta, dict):
+            return None
+        return spec, meta, max(0, int(offset))
+    except Exception:
+        return None
+
+def _build_ranking(snapshot, spec, meta):
+    """순위 조건 spec → _Ranking (스냅샷 지문이 다르면 None)"""
+    args = dict(zip(_SPEC_FIELDS, spec))
+    depth = int(args["depth"])
+    if args["fingerprint"] != snapshot.fingerprint or depth > MAX_CURSOR_DEPTH:
+        return None
+    user_loc = tuple(args["user_loc"]) if args["user_loc"] is not None else None
+    index = get_index(snapshot)
+    positions, scores = _rank(
+        index, args["category"], args["keyword"], user_loc, args["seed"], depth, args["radius_m"],
+        open_at=args["open_at"], open_mode=args["open_mode"], diversity=args["diversity"], query=args["query"],
+    )
+    return _Ranking(index, positions, scores, len(positions) < depth, meta)
+
+def start_ranking(
+    category, keyword, user_loc, seed, offset=0, k=5, radius_m=None, snapshot=None, meta=None,
+    open_at=None, open_mode="exclude", diversity=None, query=None,
+):
+    """순위를 세션 캐시에 올리고 offset 페이지를 가리키는 커서를 돌려준다.
+
+    같은 스냅샷/조건이면 같은 토큰이 나오므로 같은 요청끼리는 순위 하나를 공유한다.
+    """
+    snapshot = snapshot or get_snapshot()
+    depth = max(RANKING_DEPTH, int(offset or 0) + int(k or 5))
+    diversity = _diversity(diversity)
+    spec = [
+        snapshot.fingerprint, category, keyword, query, user_loc, seed,
+        radius_m, open_at, open_mode, diversity, depth,
+    ]
+    meta = json.loads(json.dumps(meta or {}, ensure_ascii=False, default=str))  # 커서로 다시 만든 것과 같은 모양
+    token = _spec_token(spec)
+    if _RANKINGS.get(token) is None:
+        ranking = _build_ranking(snapshot, spec, meta)
+        if ranking is None:
+            return None
+        _RANKINGS.put(token, ranking)
+    return _encode_cursor(spec, meta, offset)
+
+def page_ranking(cursor, k, fields=None):
+    """커서가 가리키는 페이지 → (결과, 다음 커서 또는 None, offset, meta).
+
+    이 워커 캐시에 순위가 없으면 커서의 조건으로 다시 계산한다.
+    잘못된 커서, 스냅샷이 바뀐 커서, 순위 깊이를 넘어가는 페이지면 None (호출 측은 offset 방식으로 폴백).
+    """
+    decoded = _decode_cursor(cursor) if cursor else None
+    if decoded is None:
+        return None
+    spec, meta, offset = decoded
+    token = _spec_token(spec)
+    ranking = _RANKINGS.get(token)
+    if ranking is None:
+        try:
+            ranking = _build_ranking(get_snapshot(), spec, meta)
+        except Exception:
+            return None
+        if ranking is None:
+            return None
+        _RANKINGS.put(token, ranking)
+
+    k = int(k or 5)
+    end = offset + k
+    if end > len(ranking.positions) and not ranking.complete:
+        return None
+
+    results = _views(ranking.index, ranking.positions[offset:end], ranking.scores[offset:end], fields)
+    has_more = end < len(ranking.positions) or not ranking.complete
+    next_cursor = _encode_cursor(spec, ranking.meta, end) if has_more else None
+    return results, next_cursor, offset, ranking.meta
+
+def locate_band(lat, lon):
+    """임의 좌표(신규/사용자 제보 장소 등)의 격자 밴드를 요청 시점에 바로 판정"""
+    hit = get_grid_bands().lookup(lat, lon)
+    if hit is None:
+        return {"grid_id": None, "rank_pct": None, "band_label": BAND_LABELS[0]}
+    return {"grid_id": hit["grid_id"], "rank_pct": hit["rank_pct"], "band_label": BAND_LABELS[hit["band"]]}
 
 def health_status():
-    data = get_all_data()
-    return {
+    snap = get_snapshot()
+    data = snap.data
+    grid_bands = data["grid_bands"]
+    status = {
         "data_loaded": bool(data),
         "hotple_count_all": len(data.get("핫플", [])),
         "neujoh_count_all": len(data.get("느좋", [])),
         "hotple_count_low": len(data.get("핫플_low", [])),
         "neujoh_count_low": len(data.get("느좋_low", [])),
+        "indexed_places": len(get_index(snap)),
+        "fragment_cache": get_index(snap).fragments.stats(),
+        "grid_cells_low20": grid_bands.count_within(BAND_LOW20),
+        "grid_cells_low50": grid_bands.count_within(BAND_LOW50),
     }
+    status.update(get_snapshot_manager().status())
+    return status
@@ -1,5 +1,10 @@
 # AiChatbot/recommender/scoring.py
-import random
+import zlib
+from functools import lru_cache
+
+import numpy as np
+
+from recommender.keyword_matcher import KeywordMatcher
 
 # 키워드 → 대분류(하이브리드 비율 허용)
 KEYWORD_TO_TAG_MAP = {
@@ -17,14 +22,67 @@ KEYWORD_TO_TAG_MAP = {
     "야경": {"느좋": 1.0},
 }
 
+# 동의어 → 대표 키워드 (KEYWORD_TO_TAG_MAP / CATEGORY_HINTS의 키워드)
+KEYWORD_SYNONYMS = {
+    "친구": ("친구들", "동창", "지인"),
+    "연인": ("애인", "커플", "여자친구", "남자친구", "여친", "남친"),
+    "데이트": ("데이트코스",),
+    "카페": ("커피", "디저트", "브런치", "베이커리"),
+    "맛집": ("식당", "밥집"),
+    "가족": ("부모님", "어린이", "아이랑", "아이와"),
+    "조용한": ("한적한", "조용히", "고즈넉"),
+    "둘레길": ("산책로", "트레킹", "등산"),
+    "자연": ("계곡", "숲길"),
+    "정원": ("수목원", "꽃길"),
+    "야경": ("밤풍경", "노을"),
+}
+
+# 문장 → 카테고리 힌트 (느좋 쪽을 먼저 본다)
+CATEGORY_HINTS = {
+    "느좋": ("조용한", "둘레길", "공원", "자연", "느긋", "정원", "야경"),
+    "숨은핫플": ("핫플", "카페", "맛집", "친구", "연인", "데이트"),
+}
+
+def _build_keyword_matcher():
+    patterns = {}
+    for words in CATEGORY_HINTS.values():
+        patterns.update((w, w) for w in words)
+    patterns.update((kw, kw) for kw in KEYWORD_TO_TAG_MAP)
+    for kw, synonyms in KEYWORD_SYNONYMS.items():
+        patterns.update((s, kw) for s in synonyms)
+    return KeywordMatcher(patterns)
+
+# 키워드/동의어/카테고리 힌트 전체를 한 번에 찾는 매처 (import 시 1회 컴파일)
+KEYWORD_MATCHER = _build_keyword_matcher()
+
 WEIGHTS = {
     "W_band": 0.55,
     "W_kw":   0.25,
-    "W_dist": 0.10,  # TODO: 거리 가중치 자리
-    "W_div":  0.05,  # TODO
+    "W_dist": 0.10,  # user_loc에서 DIST_DECAY_M 이내일수록 가산
+    "W_div":  0.0,   # 요청에 diversity가 없을 때의 기본 다양성 (0 = MMR 재정렬 안 함, 점수순 그대로)
     "W_rand": 0.05,
 }
 
+# 대분류 태그 순서 (인덱스의 tag_mask 비트 / tag_matrix 열 순서)
+TAG_NAMES = ("느좋", "핫플")
+TAG_BITS = {t: 1 << i for i, t in enumerate(TAG_NAMES)}
+
+# 밴드 코드: 0=일반, 1=숨은(50%), 2=숨은(20%)
+BAND_NONE, BAND_LOW50, BAND_LOW20 = 0, 1, 2
+BAND_LABELS = ("일반", "숨은(50%)", "숨은(20%)")
+BAND_FACTORS = np.array([0.0, 0.5, 1.0])
+
+# W_kw 중 본문 BM25 몫: 키워드가 대분류 사전에 있으면 이 비율만, 없으면 W_kw 전부를 BM25로
+LEXICAL_SHARE = 0.5
+# W_kw 중 임베딩 코사인 유사도 몫 (키워드 사전/본문에 없는 표현용)
+SEMANTIC_SHARE = 0.3
+
+# 영업시간: open_at에 닫힌 곳을 빼지 않고 감점만 할 때(open_mode="penalize") 빼는 점수
+CLOSED_PENALTY = 0.5
+
+# 거리 가중: 0m에서 W_dist 전부, DIST_DECAY_M 이상이면 0 (선형 감소)
+DIST_DECAY_M = 3000.0
+
 def _to_id(place: dict):
     return (
         place.get("id")
@@ -44,63 +102,142 @@ def _to_id_set(maybe_list):
                 s.add(pid)
     return s
 
+@lru_cache(maxsize=1024)
+def match_keywords(text):
+    """문장 → 나온 대표 키워드 튜플 (문장 순서, 한 번 훑기)"""
+    return tuple(KEYWORD_MATCHER.keywords(text))
+
+@lru_cache(maxsize=1024)
+def _keyword_tag_vector(keyword):
+    """키워드(문장) → TAG_NAMES 순서의 분배비율 벡터 (매칭 없으면 None).
+
+    여러 키워드가 나오면 각 비율을 평균해 섞는다 (예: "연인이랑 조용한 카페").
+    """
+    mappings = [KEYWORD_TO_TAG_MAP[kw] for kw in match_keywords(keyword) if kw in KEYWORD_TO_TAG_MAP]
+    if not mappings:
+        return None
+    vec = np.array([[float(m.get(t, 0.0)) for t in TAG_NAMES] for m in mappings]).mean(axis=0)
+    vec.flags.writeable = False
+    return vec
+
+def _seed_int(seed):
+    return zlib.crc32(str(seed).encode("utf-8"))
+
+def base_scores(index, keyword, requested_bias=None, query=None):
+    """위치/시드와 무관한 부분(숨은공간 + 키워드/대분류 가중)을 전체 장소에 대해 계산.
+
+    query는 본문/의미 검색에 쓸 문장 (없으면 keyword). 키워드 사전 가중은 keyword로만 본다.
+    같은 키워드/바이어스 질의끼리는 이 배열을 공유할 수 있다 (읽기만 함).
+    """
+    # 1) 숨은 공간 가중
+    scores = BAND_FACTORS[index.band] * WEIGHTS["W_band"]
+
+    # 2) 키워드/대분류 가중 (요청 바이어스 + 하이브리드 분배)
+    bit = TAG_BITS.get(requested_bias)
+    if bit:
+        scores += ((index.tag_mask & bit) != 0) * (WEIGHTS["W_kw"] * 0.9)
+
+    target_vec = _keyword_tag_vector(str(keyword)) if keyword else None
+    if target_vec is not None:
+        scores += (index.tag_matrix @ target_vec) * WEIGHTS["W_kw"]
+
+    # 2-1) 본문 매칭 (이름/주소/설명/분류 BM25, 최고점 기준 0~1로 맞춤)
+    text = query or keyword
+    if text:
+        hit, bm25 = index.lexical.search(str(text))
+        if len(hit) and bm25.max() > 0:
+            share = LEXICAL_SHARE if target_vec is not None else 1.0
+            scores[hit] += bm25 / bm25.max() * (WEIGHTS["W_kw"] * share)
+
+    # 2-2) 의미 유사도 (임베딩 행렬 × 질의 벡터, 음수는 0)
+    if text and index.vectors is not None:
+        hit, sim = index.vectors.similarity(str(text))
+        scores[hit] += np.clip(sim, 0.0, None) * (WEIGHTS["W_kw"] * SEMANTIC_SHARE)
+    return scores
+
+def nearby_places(index, user_loc, radius_m=None):
+    """user_loc 주변 (위치, 거리): radius_m 이내, 없으면 거리 가중이 닿는 DIST_DECAY_M 이내"""
+    r = DIST_DECAY_M if radius_m is None else float(radius_m)
+    return index.spatial.query_radius(user_loc[0], user_loc[1], r)
+
 def score_places(
-    places_all,
-    low20_ids,
-    low50_ids,
+    index,
     keyword,
     user_loc,
     seed,
     requested_bias=None,
+    radius_m=None,
+    base=None,
+    nearby=None,
+    open_at=None,
+    open_mode="exclude",
+    query=None,
 ):
-    """숨은공간 가중 + 키워드(하이브리드) 가중 + 랜덤 소량."""
-    # 키워드 → 태그 분배비율
-    target_weights = None
-    if keyword:
-        for kw, mapping in KEYWORD_TO_TAG_MAP.items():
-            if kw in str(keyword):
-                target_weights = mapping  # 예: {"느좋":0.6, "핫플":0.4}
-                break
-
-    rnd = random.Random(str(seed)) if seed is not None else None
-    scored = []
-
-    for place in places_all or []:
-        pid = _to_id(place)
-        if not pid:
-            continue
-
-        score = 0.0
-
-        # 1) 숨은 공간 가중
-        if pid in low20_ids:
-            score += WEIGHTS["W_band"]
-            place["band_label"] = "숨은(20%)"
-        elif pid in low50_ids:
-            score += WEIGHTS["W_band"] * 0.5
-            place["band_label"] = "숨은(50%)"
+    """숨은공간 가중 + 키워드(하이브리드) 가중 + 거리 가중 + 랜덤 소량.
+
+    RecommendationIndex의 배열 위에서 한 번에 계산해 (후보 위치, 점수) 배열을 돌려준다.
+    user_loc와 radius_m이 함께 오면 공간 인덱스로 반경 안 장소만 후보로 삼는다.
+    base/nearby는 미리 계산한 base_scores/nearby_places 결과 (배치 질의에서 공유).
+    open_at(주간 분)이 오면 그때 닫힌 곳은 후보에서 빼거나 open_mode="penalize"면 감점.
+    query는 본문/의미 검색용 문장 (base_scores 참고).
+    """
+    if base is None:
+        base = base_scores(index, keyword, requested_bias, query)
+    if user_loc is not None and nearby is None:
+        nearby = nearby_places(index, user_loc, radius_m)
+
+    if user_loc is not None and radius_m is not None:
+        # 0) 반경 필터: 공간 인덱스로 찾은 반경 안 장소만 후보
+        positions, dist = nearby
+        scores = base[positions]
+        scores += np.clip(1.0 - dist / DIST_DECAY_M, 0.0, None) * WEIGHTS["W_dist"]
+    else:
+        positions = None  # None = 전체
+        scores = base.copy()
+        # 3) 거리 가중 (DIST_DECAY_M 밖은 0이므로 그 안의 장소만 계산)
+        if user_loc is not None:
+            near, near_dist = nearby
+            scores[near] += (1.0 - near_dist / DIST_DECAY_M) * WEIGHTS["W_dist"]
+
+    n = len(index) if positions is None else len(positions)
+
+    # 4) 랜덤성
+    if seed is not None:
+        rng = np.random.default_rng(_seed_int(seed))
+        scores += rng.random(n) * WEIGHTS["W_rand"]
+
+    if positions is None:
+        positions = np.arange(n)
+
+    # 5) 영업시간 (로드 시 만든 주간 비트맵에서 그 분의 열만 꺼낸 마스크)
+    if open_at is not None:
+        is_open = index.hours.open_mask(open_at)[positions]
+        if open_mode == "penalize":
+            scores[~is_open] -= CLOSED_PENALTY
         else:
-            place["band_label"] = "일반"
-
-        # 2) 키워드/대분류 가중 (요청 바이어스 + 하이브리드 분배)
-        tags = place.get("tags", [])
-
-        if requested_bias in ("느좋", "핫플") and requested_bias in tags:
-            score += WEIGHTS["W_kw"] * 0.9
-
-        if target_weights:
-            for tag, frac in target_weights.items():
-                if tag in tags:
-                    score += WEIGHTS["W_kw"] * float(frac)
-
-        # 3) 거리 가중 (TODO user_loc 활용)
-
-        # 4) 랜덤성
-        if rnd:
-            score += rnd.random() * WEIGHTS["W_rand"]
-
-        place["final_score"] = score
-        scored.append(place)
-
-    scored.sort(key=lambda x: x["final_score"], reverse=True)
-    return scored
+            positions, scores = positions[is_open], scores[is_open]
+    return positions, scores
+
+def top_k_indices(scores, limit, candidates=None):
+    """점수 상위 limit개의 위치를 내림차순으로 (전체 정렬 없이).
+
+    동점은 앞선 위치가 먼저 오도록 해 전체 stable 정렬의 앞부분과 같은 결과를 낸다.
+    candidates가 주어지면 scores는 그 후보들의 점수로 보고 후보 위치를 돌려준다.
+    """
+    scores = np.asarray(scores)
+    pos = np.arange(len(scores)) if candidates is None else np.asarray(candidates)
+    n = len(scores)
+    limit = min(max(0, int(limit)), n)
+    if limit == 0:
+        return pos[:0]
+
+    if limit < n:
+        kth = np.partition(scores, n - limit)[n - limit]
+        above = np.flatnonzero(scores > kth)
+        ties = np.flatnonzero(scores == kth)[: limit - len(above)]
+        picked = np.concatenate([above, ties])
+    else:
+        picked = np.arange(n)
+
+    order = np.lexsort((picked, -scores[picked]))
+    return pos[picked[order]]
@@ -0,0 +1,132 @@
+# AiChatbot/recommender/singleflight.py
+"""동시 요청 합치기(singleflight) + 입장 제어.
+
+같은 정규화 키의 요청이 동시에 오면 첫 요청만 계산하고 나머지는 그 결과를 기다려 같이 받는다.
+실제 계산은 AdmissionGate로 동시 실행 수/대기열 길이를 묶어, 넘치면 기다리게 두지 않고 바로 거절한다.
+"""
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+
+class Overloaded(Exception):
+    """입장 거절 (status: 429 = 한 클라이언트가 너무 많이, 503 = 서버 전체가 밀림)"""
+
+    def __init__(self, status, message, retry_after=1):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key, fn, retry=()):
+        """key로 진행 중인 계산이 있으면 그 결과를, 없으면 fn()을 실행. → (결과, 합쳐졌는지)
+
+        retry에 든 예외(입장 거절처럼 리더 요청에만 해당하는 실패)는 따라온 요청에 넘기지 않는다.
+        따라온 요청은 다시 줄을 서서 직접 리더로 계산하거나 새로 진행 중인 계산에 합쳐진다.
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+                else:
+                    self.coalesced += 1
+
+            if leader:
+                try:
+                    call.result = fn()
+                except BaseException as e:
+                    call.error = e
+                finally:
+                    with self._lock:
+                        del self._calls[key]
+                    call.done.set()
+            else:
+                call.done.wait()
+
+            if call.error is not None:
+                if not leader and isinstance(call.error, retry):
+                    continue
+                raise call.error
+            return call.result, not leader
+
+    def stats(self):
+        return {"in_flight_keys": len(self._calls), "coalesced": self.coalesced}
+
+
+class AdmissionGate:
+    """동시 계산 max_inflight개 + 대기 max_queue개까지만 받는다.
+
+    대기열이 차 있거나 queue_timeout 안에 자리가 안 나면 503, 한 클라이언트가 per_client개 넘게
+    동시에 계산 중이면 429. 거절은 즉시 해서 스레드가 쌓이지 않게 한다.
+    """
+
+    def __init__(self, max_inflight, max_queue, queue_timeout=0.5, per_client=0):
+        self.max_inflight = int(max_inflight)
+        self.max_queue = int(max_queue)
+        self.queue_timeout = float(queue_timeout)
+        self.per_client = int(per_client)
+        self._slots = threading.BoundedSemaphore(self.max_inflight)
+        self._lock = threading.Lock()
+        self._clients = Counter()
+        self.running = 0
+        self.waiting = 0
+        self.shed = Counter()
+
+    def _reject(self, status, message):
+        self.shed[status] += 1
+        raise Overloaded(status, message)
+
+    @contextmanager
+    def admit(self, client=None):
+        with self._lock:
+            if self.per_client and self._clients[client] >= self.per_client:
+                self._reject(429, "동시 요청이 너무 많습니다. 잠시 후 다시 시도해주세요.")
+            if self.waiting >= self.max_queue:
+                self._reject(503, "요청이 많아 잠시 처리할 수 없습니다. 잠시 후 다시 시도해주세요.")
+            self._clients[client] += 1
+            self.waiting += 1
+        try:
+            ok = self._slots.acquire(timeout=self.queue_timeout)
+            with self._lock:
+                self.waiting -= 1
+                if not ok:
+                    self._reject(503, "요청이 많아 잠시 처리할 수 없습니다. 잠시 후 다시 시도해주세요.")
+                self.running += 1
+            try:
+                yield
+            finally:
+                with self._lock:
+                    self.running -= 1
+                self._slots.release()
+        finally:
+            with self._lock:
+                self._clients[client] -= 1
+                if self._clients[client] <= 0:
+                    del self._clients[client]
+
+    def stats(self):
+        return {
+            "running": self.running,
+            "waiting": self.waiting,
+            "max_inflight": self.max_inflight,
+            "max_queue": self.max_queue,
+            "shed_429": self.shed[429],
+            "shed_503": self.shed[503],
+        }
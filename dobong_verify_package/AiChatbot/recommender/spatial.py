@@ -0,0 +1,134 @@
+# AiChatbot/recommender/spatial.py
+import math
+
+import numpy as np
+
+EARTH_RADIUS_M = 6371008.8
+M_PER_DEG_LAT = math.pi * EARTH_RADIUS_M / 180.0
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    """두 좌표(배열 가능) 사이의 대원 거리(m)"""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2.0) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2
+    )
+    return 2.0 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class GridBucketIndex:
+    """위경도 균등 격자 버킷 인덱스.
+
+    로드 시 각 장소를 cell_m 크기 칸에 넣어 두고, 반경 질의는 원을 덮는
+    칸들의 후보만 모아 거리 계산을 한다 (전체 장소를 훑지 않음).
+    """
+
+    def __init__(self, lat, lon, cell_m=500.0):
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        self.lat = lat
+        self.lon = lon
+        self.cell_m = float(cell_m)
+
+        valid = np.flatnonzero(np.isfinite(lat) & np.isfinite(lon))
+        ref_lat = float(np.mean(lat[valid])) if len(valid) else 0.0
+        self.cell_lat = self.cell_m / M_PER_DEG_LAT
+        self.cell_lon = self.cell_m / (M_PER_DEG_LAT * max(math.cos(math.radians(ref_lat)), 1e-6))
+
+        rows = np.floor(lat[valid] / self.cell_lat).astype(np.int64)
+        cols = np.floor(lon[valid] / self.cell_lon).astype(np.int64)
+        buckets = {}
+        for pos, key in zip(valid.tolist(), zip(rows.tolist(), cols.tolist())):
+            buckets.setdefault(key, []).append(pos)
+        self._buckets = {key: np.array(v, dtype=np.int64) for key, v in buckets.items()}
+
+    def __len__(self):
+        return sum(len(v) for v in self._buckets.values())
+
+    def _cells_in_bbox(self, lat, lon, radius_m):
+        dlat = radius_m / M_PER_DEG_LAT
+        # 경도 폭은 극 쪽 가장자리에서 가장 넓다
+        edge_lat = min(abs(lat) + dlat, 89.9)
+        dlon = radius_m / (M_PER_DEG_LAT * max(math.cos(math.radians(edge_lat)), 1e-6))
+        r0 = math.floor((lat - dlat) / self.cell_lat)
+        r1 = math.floor((lat + dlat) / self.cell_lat)
+        c0 = math.floor((lon - dlon) / self.cell_lon)
+        c1 = math.floor((lon + dlon) / self.cell_lon)
+
+        # 반경이 아주 크면 칸을 나열하는 것보다 채워진 버킷만 훑는 편이 싸다
+        if (r1 - r0 + 1) * (c1 - c0 + 1) > len(self._buckets):
+            return [
+                v for (r, c), v in self._buckets.items()
+                if r0 <= r <= r1 and c0 <= c <= c1
+            ]
+        out = []
+        for r in range(r0, r1 + 1):
+            for c in range(c0, c1 + 1):
+                v = self._buckets.get((r, c))
+                if v is not None:
+                    out.append(v)
+        return out
+
+    def query_radius(self, lat, lon, radius_m):
+        """(lat, lon) 반경 radius_m 안의 (위치 배열, 거리 배열), 위치 오름차순"""
+        chunks = self._cells_in_bbox(float(lat), float(lon), float(radius_m))
+        if not chunks:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, np.zeros(0, dtype=np.float64)
+
+        cand = np.sort(np.concatenate(chunks))
+        dist = haversine_m(lat, lon, self.lat[cand], self.lon[cand])
+        keep = dist <= radius_m
+        return cand[keep], dist[keep]
+
+
+class BoxBucketIndex:
+    """bbox(min_lat, min_lon, max_lat, max_lon) 목록의 위경도 균등 격자 버킷 인덱스.
+
+    각 상자를 겹치는 칸마다 넣어 두고(점은 크기 0 상자), bbox 질의는 질의 영역을 덮는
+    칸들의 후보만 모아 실제로 겹치는지 확인한다.
+    """
+
+    def __init__(self, boxes, cell_deg=0.01):
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        self.boxes = boxes
+        self.cell_deg = float(cell_deg)
+
+        valid = np.flatnonzero(np.isfinite(boxes).all(axis=1))
+        cells = np.floor(boxes[valid] / self.cell_deg).astype(np.int64)
+        buckets = {}
+        for pos, (r0, c0, r1, c1) in zip(valid.tolist(), cells.tolist()):
+            for r in range(r0, r1 + 1):
+                for c in range(c0, c1 + 1):
+                    buckets.setdefault((r, c), []).append(pos)
+        self._buckets = {key: np.array(v, dtype=np.int64) for key, v in buckets.items()}
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def query_bbox(self, min_lat, min_lon, max_lat, max_lon):
+        """질의 영역과 겹치는(경계 포함) 상자 위치 배열, 오름차순"""
+        r0 = math.floor(min_lat / self.cell_deg)
+        r1 = math.floor(max_lat / self.cell_deg)
+        c0 = math.floor(min_lon / self.cell_deg)
+        c1 = math.floor(max_lon / self.cell_deg)
+        # 영역이 아주 넓으면 칸을 나열하는 것보다 채워진 버킷만 훑는 편이 싸다
+        if (r1 - r0 + 1) * (c1 - c0 + 1) > len(self._buckets):
+            chunks = [
+                v for (r, c), v in self._buckets.items()
+                if r0 <= r <= r1 and c0 <= c <= c1
+            ]
+        else:
+            chunks = [
+                self._buckets[(r, c)]
+                for r in range(r0, r1 + 1) for c in range(c0, c1 + 1)
+                if (r, c) in self._buckets
+            ]
+        if not chunks:
+            return np.zeros(0, dtype=np.int64)
+
+        cand = np.unique(np.concatenate(chunks))
+        b = self.boxes[cand]
+        keep = (b[:, 0] <= max_lat) & (b[:, 2] >= min_lat) & (b[:, 1] <= max_lon) & (b[:, 3] >= min_lon)
+        return cand[keep]
@@ -0,0 +1,246 @@
+# AiChatbot/serve.py
+"""운영용 멀티 워커 실행기 (pre-fork).
+
+마스터가 데이터 스냅샷과 모든 파생 인덱스를 먼저 올리고 소켓을 연 다음 워커 N개를 fork한다.
+워커는 그 메모리를 copy-on-write로 공유하고(바이너리 스냅샷이면 mmap 페이지 자체를 공유),
+gc.freeze()로 GC가 공유 페이지를 건드려 복사가 일어나는 것도 막는다.
+
+  python serve.py --workers 4 --port 5000 --max-concurrency 16
+  kill -HUP  <마스터 pid>  → 데이터를 다시 읽고 워커를 하나씩 교체 (롤링 재시작)
+  kill -TERM <마스터 pid>  → 진행 중 요청을 마치고 종료
+"""
+import os
+import gc
+import sys
+import json
+import time
+import signal
+import socket
+import argparse
+import threading
+
+from werkzeug.serving import make_server
+
+# 종료 시 진행 중 요청을 기다리는 최대 시간(초)
+GRACEFUL_TIMEOUT = float(os.getenv("GRACEFUL_TIMEOUT", "30"))
+
+
+def _log(msg):
+    print(f"[serve {os.getpid()}] {msg}", file=sys.stderr, flush=True)
+
+
+class ConcurrencyLimiter:
+    """워커당 동시 처리 요청 수 제한 (WSGI 미들웨어).
+
+    슬롯이 없으면 queue_wait초만 기다리고, 그래도 없으면 503 + Retry-After로 바로 돌려보내
+    느려진 워커에 요청이 계속 쌓이지 않게 한다 (배압).
+    """
+
+    def __init__(self, app, limit, queue_wait=0.05):
+        self.app = app
+        self.limit = int(limit)
+        self.queue_wait = float(queue_wait)
+        self.active = 0
+        self.rejected = 0
+        self._slots = threading.BoundedSemaphore(self.limit)
+        self._lock = threading.Lock()
+
+    def _busy(self, start_response):
+        body = json.dumps(
+            {"status": "error", "message": "요청이 많아 잠시 처리할 수 없습니다. 잠시 후 다시 시도해주세요."},
+            ensure_ascii=False,
+        ).encode("utf-8")
+        start_response("503 Service Unavailable", [
+            ("Content-Type", "application/json"),
+            ("Content-Length", str(len(body))),
+            ("Retry-After", "1"),
+        ])
+        return [body]
+
+    def __call__(self, environ, start_response):
+        if not self._slots.acquire(timeout=self.queue_wait):
+            with self._lock:
+                self.rejected += 1
+            return self._busy(start_response)
+        with self._lock:
+            self.active += 1
+        try:
+            result = self.app(environ, start_response)
+            try:
+                return [b"".join(result)]  # 본문까지 만든 뒤에 슬롯을 돌려준다
+            finally:
+                close = getattr(result, "close", None)
+                if close is not None:
+                    close()
+        finally:
+            with self._lock:
+                self.active -= 1
+            self._slots.release()
+
+
+def _listen(host, port, backlog=1024):
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _worker_main(sock, app, args):
+    """fork된 워커: 공유 소켓에서 받아 처리, SIGTERM이면 새 연결을 끊고 진행 중 요청을 마친 뒤 종료"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
+    limiter = ConcurrencyLimiter(app, args.max_concurrency)
+    server = make_server(args.host, args.port, limiter, threaded=True, fd=sock.fileno())
+
+    def _stop(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, _stop)
+    _log("worker ready")
+    server.serve_forever()
+
+    deadline = time.monotonic() + GRACEFUL_TIMEOUT
+    while limiter.active and time.monotonic() < deadline:
+        time.sleep(0.05)
+    _log("worker exit")
+    os._exit(0)
+
+
+class Master:
+    def __init__(self, app, manager, args):
+        self.app = app
+        self.manager = manager
+        self.args = args
+        self.sock = _listen(args.host, args.port)
+        self.workers = set()
+        self.retiring = set()
+        self._stopping = False
+        self._restart = False
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _worker_main(self.sock, self.app, self.args)
+            finally:
+                os._exit(1)
+        self.workers.add(pid)
+        return pid
+
+    def _freeze(self):
+        # 지금까지 만든 객체를 GC 추적 밖으로 → 워커에서 GC가 공유 페이지에 쓰지 않음
+        gc.collect()
+        gc.freeze()
+
+    def _reap(self):
+        while True:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            self.workers.discard(pid)
+            if pid in self.retiring:
+                self.retiring.discard(pid)
+            elif not self._stopping:
+                _log(f"worker {pid} died, respawning")
+                self.spawn()
+
+    def _wait_exit(self, pid, timeout):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                done, _ = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if done:
+                self.workers.discard(pid)
+                self.retiring.discard(pid)
+                return
+            time.sleep(0.05)
+        os.kill(pid, signal.SIGKILL)
+
+    def rolling_restart(self, reload_data=True):
+        """데이터를 다시 올린 뒤 워커를 하나씩 새로 띄우고 옛 워커를 정리 (처리 용량 유지)"""
+        if reload_data:
+            self.manager.reload(force=True)
+        self._freeze()
+        for old in list(self.workers):
+            self.spawn()
+            time.sleep(self.args.restart_delay)
+            self.retiring.add(old)
+            try:
+                os.kill(old, signal.SIGTERM)
+            except ProcessLookupError:
+                continue
+            self._wait_exit(old, GRACEFUL_TIMEOUT + 1)
+        _log(f"rolling restart done (snapshot v{self.manager.current.version})")
+
+    def run(self):
+        signal.signal(signal.SIGHUP, lambda *a: setattr(self, "_restart", True))
+        signal.signal(signal.SIGTERM, lambda *a: setattr(self, "_stopping", True))
+        signal.signal(signal.SIGINT, lambda *a: setattr(self, "_stopping", True))
+
+        self._freeze()
+        for _ in range(self.args.workers):
+            self.spawn()
+        _log(f"listening on {self.args.host}:{self.args.port} with {self.args.workers} workers")
+
+        last_check = time.monotonic()
+        while not self._stopping:
+            time.sleep(0.2)
+            self._reap()
+            if self._restart:
+                self._restart = False
+                self.rolling_restart()
+            elif self.args.watch > 0 and time.monotonic() - last_check >= self.args.watch:
+                last_check = time.monotonic()
+                if self.manager.reload():  # 원본이 바뀌었으면 새 스냅샷으로 워커 교체
+                    self.rolling_restart(reload_data=False)
+
+        _log("shutting down")
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in list(self.workers):
+            self._wait_exit(pid, GRACEFUL_TIMEOUT + 1)
+        self.sock.close()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Dobong 추천 서버 (pre-fork 멀티 워커)")
+    ap.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    ap.add_argument("--port", type=int, default=int(os.getenv("PORT", "5000")))
+    ap.add_argument("--workers", type=int, default=int(os.getenv("WEB_WORKERS", str(os.cpu_count() or 1))))
+    ap.add_argument("--max-concurrency", type=int, default=int(os.getenv("WORKER_MAX_CONCURRENCY", "16")),
+                    help="워커당 동시 처리 요청 수 (넘치면 503)")
+    ap.add_argument("--watch", type=float, default=float(os.getenv("DATA_WATCH_INTERVAL", "2")),
+                    help="원본 변경 확인 주기(초), 바뀌면 롤링 재시작 (0이면 끔)")
+    ap.add_argument("--restart-delay", type=float, default=0.5, help="롤링 재시작 시 새 워커 준비 대기(초)")
+    args = ap.parse_args(argv)
+
+    # 데이터/인덱스는 fork 전에 마스터에서 전부 올린다
+    from app import app
+    from recommender.data_loader import get_snapshot_manager
+
+    manager = get_snapshot_manager()
+    manager.current._build_all_derived()
+
+    if not hasattr(os, "fork"):
+        _log("fork를 지원하지 않는 플랫폼: 단일 프로세스로 실행합니다")
+        if args.watch > 0:
+            manager.start_watching(args.watch)
+        make_server(args.host, args.port, ConcurrencyLimiter(app, args.max_concurrency), threaded=True).serve_forever()
+        return
+
+    Master(app, manager, args).run()
+
+
+if __name__ == "__main__":
+    main()